@@ -0,0 +1,46 @@
+"""Compare archive size and CPU time for each supported codec."""
+
+import tempfile
+import time
+from pathlib import Path
+
+import click
+
+from src.archive import load_archive, save_archive
+
+from .synthetic import synthetic_records
+
+
+CODECS = {"plain": "", "gzip": ".gz", "zstd": ".zst"}
+
+
+@click.command()
+@click.option("--records", "count", default=10_000, show_default=True, help="Synthetic records.")
+def main(count: int) -> None:
+    records = synthetic_records(count)
+    click.echo(f"{'codec':<6} {'bytes':>12} {'ratio':>7} {'write s':>8} {'read s':>8}")
+    plain_size = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, suffix in CODECS.items():
+            directory = Path(tmp) / name
+            path = directory / f"archive.json{suffix}"
+            try:
+                started = time.process_time()
+                save_archive(records, path)
+                write_seconds = time.process_time() - started
+            except ImportError as exc:
+                click.echo(f"{name:<6} skipped: {exc}")
+                continue
+            started = time.process_time()
+            load_archive(path)
+            read_seconds = time.process_time() - started
+            size = sum(item.stat().st_size for item in directory.iterdir())
+            plain_size = plain_size or size
+            click.echo(
+                f"{name:<6} {size:>12,} {plain_size / size:>6.1f}x "
+                f"{write_seconds:>8.3f} {read_seconds:>8.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
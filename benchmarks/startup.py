@@ -0,0 +1,90 @@
+"""Measure cold-start import time of CLI entry points, and a cold `feed` run, against budgets."""
+
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import click
+
+from src.archive import save_archive
+
+from .synthetic import synthetic_records
+
+
+# src.pipeline and src.sources back --check runs, which must not load the feed writer.
+MODULES = ("src.main", "src.pipeline", "src.sources")
+IMPORT_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)$")
+# Scheduled runs regenerate the feed; most find its inputs unchanged and exit early.
+FEED_COMMAND = ("-m", "src.main", "feed")
+FEED_RECORDS = 365
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def cumulative_import_us(module: str) -> int:
+    """Cumulative microseconds spent importing ``module`` in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match and match.group(2) == module:
+            return int(match.group(1))
+    raise ValueError(f"No importtime entry for {module}.")
+
+
+def cold_run_ms(args: tuple[str, ...], directory: Path) -> float:
+    """Wall-clock milliseconds for ``python <args>`` in a fresh interpreter."""
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(REPO_ROOT),
+        "ARCHIVE_PATH": str(directory / "data" / "archive.json"),
+        "FEED_PRECOMPRESS": "none",
+    }
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, *args], cwd=directory, env=env, capture_output=True, check=True
+    )
+    return (time.perf_counter() - started) * 1000
+
+
+@click.command()
+@click.option("--budget-ms", default=80.0, show_default=True, help="Maximum import time.")
+@click.option(
+    "--feed-budget-ms",
+    default=300.0,
+    show_default=True,
+    help="Maximum wall time of a cold `src.main feed` run.",
+)
+@click.option("--runs", default=5, show_default=True, help="Runs per check; the fastest counts.")
+def main(budget_ms: float, feed_budget_ms: float, runs: int) -> None:
+    over_budget = []
+    for module in MODULES:
+        best_ms = min(cumulative_import_us(module) for _ in range(runs)) / 1000
+        status = "ok" if best_ms <= budget_ms else "OVER"
+        click.echo(f"{module:<12} {best_ms:>8.1f} ms  (budget {budget_ms:.0f} ms) {status}")
+        if best_ms > budget_ms:
+            over_budget.append(module)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        (directory / "data").mkdir()
+        save_archive(synthetic_records(FEED_RECORDS), directory / "data" / "archive.json")
+        cold_run_ms(FEED_COMMAND, directory)  # writes the feed and index
+        best_ms = min(cold_run_ms(FEED_COMMAND, directory) for _ in range(runs))
+    status = "ok" if best_ms <= feed_budget_ms else "OVER"
+    click.echo(f"{'feed':<12} {best_ms:>8.1f} ms  (budget {feed_budget_ms:.0f} ms) {status}")
+    if best_ms > feed_budget_ms:
+        over_budget.append("feed")
+    if over_budget:
+        raise SystemExit(f"Startup over budget: {', '.join(over_budget)}")
+
+
+if __name__ == "__main__":
+    main()
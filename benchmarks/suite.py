@@ -0,0 +1,152 @@
+"""Time archive, merge, parse and feed hot paths and compare them with a stored baseline."""
+
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+import click
+
+from src.archive import _merge_records, save_archive, upsert_record
+from src.generate_feed import FeedConfig, generate_feed
+from src.scrape import _parse_podcast_page, _parse_supabase_payload
+
+from .synthetic import broadcaster_page, supabase_payload, synthetic_records
+
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+DEFAULT_SIZES = "1000,10000,100000"
+DEFAULT_TOLERANCE = 0.5
+PAGE_URL = "https://www1.wdr.de/radio/wdr5/sendungen/zeitzeichen/synthetic.html"
+QUIZ_URL = "https://example.supabase.co/rest/v1/rpc/get_quiz"
+
+MIN_REPEAT_SECONDS = 0.05
+
+# (name, timed callable, repeats)
+Case = tuple[str, Callable[[], Any], int]
+
+
+def cases(sizes: list[int], directory: Path) -> Iterator[Case]:
+    feed_config = FeedConfig(feed_days=0, precompress=())
+    for size in sizes:
+        archive_path = directory / f"archive-{size}.json"
+        records = synthetic_records(size)
+        save_archive(records, archive_path)
+        new_day = {**records[-1], "date": "2999-01-01"}
+        yield (
+            f"upsert_record/{size}",
+            lambda path=archive_path, record=new_day: upsert_record(record, path),
+            5,
+        )
+        yield (
+            f"generate_feed/{size}",
+            lambda path=archive_path: generate_feed(path, config=feed_config),
+            5,
+        )
+
+    existing = {
+        "date": "2024-06-12",
+        "podcasts": [{"page_url": f"{PAGE_URL}?n={number}"} for number in range(500)],
+        "extras": [{"page_url": f"https://de.wikipedia.org/wiki/{number}"} for number in range(500)],
+    }
+    incoming = {
+        "date": "2024-06-12",
+        "podcasts": [{"page_url": f"{PAGE_URL}?n={number}"} for number in range(250, 750)],
+        "extras": existing["extras"],
+    }
+    yield "merge_records/500", lambda: _merge_records(existing, incoming), 5
+
+    page = broadcaster_page(2 * 1024 * 1024)
+    yield "parse_podcast_page/2MB", lambda: _parse_podcast_page(page, PAGE_URL), 3
+
+    payload = supabase_payload(500)
+    yield (
+        "parse_supabase_payload/500",
+        lambda: _parse_supabase_payload(payload, QUIZ_URL, quiz_id="229"),
+        5,
+    )
+
+
+def measure(function: Callable[[], Any], repeats: int) -> float:
+    """Best-of-``repeats`` seconds per call; fast cases loop so each repeat is measurable."""
+    started = time.perf_counter()
+    function()
+    warmup = time.perf_counter() - started
+    calls = max(1, int(MIN_REPEAT_SECONDS / max(warmup, 1e-9)))
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(calls):
+            function()
+        best = min(best, (time.perf_counter() - started) / calls)
+    return best
+
+
+def compare(
+    results: dict[str, float], baseline: dict[str, float], tolerance: float
+) -> list[str]:
+    """Print one row per case and return the names that regressed past ``tolerance``."""
+    regressions = []
+    click.echo(f"{'case':<28} {'baseline ms':>12} {'current ms':>12} {'change':>8}")
+    for name, seconds in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            click.echo(f"{name:<28} {'-':>12} {seconds * 1000:>12.3f} {'new':>8}")
+            continue
+        change = seconds / reference - 1
+        status = ""
+        if change > tolerance:
+            status = "  REGRESSION"
+            regressions.append(name)
+        click.echo(
+            f"{name:<28} {reference * 1000:>12.3f} {seconds * 1000:>12.3f} {change:>+7.0%}{status}"
+        )
+    return regressions
+
+
+@click.command()
+@click.option("--sizes", default=DEFAULT_SIZES, show_default=True, help="Archive sizes to time.")
+@click.option("--only", default=None, help="Only run cases whose name contains this text.")
+@click.option("--baseline", "baseline_path", type=click.Path(path_type=Path), default=BASELINE_PATH)
+@click.option("--save-baseline", is_flag=True, help="Store these results as the new baseline.")
+@click.option(
+    "--tolerance",
+    type=float,
+    default=None,
+    help="Allowed slowdown ratio before a case counts as a regression (default: the baseline's).",
+)
+def main(
+    sizes: str,
+    only: str | None,
+    baseline_path: Path,
+    save_baseline: bool,
+    tolerance: float | None,
+) -> None:
+    stored: dict[str, Any] = {}
+    if baseline_path.exists():
+        stored = json.loads(baseline_path.read_text(encoding="utf-8"))
+    results: dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, function, repeats in cases([int(size) for size in sizes.split(",")], Path(tmp)):
+            if only and only not in name:
+                continue
+            results[name] = measure(function, repeats)
+
+    tolerance = tolerance if tolerance is not None else stored.get("tolerance", DEFAULT_TOLERANCE)
+    regressions = compare(results, stored.get("results", {}), tolerance)
+    if save_baseline:
+        merged = dict(stored.get("results", {}))
+        merged.update({name: round(value, 7) for name, value in results.items()})
+        baseline_path.write_text(
+            json.dumps({"tolerance": tolerance, "results": merged}, indent=2, sort_keys=True) + "\n",
+            encoding="utf-8",
+        )
+        click.echo(f"Saved baseline to {baseline_path}.")
+        return
+    if regressions:
+        raise SystemExit(f"{len(regressions)} benchmark(s) regressed more than {tolerance:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
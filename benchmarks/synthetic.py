@@ -0,0 +1,94 @@
+"""Synthetic archive records, broadcaster pages and quiz payloads for benchmarks."""
+
+from datetime import date as Date, timedelta
+from typing import Any
+
+
+def synthetic_records(count: int) -> list[dict[str, Any]]:
+    records = []
+    for day in range(count):
+        date_value = (Date(2000, 1, 1) + timedelta(days=day)).isoformat()
+        page_url = f"https://www1.wdr.de/radio/wdr5/sendungen/zeitzeichen/episode-{day % 500}.html"
+        records.append(
+            {
+                "date": date_value,
+                "events": [page_url],
+                "answer_year": 1000 + day % 1000,
+                "podcasts": [
+                    {
+                        "page_url": page_url,
+                        "audio_url": f"https://wdrmedien-a.akamaihd.net/medp/podcast/{day % 500}.mp3",
+                        "content_type": "audio/mpeg",
+                        "length": 10_000_000 + day,
+                        "title": f"Zeitzeichen episode {day % 500}",
+                        "pub_date": date_value,
+                    }
+                ],
+                "extras": [
+                    {
+                        "page_url": f"https://de.wikipedia.org/wiki/Article_{day}",
+                        "title": "Wikipedia",
+                        "tip_type": "wiki",
+                    }
+                ],
+                "cover_image": f"https://example.com/covers/{day}.jpg",
+                "source_url": "https://example.supabase.co/rest/v1/rpc/get_puzzle_of_the_day",
+            }
+        )
+    return records
+
+
+def broadcaster_page(size_bytes: int) -> str:
+    """A WDR-style episode page padded with navigation and teaser markup.
+
+    The audio link sits at the end, as on real pages, so parsers walk the whole tree.
+    """
+    teaser = (
+        '<div class="teaser"><a href="/radio/wdr5/sendungen/zeitzeichen/episode-{n}.html">'
+        '<img src="/images/{n}.jpg" alt="Teaser {n}"><span>Zeitzeichen {n}</span></a>'
+        "<p>Ein Rückblick auf ein historisches Ereignis mit Hintergrund und Kontext.</p></div>\n"
+    )
+    head = (
+        "<!DOCTYPE html><html><head><title>Zeitzeichen</title>"
+        '<meta property="article:published_time" content="2024-06-12T00:00:00+02:00">'
+        "</head><body><h1>Zeitzeichen: Synthetic episode</h1><nav>"
+    )
+    tail = (
+        "</nav><main><time datetime=\"2024-06-12\">12.06.2024</time>"
+        '<a href="https://wdrmedien-a.akamaihd.net/content/audio/synthetic.mp3">Audio Download</a>'
+        "</main></body></html>"
+    )
+    parts = [head]
+    size = len(head) + len(tail)
+    number = 0
+    while size < size_bytes:
+        block = teaser.format(n=number)
+        parts.append(block)
+        size += len(block)
+        number += 1
+    parts.append(tail)
+    return "".join(parts)
+
+
+def supabase_payload(tip_count: int) -> dict[str, Any]:
+    tips = []
+    for number in range(tip_count):
+        if number % 3 == 0:
+            tips.append(
+                {
+                    "link": f"https://www1.wdr.de/radio/wdr5/sendungen/zeitzeichen/episode-{number}.html",
+                    "type": "podcast",
+                    "title": f"Zeitzeichen {number}",
+                    "image": f"https://example.com/images/{number}.jpg",
+                }
+            )
+        else:
+            tips.append(
+                {
+                    "link": f"https://de.wikipedia.org/wiki/Article_{number}",
+                    "type": "wiki",
+                    "title": f"Wikipedia {number}",
+                    "image": None,
+                }
+            )
+    return {"id": 229, "year": 1969, "date": "2024-06-12", "tips": tips}
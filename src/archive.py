@@ -1,18 +1,28 @@
+import gzip
+import io
 import json
 from pathlib import Path
-from typing import Any
+from typing import IO, Any, Optional
 
 
 ARCHIVE_PATH = Path("data/archive.json")
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+CODEC_SUFFIXES = {".gz": "gzip", ".zst": "zstd", ".zstd": "zstd"}
+PODCAST_FIELDS = ("audio_url", "content_type", "length", "title", "pub_date")
 
 
 def load_archive(path: Path = ARCHIVE_PATH) -> list[dict[str, Any]]:
+    """Load archive records with podcast references resolved from the podcast store."""
     if not path.exists():
         return []
-    with path.open("r", encoding="utf-8") as handle:
+    with open_text(path, "r") as handle:
         data = json.load(handle)
     if not isinstance(data, list):
         raise ValueError("Archive data must be a list of records.")
+    podcasts = load_podcasts(podcasts_path_for(path))
+    if podcasts:
+        _hydrate_podcasts(data, podcasts)
     return data
 
 
@@ -21,7 +31,18 @@ def upsert_record(
     path: Path = ARCHIVE_PATH,
     merge: bool = False,
 ) -> tuple[list[dict[str, Any]], bool]:
-    records = load_archive(path)
+    return upsert_in_memory(load_archive(path), record, merge)
+
+
+def upsert_in_memory(
+    records: list[dict[str, Any]],
+    record: dict[str, Any],
+    merge: bool = False,
+) -> tuple[list[dict[str, Any]], bool]:
+    """Insert or replace (or merge into) the record for ``record["date"]``.
+
+    Returns a new date-sorted list, so batches can apply many records before one save.
+    """
     updated = False
     new_records = []
     matched = False
@@ -53,19 +74,183 @@ def upsert_record(
     return new_records, updated
 
 
-def save_archive(records: list[dict[str, Any]], path: Path = ARCHIVE_PATH) -> None:
+def save_archive(records: list[dict[str, Any]], path: Path = ARCHIVE_PATH) -> set[str]:
+    """Write records with podcasts reduced to page_url references.
+
+    Podcast metadata is stored once per page_url in the podcast store next to the
+    archive. Values that differ from the stored entry replace it, so a freshly
+    resolved enclosure updates every record that references the same page, including
+    the records passed in. Returns the page_urls whose stored entry changed.
+    """
+    podcasts_path = podcasts_path_for(path)
+    podcasts = load_podcasts(podcasts_path)
+    stored = {url: dict(entry) for url, entry in podcasts.items()}
+    references = [_split_podcasts(record, stored, podcasts) for record in records]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open_text(path, "w") as handle:
+        json.dump(references, handle, indent=2, sort_keys=False)
+        handle.write("\n")
+    changed = {url for url, entry in podcasts.items() if stored.get(url) != entry}
+    if changed:
+        save_podcasts(podcasts, podcasts_path)
+        # Keep the caller's records in step with the store, as a reload would be.
+        _hydrate_podcasts(records, {url: podcasts[url] for url in changed})
+    return changed
+
+
+def source_stamp(path: Path = ARCHIVE_PATH) -> list[Optional[list[int]]]:
+    """mtime/size of the archive and podcast store, to detect changes on disk."""
+    stamps: list[Optional[list[int]]] = []
+    for source in (path, podcasts_path_for(path)):
+        try:
+            stat = source.stat()
+        except FileNotFoundError:
+            stamps.append(None)
+            continue
+        stamps.append([stat.st_mtime_ns, stat.st_size])
+    return stamps
+
+
+def podcasts_path_for(path: Path) -> Path:
+    suffix = path.suffix if path.suffix in CODEC_SUFFIXES else ""
+    return path.with_name(f"podcasts.json{suffix}")
+
+
+def open_text(path: Path, mode: str) -> IO[str]:
+    """Open a JSON file as text, compressing or decompressing transparently.
+
+    Writes pick the codec from the file extension (``.gz``, ``.zst``); reads detect
+    it from the magic bytes, so renamed files still load. Data is streamed through
+    the codec rather than buffered in full.
+    """
+    if mode == "r":
+        with path.open("rb") as probe:
+            codec = _detect_codec(probe.read(4))
+    elif mode == "w":
+        codec = CODEC_SUFFIXES.get(path.suffix)
+    else:
+        raise ValueError(f"Unsupported mode {mode!r}; use 'r' or 'w'.")
+    if codec is None:
+        return path.open(mode, encoding="utf-8")
+    if codec == "gzip":
+        # A fixed mtime keeps identical content byte-identical across writes.
+        stream: IO[bytes] = gzip.GzipFile(path, mode=f"{mode}b", mtime=0)
+    else:
+        stream = _zstd_stream(path, mode)
+    return io.TextIOWrapper(stream, encoding="utf-8")
+
+
+def _detect_codec(head: bytes) -> Optional[str]:
+    if head.startswith(GZIP_MAGIC):
+        return "gzip"
+    if head.startswith(ZSTD_MAGIC):
+        return "zstd"
+    return None
+
+
+def _zstd_stream(path: Path, mode: str) -> IO[bytes]:
+    try:
+        import zstandard
+    except ImportError as exc:
+        raise ImportError(
+            "zstd archives require the optional 'zstandard' package "
+            "(install with the 'zstd' extra)."
+        ) from exc
+    raw = path.open(f"{mode}b")
+    if mode == "r":
+        return zstandard.ZstdDecompressor().stream_reader(raw)
+    return zstandard.ZstdCompressor(level=10).stream_writer(raw)
+
+
+def load_podcasts(path: Path) -> dict[str, dict[str, Any]]:
+    if not path.exists():
+        return {}
+    with open_text(path, "r") as handle:
+        data = json.load(handle)
+    if not isinstance(data, dict):
+        raise ValueError("Podcast store must be an object keyed by page_url.")
+    return data
+
+
+def save_podcasts(podcasts: dict[str, dict[str, Any]], path: Path) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as handle:
-        json.dump(records, handle, indent=2, sort_keys=False)
+    with open_text(path, "w") as handle:
+        json.dump(dict(sorted(podcasts.items())), handle, indent=2, sort_keys=False)
         handle.write("\n")
 
 
+def update_podcast(
+    page_url: str, fields: dict[str, Any], path: Path = ARCHIVE_PATH
+) -> bool:
+    """Update stored metadata for one episode; returns True when anything changed."""
+    podcasts_path = podcasts_path_for(path)
+    podcasts = load_podcasts(podcasts_path)
+    entry = dict(podcasts.get(page_url, {}))
+    entry.update({key: value for key, value in fields.items() if key in PODCAST_FIELDS})
+    if podcasts.get(page_url) == entry:
+        return False
+    podcasts[page_url] = entry
+    save_podcasts(podcasts, podcasts_path)
+    return True
+
+
+def _hydrate_podcasts(
+    records: list[dict[str, Any]], podcasts: dict[str, dict[str, Any]]
+) -> None:
+    for record in records:
+        items = record.get("podcasts")
+        if not isinstance(items, list):
+            continue
+        for index, podcast in enumerate(items):
+            if not isinstance(podcast, dict):
+                continue
+            entry = podcasts.get(podcast.get("page_url"))
+            if entry:
+                items[index] = {**podcast, **entry}
+
+
+def _split_podcasts(
+    record: dict[str, Any],
+    stored: dict[str, dict[str, Any]],
+    podcasts: dict[str, dict[str, Any]],
+) -> dict[str, Any]:
+    items = record.get("podcasts")
+    if not isinstance(items, list):
+        return record
+    references = []
+    for podcast in items:
+        page_url = podcast.get("page_url") if isinstance(podcast, dict) else None
+        if not page_url:
+            references.append(podcast)
+            continue
+        previous = stored.get(page_url, {})
+        entry = podcasts.setdefault(page_url, dict(previous))
+        for key in PODCAST_FIELDS:
+            # Absent keys keep the stored value; an explicit empty value clears it.
+            if key not in podcast:
+                continue
+            value = podcast[key]
+            if value == previous.get(key):
+                continue
+            if _is_empty(value):
+                entry.pop(key, None)
+            else:
+                entry[key] = value
+        references.append(
+            {key: value for key, value in podcast.items() if key not in PODCAST_FIELDS}
+        )
+    return {**record, "podcasts": references}
+
+
 def _merge_records(existing: dict[str, Any], incoming: dict[str, Any]) -> dict[str, Any]:
     merged = dict(existing)
     for key, value in incoming.items():
         if value is None:
             continue
-        if key in {"events", "podcasts", "extras"}:
+        if key == "podcasts":
+            merged[key] = _merge_podcasts(existing.get(key), value)
+            continue
+        if key in {"events", "extras"}:
             merged[key] = _merge_list(existing.get(key), value)
             continue
         if key == "source_url" and existing.get("source_url"):
@@ -88,6 +273,29 @@ def _merge_list(existing: Any, incoming: Any) -> list[Any]:
     return merged
 
 
+def _merge_podcasts(existing: Any, incoming: Any) -> list[Any]:
+    """Merge podcast lists keeping one entry per page_url, newer non-empty values winning."""
+    merged: list[Any] = []
+    by_page: dict[str, dict[str, Any]] = {}
+    for source in (existing, incoming):
+        if not isinstance(source, list):
+            continue
+        for item in source:
+            page_url = item.get("page_url") if isinstance(item, dict) else None
+            if not page_url:
+                if item not in merged:
+                    merged.append(item)
+                continue
+            if page_url not in by_page:
+                by_page[page_url] = dict(item)
+                merged.append(by_page[page_url])
+                continue
+            by_page[page_url].update(
+                {key: value for key, value in item.items() if not _is_empty(value)}
+            )
+    return merged
+
+
 def _is_empty(value: Any) -> bool:
     if value is None:
         return True
@@ -0,0 +1,108 @@
+import gzip
+import hashlib
+import os
+from pathlib import Path
+from typing import Iterator, Optional
+
+
+ARTIFACT_SUFFIXES = {"gzip": ".gz", "br": ".br"}
+BLOCK_SIZE = 1 << 16
+
+
+def default_codecs() -> list[str]:
+    """gzip always; brotli when the optional package is installed."""
+    codecs = ["gzip"]
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return codecs
+    codecs.append("br")
+    return codecs
+
+
+def parse_codecs(value: Optional[str]) -> list[str]:
+    if value is None or not value.strip():
+        return default_codecs()
+    codecs = [item.strip().lower() for item in value.split(",") if item.strip()]
+    if codecs == ["none"]:
+        return []
+    unknown = [codec for codec in codecs if codec not in ARTIFACT_SUFFIXES]
+    if unknown:
+        raise ValueError(f"Unsupported precompression codecs: {unknown}; use gzip, br or none.")
+    return codecs
+
+
+def etag_path_for(path: Path) -> Path:
+    return path.with_name(f"{path.name}.etag")
+
+
+def artifact_path_for(path: Path, codec: str) -> Path:
+    return path.with_name(f"{path.name}{ARTIFACT_SUFFIXES[codec]}")
+
+
+def content_etag(path: Path) -> str:
+    """Strong ETag: the quoted SHA-256 of the uncompressed content."""
+    digest = hashlib.sha256()
+    for block in _read_blocks(path):
+        digest.update(block)
+    return f'"{digest.hexdigest()}"'
+
+
+def read_etag(path: Path) -> Optional[str]:
+    etag_path = etag_path_for(path)
+    if not etag_path.exists():
+        return None
+    return etag_path.read_text(encoding="utf-8").strip() or None
+
+
+def write_artifacts(path: Path, codecs: list[str]) -> bool:
+    """Write compressed copies and the ETag sidecar when ``path`` content changed.
+
+    Compressed files are streamed block by block and replaced atomically; gzip output
+    uses a fixed mtime so identical content yields identical bytes. Returns True when
+    anything was written.
+    """
+    etag = content_etag(path)
+    artifacts = [artifact_path_for(path, codec) for codec in codecs]
+    if read_etag(path) == etag and all(artifact.exists() for artifact in artifacts):
+        return False
+    for codec, artifact in zip(codecs, artifacts):
+        temp_path = artifact.with_name(f".{artifact.name}.tmp")
+        try:
+            if codec == "gzip":
+                _write_gzip(path, temp_path)
+            else:
+                _write_brotli(path, temp_path)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+        os.replace(temp_path, artifact)
+    etag_path_for(path).write_text(etag + "\n", encoding="utf-8")
+    return True
+
+
+def _write_gzip(source: Path, target: Path) -> None:
+    with target.open("wb") as raw:
+        with gzip.GzipFile(filename="", fileobj=raw, mode="wb", compresslevel=9, mtime=0) as handle:
+            for block in _read_blocks(source):
+                handle.write(block)
+
+
+def _write_brotli(source: Path, target: Path) -> None:
+    try:
+        import brotli
+    except ImportError as exc:
+        raise ImportError(
+            "Brotli artifacts require the optional 'brotli' package "
+            "(install with the 'brotli' extra)."
+        ) from exc
+    compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=11)
+    with target.open("wb") as handle:
+        for block in _read_blocks(source):
+            handle.write(compressor.process(block))
+        handle.write(compressor.finish())
+
+
+def _read_blocks(path: Path) -> Iterator[bytes]:
+    with path.open("rb") as handle:
+        yield from iter(lambda: handle.read(BLOCK_SIZE), b"")
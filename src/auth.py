@@ -0,0 +1,231 @@
+import base64
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from .environment import getenv
+from .scrape import DEFAULT_QUIZ_URL, _request_with_backoff
+
+
+STORAGE_STATE_PATH = Path("data/pastpuzzle.storage_state.json")
+APP_ORIGIN = "https://www.pastpuzzle.de"
+REFRESH_LEEWAY_SECONDS = 120
+
+_managers: dict[tuple[object, Path], "TokenManager"] = {}
+_manager_lock = threading.Lock()
+
+
+def decode_jwt_payload(token: str) -> dict[str, object] | None:
+    try:
+        parts = token.split(".")
+        if len(parts) != 3:
+            return None
+        payload = parts[1]
+        padded = payload + "=" * (-len(payload) % 4)
+        decoded = base64.urlsafe_b64decode(padded.encode("utf-8")).decode("utf-8")
+        return json.loads(decoded)
+    except Exception:
+        return None
+
+
+def token_expiry(token: str) -> Optional[float]:
+    payload = decode_jwt_payload(token) or {}
+    exp = payload.get("exp")
+    return float(exp) if isinstance(exp, (int, float)) else None
+
+
+def token_identity(token: str) -> Optional[tuple[str, str]]:
+    """The ``(iss, sub)`` pair naming the account a JWT was issued for."""
+    payload = decode_jwt_payload(token) or {}
+    issuer, subject = payload.get("iss"), payload.get("sub")
+    if not isinstance(subject, str) or not subject:
+        return None
+    return (issuer if isinstance(issuer, str) else "", subject)
+
+
+def storage_state_path() -> Path:
+    """PASTPUZZLE_STORAGE_STATE, or the storage state written by ``make token``."""
+    return Path(getenv("PASTPUZZLE_STORAGE_STATE") or STORAGE_STATE_PATH)
+
+
+def auth_base_url(token: Optional[str] = None) -> str:
+    """Supabase project URL: PASTPUZZLE_SUPABASE_URL, the token issuer, or the quiz URL."""
+    explicit = getenv("PASTPUZZLE_SUPABASE_URL")
+    if explicit:
+        return explicit.rstrip("/")
+    issuer = (decode_jwt_payload(token) or {}).get("iss") if token else None
+    if isinstance(issuer, str) and issuer.startswith("http"):
+        parsed = urlparse(issuer)
+        return f"{parsed.scheme}://{parsed.netloc}"
+    parsed = urlparse(getenv("PASTPUZZLE_QUIZ_URL") or DEFAULT_QUIZ_URL)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def token_grant(
+    grant_type: str, body: dict[str, str], api_key: str, base_url: str
+) -> dict[str, Any]:
+    """POST a Supabase ``/auth/v1/token`` grant and return the session JSON."""
+    response = _request_with_backoff(
+        "POST",
+        f"{base_url}/auth/v1/token?grant_type={grant_type}",
+        headers={"apikey": api_key, "content-type": "application/json"},
+        json=body,
+    )
+    response.raise_for_status()
+    session = response.json()
+    if not isinstance(session, dict) or not session.get("access_token"):
+        raise ValueError(f"Supabase {grant_type} grant returned no access_token.")
+    return session
+
+
+def load_session(path: Path = STORAGE_STATE_PATH) -> Optional[dict[str, Any]]:
+    """The Supabase session saved in a Playwright storage state, if any."""
+    if not path.exists():
+        return None
+    try:
+        storage = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    for origin in storage.get("origins", []):
+        for item in origin.get("localStorage", []):
+            if "auth-token" not in item.get("name", ""):
+                continue
+            try:
+                session = json.loads(item.get("value", ""))
+            except json.JSONDecodeError:
+                continue
+            if isinstance(session, dict) and session.get("access_token"):
+                return session
+    return None
+
+
+def save_session(session: dict[str, Any], base_url: str, path: Path = STORAGE_STATE_PATH) -> None:
+    """Write ``session`` into the storage state's auth-token entry, creating it if needed."""
+    storage: dict[str, Any] = {"cookies": [], "origins": []}
+    if path.exists():
+        try:
+            storage = json.loads(path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            pass
+    value = json.dumps(session)
+    for origin in storage.setdefault("origins", []):
+        for item in origin.get("localStorage", []):
+            if "auth-token" in item.get("name", ""):
+                item["value"] = value
+                break
+        else:
+            continue
+        break
+    else:
+        project_ref = (urlparse(base_url).hostname or "app").split(".", 1)[0]
+        storage["origins"].append(
+            {
+                "origin": APP_ORIGIN,
+                "localStorage": [{"name": f"sb-{project_ref}-auth-token", "value": value}],
+            }
+        )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f"{path.name}.tmp")
+    temporary.write_text(json.dumps(storage), encoding="utf-8")
+    temporary.replace(path)
+
+
+class TokenManager:
+    """Keeps a user access token valid by refreshing it shortly before ``exp``.
+
+    The refresh token comes from the saved storage state, and every rotated session
+    is written back there, so the next process starts from the newest token. A stored
+    session issued for another account (``iss``/``sub``) is ignored and never
+    overwritten, so sources with different credentials cannot swap identities.
+    """
+
+    def __init__(
+        self,
+        access_token: str,
+        api_key: Optional[str],
+        storage_state_path: Path = STORAGE_STATE_PATH,
+        leeway: float = REFRESH_LEEWAY_SECONDS,
+    ) -> None:
+        self.seed = access_token
+        self.api_key = api_key
+        self.storage_state_path = storage_state_path
+        self.leeway = leeway
+        self.base_url = auth_base_url(access_token)
+        self.access_token = access_token
+        self.refresh_token: Optional[str] = None
+        self._lock = threading.Lock()
+        session = load_session(storage_state_path)
+        identity = token_identity(access_token)
+        if session and identity and token_identity(session["access_token"]) == identity:
+            self.refresh_token = session.get("refresh_token")
+            stored = session["access_token"]
+            # A previous run may already have rotated the token from .env.
+            if (token_expiry(stored) or 0) > (token_expiry(access_token) or 0):
+                self.access_token = stored
+
+    @property
+    def refreshable(self) -> bool:
+        return bool(self.refresh_token and self.api_key)
+
+    def token(self, now: Optional[float] = None) -> str:
+        """The current access token, refreshed first when it expires within the leeway."""
+        now = now if now is not None else time.time()
+        with self._lock:
+            expiry = token_expiry(self.access_token)
+            if expiry is not None and expiry - now <= self.leeway and self.refreshable:
+                try:
+                    self._refresh()
+                except (httpx.HTTPError, ValueError) as exc:
+                    # Keep the old token; a 401 later still retries or falls back to anon.
+                    print(f"Token refresh failed: {exc}", file=sys.stderr)
+            return self.access_token
+
+    def refresh(self) -> bool:
+        """Refresh now (after a 401); False when no refresh token is available or it fails."""
+        with self._lock:
+            if not self.refreshable:
+                return False
+            try:
+                self._refresh()
+            except (httpx.HTTPError, ValueError) as exc:
+                # The caller falls back to the anon key instead of failing the scrape.
+                print(f"Token refresh failed: {exc}", file=sys.stderr)
+                return False
+            return True
+
+    def _refresh(self) -> None:
+        assert self.refresh_token and self.api_key
+        session = token_grant(
+            "refresh_token", {"refresh_token": self.refresh_token}, self.api_key, self.base_url
+        )
+        self.access_token = session["access_token"]
+        self.refresh_token = session.get("refresh_token") or self.refresh_token
+        save_session(session, self.base_url, self.storage_state_path)
+
+
+def token_manager(access_token: str, api_key: Optional[str]) -> Optional["TokenManager"]:
+    """Process-wide manager for ``access_token`` (a configured or a rotated token).
+
+    Managers are shared per account and storage state (``PASTPUZZLE_STORAGE_STATE``
+    may differ per source). Returns None for anon keys and opaque tokens, which are
+    never refreshed.
+    """
+    payload = decode_jwt_payload(access_token)
+    if not payload or payload.get("role") == "anon":
+        return None
+    path = storage_state_path()
+    key = (token_identity(access_token) or access_token, path)
+    with _manager_lock:
+        for (identity, manager_path), manager in _managers.items():
+            if manager_path == path and access_token in {manager.seed, manager.access_token}:
+                return manager
+        manager = _managers.get(key)
+        if manager is None:
+            manager = _managers[key] = TokenManager(access_token, api_key, path)
+        return manager
@@ -0,0 +1,193 @@
+import signal
+import threading
+import time as clock
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from . import metrics
+from .archive import load_archive, save_archive
+from .environment import getenv
+from .generate_feed import FEED_PATH, FeedConfig
+from .index import load_index, save_index
+from .no_audio_cache import NoAudioCache
+from .pipeline import refresh_feed, store_record
+from .retry_queue import RetryQueue, drain_retry_queue
+from .scrape import close_http_client, fetch_puzzle, resolve_podcast_audio
+
+
+@dataclass(frozen=True)
+class DaemonConfig:
+    rollover: time = time(0, 0)
+    lead: float = 120.0
+    poll_interval: float = 30.0
+    max_interval: float = 900.0
+    retry_interval: float = 3600.0
+    retry_days: int = 14
+
+    @classmethod
+    def from_env(cls) -> "DaemonConfig":
+        rollover = getenv("DAEMON_ROLLOVER", "00:00")
+        try:
+            parsed_rollover = time.fromisoformat(rollover)
+        except ValueError as exc:
+            raise ValueError(f"DAEMON_ROLLOVER must be HH:MM in UTC (got {rollover}).") from exc
+        return cls(
+            rollover=parsed_rollover,
+            lead=float(getenv("DAEMON_LEAD_SECONDS", "120")),
+            poll_interval=float(getenv("DAEMON_POLL_SECONDS", "30")),
+            max_interval=float(getenv("DAEMON_MAX_POLL_SECONDS", "900")),
+            retry_interval=float(getenv("DAEMON_RETRY_SECONDS", "3600")),
+            retry_days=int(getenv("DAEMON_RETRY_DAYS", "14")),
+        )
+
+
+def expected_date(now: datetime, config: DaemonConfig) -> str:
+    """The puzzle date that should be live at ``now``."""
+    rollover = datetime.combine(now.date(), config.rollover, tzinfo=timezone.utc)
+    day = now.date() if now >= rollover else now.date() - timedelta(days=1)
+    return day.isoformat()
+
+
+def next_poll_delay(
+    now: datetime, config: DaemonConfig, have_current: bool, misses: int
+) -> float:
+    """Sleep until shortly before the next rollover, or back off while a new day is late."""
+    if have_current:
+        rollover = datetime.combine(now.date(), config.rollover, tzinfo=timezone.utc)
+        if rollover <= now:
+            rollover += timedelta(days=1)
+        return max((rollover - now).total_seconds() - config.lead, config.poll_interval)
+    return min(config.poll_interval * 2 ** min(max(misses - 1, 0), 16), config.max_interval)
+
+
+class Daemon:
+    """Resident scraper: polls around rollover and keeps the archive and feed current."""
+
+    def __init__(
+        self,
+        archive_path: Path,
+        feed_path: Path = FEED_PATH,
+        config: Optional[DaemonConfig] = None,
+        feed_config: Optional[FeedConfig] = None,
+        echo: Callable[[str], None] = print,
+    ) -> None:
+        self.archive_path = archive_path
+        self.feed_path = feed_path
+        self.config = config or DaemonConfig.from_env()
+        self.feed_config = feed_config or FeedConfig.from_env()
+        self.echo = echo
+        self.stop_event = threading.Event()
+        self.misses = 0
+        self._last_retry: Optional[float] = None
+
+    def poll(self, now: Optional[datetime] = None) -> bool:
+        """Fetch the live puzzle; store it and rebuild the feed when its date is new.
+
+        Podcast pages that fail to load are queued for retry rather than failing the day.
+        """
+        index = load_index(self.archive_path)
+        record = fetch_puzzle(resolve=False)
+        if record["date"] in index.entries:
+            return False
+        no_audio = NoAudioCache.for_archive(self.archive_path)
+        failures = resolve_podcast_audio(record, no_audio)
+        no_audio.save()
+        store_record(record, self.archive_path, index=index)
+        if failures:
+            queue = RetryQueue.for_archive(self.archive_path)
+            queue.add([record], failures, now or datetime.now(timezone.utc))
+            queue.save()
+        refresh_feed(self.archive_path, self.feed_path, self.feed_config)
+        self.echo(f"Updated archive for {record['date']}.")
+        return True
+
+    def retry_missing_audio(self, now: datetime) -> list[str]:
+        """Resolve podcasts that still lack audio for recent days; returns updated dates."""
+        index = load_index(self.archive_path)
+        cutoff = (now.date() - timedelta(days=self.config.retry_days)).isoformat()
+        dates = {date_value for date_value in index.query(missing_audio=True) if date_value >= cutoff}
+        if not dates:
+            return []
+        records = load_archive(self.archive_path)
+        no_audio = NoAudioCache.for_archive(self.archive_path)
+        updated = []
+        for record in records:
+            if record.get("date") not in dates:
+                continue
+            before = _resolved_count(record)
+            try:
+                resolve_podcast_audio(record, no_audio)
+            except Exception as exc:  # one bad page must not stop the others
+                self.echo(f"Podcast resolution failed for {record['date']}: {exc}")
+                continue
+            if _resolved_count(record) > before:
+                updated.append(record)
+        no_audio.save()
+        if not updated:
+            return []
+        changed_pages = save_archive(records, self.archive_path)
+        index.update_affected(records, {record["date"] for record in updated}, changed_pages)
+        save_index(index, self.archive_path)
+        refresh_feed(self.archive_path, self.feed_path, self.feed_config)
+        return [record["date"] for record in updated]
+
+    def step(self, now: datetime) -> float:
+        """Run one poll cycle and return the number of seconds to wait before the next."""
+        try:
+            with metrics.record_run("daemon"):
+                self.poll(now)
+        except Exception as exc:  # keep running; the next poll retries
+            self.echo(f"Puzzle poll failed: {exc}")
+        try:
+            retried = drain_retry_queue(self.archive_path, now)
+        except Exception as exc:
+            self.echo(f"Retry queue drain failed: {exc}")
+            retried = []
+        if retried:
+            refresh_feed(self.archive_path, self.feed_path, self.feed_config)
+            for date_value in retried:
+                self.echo(f"Resolved queued podcast audio for {date_value}.")
+        have_current = expected_date(now, self.config) in load_index(self.archive_path).entries
+        self.misses = 0 if have_current else self.misses + 1
+        if have_current and self._retry_due():
+            self._last_retry = clock.monotonic()
+            for date_value in self.retry_missing_audio(now):
+                self.echo(f"Resolved podcast audio for {date_value}.")
+        return next_poll_delay(now, self.config, have_current, self.misses)
+
+    def run(self) -> None:
+        try:
+            while not self.stop_event.is_set():
+                delay = self.step(datetime.now(timezone.utc))
+                self.stop_event.wait(delay)
+        finally:
+            close_http_client()
+
+    def _retry_due(self) -> bool:
+        if self._last_retry is None:
+            return True
+        return clock.monotonic() - self._last_retry >= self.config.retry_interval
+
+
+def run_daemon(
+    archive_path: Path,
+    feed_path: Path = FEED_PATH,
+    config: Optional[DaemonConfig] = None,
+    feed_config: Optional[FeedConfig] = None,
+    echo: Callable[[str], None] = print,
+) -> None:
+    daemon = Daemon(archive_path, feed_path, config, feed_config, echo)
+    signal.signal(signal.SIGTERM, lambda *_: daemon.stop_event.set())
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        pass
+
+
+def _resolved_count(record: dict[str, Any]) -> int:
+    podcasts = record.get("podcasts")
+    if not isinstance(podcasts, list):
+        return 0
+    return sum(1 for podcast in podcasts if isinstance(podcast, dict) and podcast.get("audio_url"))
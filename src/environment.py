@@ -0,0 +1,35 @@
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Mapping, Optional, overload
+
+
+# Per-source settings for multi-source runs. A ContextVar keeps each source's values
+# local to the thread (and context) processing it, where os.environ is process-wide.
+_overrides: ContextVar[Mapping[str, str]] = ContextVar("environment_overrides", default={})
+
+
+@overload
+def getenv(name: str) -> Optional[str]: ...
+
+
+@overload
+def getenv(name: str, default: str) -> str: ...
+
+
+def getenv(name: str, default: Optional[str] = None) -> Optional[str]:
+    """``os.getenv`` that sees the values set by :func:`overridden` first."""
+    overrides = _overrides.get()
+    if name in overrides:
+        return overrides[name]
+    return os.getenv(name, default)
+
+
+@contextmanager
+def overridden(values: Mapping[str, str]) -> Iterator[None]:
+    """Override settings for code running in the current context only."""
+    token = _overrides.set({**_overrides.get(), **values})
+    try:
+        yield
+    finally:
+        _overrides.reset(token)
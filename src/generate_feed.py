@@ -1,142 +1,870 @@
+import hashlib
+import json
 import os
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timezone
 from email.utils import format_datetime
 from pathlib import Path
-from typing import Any
+from typing import IO, Any, Callable, Iterable, Iterator, Optional
+from urllib.parse import urljoin
 import xml.etree.ElementTree as ET
 
-from dotenv import load_dotenv
-
-from .archive import load_archive
+from .archive import load_archive, podcasts_path_for
+from .artifacts import artifact_path_for, etag_path_for, parse_codecs, write_artifacts
+from .environment import getenv
 
 
 FEED_PATH = Path("data/feed.xml")
 ITUNES_NS = "http://www.itunes.com/dtds/podcast-1.0.dtd"
 PODCAST_NS = "https://podcastindex.org/namespace/1.0"
 ATOM_NS = "http://www.w3.org/2005/Atom"
+FH_NS = "http://purl.org/syndication/history/1.0"
+JSON_FEED_VERSION = "https://jsonfeed.org/version/1.1"
+FEED_FORMATS = ("rss", "atom", "json")
+FRAGMENT_VERSION = 2
+MANIFEST_VERSION = 3
 
 ET.register_namespace("itunes", ITUNES_NS)
 ET.register_namespace("podcast", PODCAST_NS)
 ET.register_namespace("atom", ATOM_NS)
+ET.register_namespace("fh", FH_NS)
 
 
-def generate_feed(archive_path: Path = Path("data/archive.json")) -> str:
-    load_dotenv()
-    feed_days = int(os.getenv("FEED_DAYS", "30"))
-    base_url = os.getenv("PASTPUZZLE_URL", "https://www.pastpuzzle.de/")
-    feed_url = os.getenv("FEED_URL", "")
-    include_non_audio = os.getenv("INCLUDE_NON_AUDIO", "0") in {"1", "true", "yes"}
-    author = os.getenv("PODCAST_AUTHOR", "PastPuzzle")
-    summary = os.getenv(
-        "PODCAST_SUMMARY",
-        "Daily PastPuzzle podcast feed with historical clues and audio highlights.",
-    )
-    language = os.getenv("PODCAST_LANGUAGE", "de")
-    category = os.getenv("PODCAST_CATEGORY", "History")
-    explicit = os.getenv("PODCAST_EXPLICIT", "no")
-    image_url = os.getenv("PODCAST_IMAGE_URL", "")
+@dataclass(frozen=True)
+class FeedOutput:
+    """One configured output file, written next to the main feed."""
+
+    format: str
+    name: str
+    include_non_audio: bool
+
+
+@dataclass(frozen=True)
+class FeedConfig:
+    feed_days: int = 30
+    base_url: str = "https://www.pastpuzzle.de/"
+    feed_url: str = ""
+    include_non_audio: bool = False
+    author: str = "PastPuzzle"
+    summary: str = "Daily PastPuzzle podcast feed with historical clues and audio highlights."
+    language: str = "de"
+    category: str = "History"
+    explicit: str = "no"
+    image_url: str = ""
+    archive_pages: str | int | None = None
+    precompress: tuple[str, ...] = ()
+    outputs: tuple[FeedOutput, ...] = ()
+
+    @classmethod
+    def from_env(cls) -> "FeedConfig":
+        include_non_audio = getenv("INCLUDE_NON_AUDIO", "0") in {"1", "true", "yes"}
+        return cls(
+            feed_days=int(getenv("FEED_DAYS", "30")),
+            base_url=getenv("PASTPUZZLE_URL", cls.base_url),
+            feed_url=getenv("FEED_URL", ""),
+            include_non_audio=include_non_audio,
+            author=getenv("PODCAST_AUTHOR", cls.author),
+            summary=getenv("PODCAST_SUMMARY", cls.summary),
+            language=getenv("PODCAST_LANGUAGE", cls.language),
+            category=getenv("PODCAST_CATEGORY", cls.category),
+            explicit=getenv("PODCAST_EXPLICIT", cls.explicit),
+            image_url=getenv("PODCAST_IMAGE_URL", ""),
+            archive_pages=_parse_archive_pages(getenv("FEED_ARCHIVE_PAGES", "")),
+            precompress=tuple(parse_codecs(getenv("FEED_PRECOMPRESS"))),
+            outputs=_parse_outputs(getenv("FEED_OUTPUTS", ""), include_non_audio),
+        )
+
+    def outputs_for(self, feed_path: Path) -> list[FeedOutput]:
+        """Configured outputs, or a single RSS feed at ``feed_path``."""
+        if self.outputs:
+            return list(self.outputs)
+        return [FeedOutput("rss", feed_path.name, self.include_non_audio)]
+
+    def fingerprint(self) -> str:
+        payload = json.dumps([FRAGMENT_VERSION, asdict(self)], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class FeedPage:
+    """One feed document: a subscription feed or an RFC 5005 archive page."""
+
+    name: str
+    records: list[dict[str, Any]]
+    self_url: str
+    start: int = 0
+    links: list[tuple[str, str]] = field(default_factory=list)
+    archived: bool = False
+
+
+@dataclass
+class FeedItem:
+    title: str
+    link: str
+    guid: str
+    published: datetime
+    description: str
+    enclosure: Optional[dict[str, str]] = None
+
+
+@dataclass
+class _Entry:
+    """Format-independent work for one podcast or extra tip of a record."""
+
+    kind: str
+    source: dict[str, Any]
+    description: str
+    published: datetime
+
+
+class FragmentRenderer:
+    """Render per-record fragments for each output, reusing an on-disk cache.
+
+    Fragments are keyed by a hash of the record, the output format and variant, and
+    the settings that affect item rendering, so only new or changed days are rendered
+    again. Selection, descriptions and date parsing for a record are done once per
+    build and shared by all outputs.
+    """
+
+    def __init__(self, config: FeedConfig, cache_path: Optional[Path] = None) -> None:
+        self.config = config
+        self.cache_path = cache_path
+        self.cache = _load_fragment_cache(cache_path) if cache_path else {}
+        self.fragments: dict[str, str] = {}
+        self._entries: dict[int, list[_Entry]] = {}
+        self._settings = json.dumps(
+            [FRAGMENT_VERSION, config.base_url, config.author, config.explicit]
+        )
+
+    def render(self, record: dict[str, Any], output: FeedOutput) -> str:
+        fingerprint = f"{self._settings}|{output.format}|{output.include_non_audio}"
+        key = _fragment_key(record, fingerprint)
+        fragment = self.fragments.get(key)
+        if fragment is None:
+            fragment = self.cache.get(key)
+            if fragment is None:
+                entries = self._entries.get(id(record))
+                if entries is None:
+                    entries = self._entries[id(record)] = _record_entries(record)
+                items = _variant_items(record, entries, output.include_non_audio, self.config)
+                fragment = ITEM_RENDERERS[output.format](items, self.config)
+            self.fragments[key] = fragment
+        return fragment
+
+    def save(self) -> None:
+        if self.cache_path and self.fragments != self.cache:
+            _save_fragment_cache(self.fragments, self.cache_path)
+
+
+class ChangedFileWriter:
+    """Write text to a temporary file while comparing it with the existing file.
+
+    Neither document is held in memory; ``commit`` replaces the target only when the
+    content differs and returns True in that case.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.temp_path = path.with_name(f".{path.name}.tmp")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._existing: Optional[IO[bytes]] = path.open("rb") if path.exists() else None
+        self._unchanged = self._existing is not None
+        self._handle = self.temp_path.open("wb")
+
+    def write(self, chunk: str) -> None:
+        data = chunk.encode("utf-8")
+        if self._unchanged and self._existing.read(len(data)) != data:
+            self._unchanged = False
+        self._handle.write(data)
+
+    def commit(self) -> bool:
+        self._handle.close()
+        if self._unchanged and self._existing.read(1):
+            self._unchanged = False
+        self._close_existing()
+        if self._unchanged:
+            self.temp_path.unlink()
+            return False
+        os.replace(self.temp_path, self.path)
+        return True
+
+    def abort(self) -> None:
+        self._handle.close()
+        self._close_existing()
+        self.temp_path.unlink(missing_ok=True)
+
+    def _close_existing(self) -> None:
+        if self._existing is not None:
+            self._existing.close()
+            self._existing = None
+
+
+class _PageStream:
+    """Writes one page's chunks, adding separators between JSON Feed items."""
 
+    def __init__(
+        self,
+        config: FeedConfig,
+        output: FeedOutput,
+        page: FeedPage,
+        write: Callable[[str], None],
+    ) -> None:
+        self.output = output
+        self.page = page
+        self.write = write
+        self.stop = page.start + len(page.records)
+        self._head, self._tail = HEAD_RENDERERS[output.format](config, output, page)
+        self._has_items = False
+
+    def head(self) -> None:
+        self.write(self._head)
+
+    def add(self, fragment: str) -> None:
+        if not fragment:
+            return
+        if self.output.format == "json" and self._has_items:
+            self.write(",")
+        self.write(fragment)
+        self._has_items = True
+
+    def tail(self) -> None:
+        self.write(self._tail)
+
+
+def generate_feed(
+    archive_path: Path = Path("data/archive.json"),
+    cache_path: Optional[Path] = None,
+    config: Optional[FeedConfig] = None,
+) -> str:
+    return "".join(iter_feed(archive_path, cache_path=cache_path, config=config))
+
+
+def iter_feed(
+    archive_path: Path = Path("data/archive.json"),
+    cache_path: Optional[Path] = None,
+    config: Optional[FeedConfig] = None,
+) -> Iterator[str]:
+    """Yield the main subscription feed as text chunks: header, one chunk per day, footer."""
+    config = config or FeedConfig.from_env()
+    renderer = FragmentRenderer(config, cache_path)
+    output = config.outputs_for(FEED_PATH)[0]
+    current = plan_pages(load_archive(archive_path), config, output, output.name)[0]
+    yield from iter_page(current, output, renderer)
+    renderer.save()
+
+
+def iter_page(page: FeedPage, output: FeedOutput, renderer: FragmentRenderer) -> Iterator[str]:
+    chunks: list[str] = []
+    stream = _PageStream(renderer.config, output, page, chunks.append)
+    stream.head()
+    for record in page.records:
+        stream.add(renderer.render(record, output))
+        yield from chunks
+        chunks.clear()
+    stream.tail()
+    yield from chunks
+
+
+def plan_pages(
+    records: list[dict[str, Any]],
+    config: FeedConfig,
+    output: FeedOutput,
+    primary_name: str,
+) -> list[FeedPage]:
+    """Split records into the subscription feed followed by archive pages, oldest first.
+
+    Archive pages (RFC 5005) are grouped by year or by a fixed number of days,
+    according to ``FEED_ARCHIVE_PAGES``, and are only produced for RSS outputs. They
+    hold only records older than the subscription window, and a page is published
+    once it is complete (a year before the window's, or a full run of days), so an
+    archive document never changes after it first appears.
+    """
+    feed_url = config.feed_url
+    start = max(len(records) - config.feed_days, 0) if config.feed_days > 0 else 0
+    if output.name == primary_name:
+        self_url = feed_url
+    else:
+        self_url = _page_href(feed_url, output.name) if feed_url else ""
+    current = FeedPage(name=output.name, records=records[start:], self_url=self_url, start=start)
+    mode = config.archive_pages
+    if not mode or output.format != "rss" or start == 0:
+        return [current]
+
+    stem, suffix = Path(output.name).stem, Path(output.name).suffix
+    if mode == "year":
+        window_year = str(records[start].get("date", ""))[:4]
+        archived = records[:start]
+    else:
+        window_year = ""
+        archived = records[: start - start % mode]
+    pages: list[FeedPage] = []
+    page_key = None
+    for position, record in enumerate(archived):
+        if mode == "year":
+            key = str(record.get("date", ""))[:4]
+            # Undated records have no year page; the window's year is still growing.
+            if not key or key >= window_year:
+                continue
+        else:
+            key = f"page-{position // mode + 1}"
+        if key != page_key:
+            name = f"{stem}-{key}{suffix}"
+            pages.append(
+                FeedPage(
+                    name=name,
+                    records=[],
+                    self_url=_page_href(feed_url, name) if feed_url else "",
+                    start=position,
+                    archived=True,
+                )
+            )
+            page_key = key
+        pages[-1].records.append(record)
+    current_href = self_url or output.name
+    for position, page in enumerate(pages):
+        page.links.append(("current", current_href))
+        if position > 0:
+            page.links.append(("prev-archive", _page_href(feed_url, pages[position - 1].name)))
+        if position + 1 < len(pages):
+            page.links.append(("next-archive", _page_href(feed_url, pages[position + 1].name)))
+    if pages:
+        current.links.append(("prev-archive", _page_href(feed_url, pages[-1].name)))
+    return [current, *pages]
+
+
+def write_feed(
+    feed_path: Path = FEED_PATH,
+    archive_path: Path = Path("data/archive.json"),
+    config: Optional[FeedConfig] = None,
+) -> bool:
+    """Write every configured output, its archive pages and precompressed copies.
+
+    All documents are produced in a single walk over the archive records. Returns
+    True when a feed document changed.
+    """
+    config = config or FeedConfig.from_env()
+    inputs = feed_inputs(archive_path, config)
+    previous = _load_manifest(manifest_path_for(feed_path))
     records = load_archive(archive_path)
-    selected = records[-feed_days:] if feed_days > 0 else records
-    if not image_url and selected:
-        image_url = selected[-1].get("cover_image") or ""
+    outputs = config.outputs_for(feed_path)
+    targets = [
+        (output, page)
+        for output in outputs
+        for page in plan_pages(records, config, output, outputs[0].name)
+    ]
+    renderer = FragmentRenderer(config, fragment_cache_path_for(feed_path))
+    changed = _write_pages(records, targets, renderer, feed_path.parent)
+    renderer.save()
+
+    hashes: dict[str, str] = {}
+    for _, page in targets:
+        page_path = feed_path.with_name(page.name)
+        write_artifacts(page_path, list(config.precompress))
+        for output_path in [
+            page_path,
+            etag_path_for(page_path),
+            *(artifact_path_for(page_path, codec) for codec in config.precompress),
+        ]:
+            hashes[output_path.name] = _hash_files([output_path])
+    # Pages (and their copies) that the plan no longer produces, e.g. after changing
+    # FEED_ARCHIVE_PAGES; only files listed in the previous manifest are removed.
+    for name in previous.get("outputs", {}):
+        if name not in hashes and feed_path.with_name(name).exists():
+            feed_path.with_name(name).unlink()
+            changed = True
+    _save_manifest({**inputs, "outputs": hashes}, manifest_path_for(feed_path))
+    return changed
+
+
+def feed_is_current(
+    feed_path: Path = FEED_PATH,
+    archive_path: Path = Path("data/archive.json"),
+    config: Optional[FeedConfig] = None,
+) -> bool:
+    """Return True when the manifest shows the feed was built from the current inputs."""
+    manifest = _load_manifest(manifest_path_for(feed_path))
+    if not manifest:
+        return False
+    outputs = {name: _hash_files([feed_path.with_name(name)]) for name in manifest["outputs"]}
+    return manifest == {**feed_inputs(archive_path, config), "outputs": outputs}
+
+
+def feed_inputs(
+    archive_path: Path = Path("data/archive.json"), config: Optional[FeedConfig] = None
+) -> dict[str, Any]:
+    """Hashes of everything that determines the feed content."""
+    config = config or FeedConfig.from_env()
+    return {
+        "version": MANIFEST_VERSION,
+        "archive": _hash_files([archive_path, podcasts_path_for(archive_path)]),
+        "config": config.fingerprint(),
+    }
+
+
+def write_if_changed(path: Path, chunks: Iterable[str]) -> bool:
+    """Stream chunks to ``path``, leaving the file untouched when content is equal.
+
+    Returns True when ``path`` changed.
+    """
+    writer = ChangedFileWriter(path)
+    try:
+        for chunk in chunks:
+            writer.write(chunk)
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.commit()
+
+
+def fragment_cache_path_for(feed_path: Path) -> Path:
+    return feed_path.with_name("feed_fragments.json")
+
+
+def manifest_path_for(feed_path: Path) -> Path:
+    return feed_path.with_name(f"{feed_path.name}.manifest.json")
+
+
+def _write_pages(
+    records: list[dict[str, Any]],
+    targets: list[tuple[FeedOutput, FeedPage]],
+    renderer: FragmentRenderer,
+    directory: Path,
+) -> bool:
+    """Stream every target page while walking the records once.
+
+    Pages cover contiguous record ranges, so each one is opened at its first record
+    and committed after its last; at most one page per output is open at a time.
+    """
+    starts: dict[int, list[tuple[FeedOutput, FeedPage]]] = {}
+    for output, page in targets:
+        starts.setdefault(page.start if page.records else -1, []).append((output, page))
+    open_pages: list[tuple[_PageStream, ChangedFileWriter]] = []
+    changed = False
 
+    def open_page(output: FeedOutput, page: FeedPage) -> None:
+        writer = ChangedFileWriter(directory / page.name)
+        stream = _PageStream(renderer.config, output, page, writer.write)
+        stream.head()
+        open_pages.append((stream, writer))
+
+    def close_pages(position: int) -> bool:
+        closed = False
+        for stream, writer in list(open_pages):
+            if stream.stop <= position:
+                stream.tail()
+                closed = writer.commit() or closed
+                open_pages.remove((stream, writer))
+        return closed
+
+    try:
+        for output, page in starts.get(-1, []):
+            open_page(output, page)
+        changed = close_pages(0) or changed
+        for position, record in enumerate(records):
+            for output, page in starts.get(position, []):
+                open_page(output, page)
+            for stream, _ in open_pages:
+                stream.add(renderer.render(record, stream.output))
+            changed = close_pages(position + 1) or changed
+    except BaseException:
+        for _, writer in open_pages:
+            writer.abort()
+        raise
+    return changed
+
+
+def _load_manifest(path: Path) -> dict[str, Any]:
+    """The saved manifest, or ``{}`` when it is missing or unreadable."""
+    try:
+        with path.open("r", encoding="utf-8") as handle:
+            manifest = json.load(handle)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("outputs"), dict):
+        return {}
+    return manifest
+
+
+def _save_manifest(manifest: dict[str, Any], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=2, sort_keys=True)
+        handle.write("\n")
+
+
+def _hash_files(paths: list[Path]) -> str:
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(path.name.encode("utf-8") + b"\0")
+        if not path.exists():
+            digest.update(b"missing\0")
+            continue
+        with path.open("rb") as handle:
+            for block in iter(lambda: handle.read(1 << 16), b""):
+                digest.update(block)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _last_build_date(records: list[dict[str, Any]]) -> Optional[datetime]:
+    """Use the newest archived day so identical content yields an identical feed."""
+    dates = [record["date"] for record in records if record.get("date")]
+    if not dates:
+        return None
+    return _parse_date(max(dates))
+
+
+def _parse_archive_pages(value: str) -> str | int | None:
+    value = value.strip().lower()
+    if value in {"", "0", "no", "off"}:
+        return None
+    if value == "year":
+        return "year"
+    if value.isdigit():
+        return int(value)
+    raise ValueError("FEED_ARCHIVE_PAGES must be 'year' or a positive number of days.")
+
+
+def _parse_outputs(value: str, include_non_audio: bool) -> tuple[FeedOutput, ...]:
+    """Parse ``FEED_OUTPUTS`` entries such as ``rss:feed.xml,rss+all:feed-all.xml``."""
+    outputs = []
+    for entry in value.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        kind, separator, name = entry.partition(":")
+        feed_format, _, variant = kind.strip().lower().partition("+")
+        if not separator or not name.strip() or feed_format not in FEED_FORMATS:
+            raise ValueError(
+                f"FEED_OUTPUTS entry {entry!r} must look like 'rss:feed.xml', "
+                "'rss+all:feed-all.xml', 'atom:feed.atom' or 'json:feed.json'."
+            )
+        if variant not in {"", "all", "audio"}:
+            raise ValueError(f"FEED_OUTPUTS variant must be 'all' or 'audio' (got {variant!r}).")
+        include = include_non_audio if not variant else variant == "all"
+        outputs.append(FeedOutput(feed_format, Path(name.strip()).name, include))
+    return tuple(outputs)
+
+
+def _page_href(feed_url: str, name: str) -> str:
+    return urljoin(feed_url, name) if feed_url else name
+
+
+def _page_image(config: FeedConfig, page: FeedPage) -> str:
+    if config.image_url:
+        return config.image_url
+    if page.records:
+        return page.records[-1].get("cover_image") or ""
+    return ""
+
+
+def _render_rss_head(config: FeedConfig, output: FeedOutput, page: FeedPage) -> tuple[str, str]:
+    """Serialize the channel header and return the text around the item slot."""
+    feed_url = config.feed_url
+    image_url = _page_image(config, page)
+    last_build = _last_build_date(page.records)
     rss = ET.Element("rss", version="2.0")
     channel = ET.SubElement(rss, "channel")
     ET.SubElement(channel, "title").text = "PastPuzzle"
-    ET.SubElement(channel, "link").text = base_url
-    ET.SubElement(channel, "description").text = summary
-    ET.SubElement(channel, "language").text = language
-    if feed_url:
+    ET.SubElement(channel, "link").text = config.base_url
+    ET.SubElement(channel, "description").text = config.summary
+    ET.SubElement(channel, "language").text = config.language
+    if page.self_url:
         atom_link = ET.SubElement(channel, f"{{{ATOM_NS}}}link")
-        atom_link.set("href", feed_url)
+        atom_link.set("href", page.self_url)
         atom_link.set("rel", "self")
         atom_link.set("type", "application/rss+xml")
-    ET.SubElement(channel, f"{{{ITUNES_NS}}}summary").text = summary
-    ET.SubElement(channel, f"{{{ITUNES_NS}}}author").text = author
-    ET.SubElement(channel, f"{{{ITUNES_NS}}}explicit").text = explicit
+    for rel, href in page.links:
+        atom_link = ET.SubElement(channel, f"{{{ATOM_NS}}}link")
+        atom_link.set("href", href)
+        atom_link.set("rel", rel)
+        atom_link.set("type", "application/rss+xml")
+    if page.archived:
+        ET.SubElement(channel, f"{{{FH_NS}}}archive")
+    ET.SubElement(channel, f"{{{ITUNES_NS}}}summary").text = config.summary
+    ET.SubElement(channel, f"{{{ITUNES_NS}}}author").text = config.author
+    ET.SubElement(channel, f"{{{ITUNES_NS}}}explicit").text = config.explicit
     if image_url:
         image = ET.SubElement(channel, f"{{{ITUNES_NS}}}image")
         image.set("href", image_url)
     category_element = ET.SubElement(channel, f"{{{ITUNES_NS}}}category")
-    category_element.set("text", category)
+    category_element.set("text", config.category)
     ET.SubElement(channel, f"{{{PODCAST_NS}}}locked").text = "no"
     if feed_url:
         ET.SubElement(channel, f"{{{PODCAST_NS}}}guid").text = feed_url
-    ET.SubElement(channel, "lastBuildDate").text = _format_rfc822(datetime.now(timezone.utc))
-
-    for record in selected:
-        date_value = record["date"]
-        podcasts = _select_podcasts(record)
-        extras = _select_extras(record) if include_non_audio else []
-        item_counter = 0
-        for podcast in podcasts:
-            enclosure_url = podcast.get("audio_url")
-            if not enclosure_url and not include_non_audio:
-                continue
-            item_counter += 1
-            item = ET.SubElement(channel, "item")
-            title_suffix = f" Podcast {item_counter}" if len(podcasts) + len(extras) > 1 else ""
-            item_title = podcast.get("title") or f"PastPuzzle – {date_value}{title_suffix}"
-            ET.SubElement(item, "title").text = item_title
-            ET.SubElement(item, "link").text = (
-                podcast.get("page_url") or record.get("source_url") or base_url
+    if last_build:
+        ET.SubElement(channel, "lastBuildDate").text = _format_rfc822(last_build)
+
+    xml_bytes = ET.tostring(rss, encoding="utf-8", xml_declaration=True)
+    head, tail = xml_bytes.decode("utf-8").rsplit("</channel>", 1)
+    return head, "</channel>" + tail + "\n"
+
+
+def _render_atom_head(config: FeedConfig, output: FeedOutput, page: FeedPage) -> tuple[str, str]:
+    last_build = _last_build_date(page.records) or datetime(1970, 1, 1, tzinfo=timezone.utc)
+    image_url = _page_image(config, page)
+    parts = [
+        "<?xml version='1.0' encoding='utf-8'?>\n",
+        f'<feed xmlns="{ATOM_NS}">',
+        _xml_element("title", "PastPuzzle"),
+        _xml_element("subtitle", config.summary),
+        _xml_element("id", page.self_url or config.base_url),
+        _xml_element("updated", last_build.isoformat()),
+        _xml_element("link", attributes={"href": config.base_url, "rel": "alternate"}),
+    ]
+    if page.self_url:
+        parts.append(
+            _xml_element(
+                "link",
+                attributes={"href": page.self_url, "rel": "self", "type": "application/atom+xml"},
             )
-            guid_suffix = f":{item_counter}" if len(podcasts) + len(extras) > 1 else ""
-            ET.SubElement(item, "guid").text = f"pastpuzzle:{date_value}{guid_suffix}"
-            pub_date_value = podcast.get("pub_date") or date_value
-            pub_date = datetime.fromisoformat(pub_date_value).replace(tzinfo=timezone.utc)
-            ET.SubElement(item, "pubDate").text = _format_rfc822(pub_date)
-
-            if enclosure_url:
-                enclosure = ET.SubElement(item, "enclosure")
-                enclosure.set("url", enclosure_url)
-                enclosure.set("length", str(podcast.get("length", 0)))
-                enclosure.set("type", podcast.get("content_type", "audio/mpeg"))
-
-            description_text = _format_description(record, podcast)
-            description_element = ET.SubElement(item, "description")
-            description_element.text = description_text
-            ET.SubElement(item, f"{{{ITUNES_NS}}}summary").text = description_text
-            ET.SubElement(item, f"{{{ITUNES_NS}}}author").text = author
-            ET.SubElement(item, f"{{{ITUNES_NS}}}explicit").text = explicit
-
-        for extra in extras:
-            item_counter += 1
-            item = ET.SubElement(channel, "item")
-            title_suffix = f" Item {item_counter}" if len(podcasts) + len(extras) > 1 else ""
-            extra_title = extra.get("title") or f"PastPuzzle – {date_value}{title_suffix}"
-            ET.SubElement(item, "title").text = extra_title
-            ET.SubElement(item, "link").text = (
-                extra.get("page_url") or record.get("source_url") or base_url
+        )
+    parts.append(f"<author>{_xml_element('name', config.author)}</author>")
+    if image_url:
+        parts.append(_xml_element("logo", image_url))
+    return "".join(parts), "</feed>\n"
+
+
+def _render_json_head(config: FeedConfig, output: FeedOutput, page: FeedPage) -> tuple[str, str]:
+    document: dict[str, Any] = {
+        "version": JSON_FEED_VERSION,
+        "title": "PastPuzzle",
+        "home_page_url": config.base_url,
+    }
+    if page.self_url:
+        document["feed_url"] = page.self_url
+    document["description"] = config.summary
+    image_url = _page_image(config, page)
+    if image_url:
+        document["icon"] = image_url
+    document["authors"] = [{"name": config.author}]
+    document["language"] = config.language
+    document["items"] = []
+    text = json.dumps(document, ensure_ascii=False)
+    return text[: -len("]}")], "]}\n"
+
+
+def _record_entries(record: dict[str, Any]) -> list[_Entry]:
+    date_value = record["date"]
+    entries = []
+    for podcast in _select_podcasts(record):
+        entries.append(
+            _Entry(
+                kind="podcast",
+                source=podcast,
+                description=_format_description(record, podcast),
+                published=_parse_date(podcast.get("pub_date") or date_value),
             )
-            guid_suffix = f":{item_counter}" if len(podcasts) + len(extras) > 1 else ""
-            ET.SubElement(item, "guid").text = f"pastpuzzle:{date_value}{guid_suffix}"
-            pub_date = datetime.fromisoformat(date_value).replace(tzinfo=timezone.utc)
-            ET.SubElement(item, "pubDate").text = _format_rfc822(pub_date)
-
-            description_text = _format_description(record, extra)
-            description_element = ET.SubElement(item, "description")
-            description_element.text = description_text
-            ET.SubElement(item, f"{{{ITUNES_NS}}}summary").text = description_text
-            ET.SubElement(item, f"{{{ITUNES_NS}}}author").text = author
-            ET.SubElement(item, f"{{{ITUNES_NS}}}explicit").text = explicit
+        )
+    for extra in _select_extras(record):
+        entries.append(
+            _Entry(
+                kind="extra",
+                source=extra,
+                description=_format_description(record, extra),
+                published=_parse_date(date_value),
+            )
+        )
+    return entries
 
-    xml_bytes = ET.tostring(rss, encoding="utf-8", xml_declaration=True)
-    xml_text = xml_bytes.decode("utf-8")
-    xml_text = xml_text + "\n"
-    return xml_text
 
+def _variant_items(
+    record: dict[str, Any],
+    entries: list[_Entry],
+    include_non_audio: bool,
+    config: FeedConfig,
+) -> list[FeedItem]:
+    """Number and title a record's entries for the audio-only or all-tips variant."""
+    date_value = record["date"]
+    podcasts = [entry for entry in entries if entry.kind == "podcast"]
+    extras = [entry for entry in entries if entry.kind == "extra"] if include_non_audio else []
+    numbered = len(podcasts) + len(extras) > 1
+    items = []
+    item_counter = 0
+    for entry in podcasts:
+        podcast = entry.source
+        enclosure_url = podcast.get("audio_url")
+        if not enclosure_url and not include_non_audio:
+            continue
+        item_counter += 1
+        title_suffix = f" Podcast {item_counter}" if numbered else ""
+        enclosure = None
+        if enclosure_url:
+            enclosure = {
+                "url": enclosure_url,
+                "length": str(podcast.get("length", 0)),
+                "type": podcast.get("content_type", "audio/mpeg"),
+            }
+        items.append(
+            FeedItem(
+                title=podcast.get("title") or f"PastPuzzle – {date_value}{title_suffix}",
+                link=podcast.get("page_url") or record.get("source_url") or config.base_url,
+                guid=f"pastpuzzle:{date_value}" + (f":{item_counter}" if numbered else ""),
+                published=entry.published,
+                description=entry.description,
+                enclosure=enclosure,
+            )
+        )
 
-def write_feed(feed_path: Path = FEED_PATH, archive_path: Path = Path("data/archive.json")) -> bool:
-    content = generate_feed(archive_path)
-    if feed_path.exists():
-        existing = feed_path.read_text(encoding="utf-8")
-        if existing == content:
-            return False
-    feed_path.parent.mkdir(parents=True, exist_ok=True)
-    feed_path.write_text(content, encoding="utf-8")
-    return True
+    for entry in extras:
+        extra = entry.source
+        item_counter += 1
+        title_suffix = f" Item {item_counter}" if numbered else ""
+        items.append(
+            FeedItem(
+                title=extra.get("title") or f"PastPuzzle – {date_value}{title_suffix}",
+                link=extra.get("page_url") or record.get("source_url") or config.base_url,
+                guid=f"pastpuzzle:{date_value}" + (f":{item_counter}" if numbered else ""),
+                published=entry.published,
+                description=entry.description,
+            )
+        )
+    return items
+
+
+def _render_rss_items(items: list[FeedItem], config: FeedConfig) -> str:
+    parts = []
+    for item in items:
+        parts.extend(
+            [
+                "<item>",
+                _xml_element("title", item.title),
+                _xml_element("link", item.link),
+                _xml_element("guid", item.guid),
+                _xml_element("pubDate", _format_rfc822(item.published)),
+            ]
+        )
+        if item.enclosure:
+            parts.append(_xml_element("enclosure", attributes=item.enclosure))
+        parts.extend(
+            [
+                _xml_element("description", item.description),
+                _xml_element("itunes:summary", item.description),
+                _xml_element("itunes:author", config.author),
+                _xml_element("itunes:explicit", config.explicit),
+                "</item>",
+            ]
+        )
+    return "".join(parts)
+
+
+def _render_atom_items(items: list[FeedItem], config: FeedConfig) -> str:
+    parts = []
+    for item in items:
+        published = item.published.isoformat()
+        parts.extend(
+            [
+                "<entry>",
+                _xml_element("title", item.title),
+                _xml_element("id", item.guid),
+                _xml_element("link", attributes={"href": item.link, "rel": "alternate"}),
+                _xml_element("published", published),
+                _xml_element("updated", published),
+                _xml_element("summary", item.description),
+            ]
+        )
+        if item.enclosure:
+            parts.append(
+                _xml_element(
+                    "link",
+                    attributes={
+                        "href": item.enclosure["url"],
+                        "rel": "enclosure",
+                        "type": item.enclosure["type"],
+                        "length": item.enclosure["length"],
+                    },
+                )
+            )
+        parts.append("</entry>")
+    return "".join(parts)
+
+
+def _render_json_items(items: list[FeedItem], config: FeedConfig) -> str:
+    parts = []
+    for item in items:
+        entry: dict[str, Any] = {
+            "id": item.guid,
+            "url": item.link,
+            "title": item.title,
+            "content_text": item.description,
+            "date_published": item.published.isoformat(),
+        }
+        if item.enclosure:
+            attachment: dict[str, Any] = {
+                "url": item.enclosure["url"],
+                "mime_type": item.enclosure["type"],
+            }
+            length = item.enclosure["length"]
+            if length.isdigit() and int(length) > 0:
+                attachment["size_in_bytes"] = int(length)
+            entry["attachments"] = [attachment]
+        parts.append(json.dumps(entry, ensure_ascii=False))
+    return ",".join(parts)
+
+
+HEAD_RENDERERS = {
+    "rss": _render_rss_head,
+    "atom": _render_atom_head,
+    "json": _render_json_head,
+}
+ITEM_RENDERERS = {
+    "rss": _render_rss_items,
+    "atom": _render_atom_items,
+    "json": _render_json_items,
+}
+
+
+def _xml_element(
+    tag: str, text: Optional[str] = None, attributes: Optional[dict[str, str]] = None
+) -> str:
+    """Serialize a leaf element exactly like ElementTree does."""
+    attrs = "".join(
+        f' {name}="{_escape_attribute(value)}"' for name, value in (attributes or {}).items()
+    )
+    if not text:
+        return f"<{tag}{attrs} />"
+    return f"<{tag}{attrs}>{_escape_text(text)}</{tag}>"
+
+
+def _escape_text(value: str) -> str:
+    return value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _escape_attribute(value: str) -> str:
+    return (
+        _escape_text(value)
+        .replace('"', "&quot;")
+        .replace("\r", "&#13;")
+        .replace("\n", "&#10;")
+        .replace("\t", "&#09;")
+    )
+
+
+def _fragment_key(record: dict[str, Any], fingerprint: str) -> str:
+    payload = json.dumps(record, sort_keys=True, ensure_ascii=True, default=str)
+    return hashlib.sha256(f"{fingerprint}\n{payload}".encode("utf-8")).hexdigest()
+
+
+def _load_fragment_cache(path: Path) -> dict[str, str]:
+    if not path.exists():
+        return {}
+    try:
+        with path.open("r", encoding="utf-8") as handle:
+            data = json.load(handle)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _save_fragment_cache(fragments: dict[str, str], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as handle:
+        json.dump(fragments, handle, ensure_ascii=False)
+        handle.write("\n")
+
+
+def _parse_date(value: str) -> datetime:
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
 
 
 def _format_rfc822(value: datetime) -> str:
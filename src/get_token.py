@@ -1,36 +1,67 @@
-import base64
 import json
 import os
 import re
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlparse
 
 import click
-from playwright.sync_api import sync_playwright
+import httpx
 from dotenv import load_dotenv
 
+from .auth import (
+    auth_base_url,
+    decode_jwt_payload,
+    load_session,
+    save_session,
+    storage_state_path,
+    token_grant,
+)
+from .scrape import http_client
+
+# Playwright is imported only when the direct Supabase grants fail.
+
 URL = "https://www.pastpuzzle.de/#/login"
+ANON_KEY_CACHE_PATH = Path("data/anon_key_cache.json")
+BUNDLE_WORKERS = 6
+BUNDLE_TIMEOUT = 15
+SCAN_OVERLAP = 4096
+# Images, fonts, media and analytics are not needed to log in; blocking them lets the
+# app reach its login form and token call much sooner.
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+BLOCKED_HOSTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "facebook.net",
+    "hotjar.com",
+    "plausible.io",
+)
+# Per-frame slice when racing a selector across several frames.
+FRAME_WAIT_MS = 250
+TOKEN_RESPONSE_TIMEOUT_MS = 30000
+ACCESS_TOKEN_SCRIPT = """
+() => {
+  const keys = Object.keys(localStorage).concat(Object.keys(sessionStorage));
+  for (const key of keys) {
+    if (!key.includes("auth-token")) continue;
+    const raw = localStorage.getItem(key) || sessionStorage.getItem(key);
+    if (!raw) continue;
+    try {
+      const parsed = JSON.parse(raw);
+      if (parsed && parsed.access_token) return parsed.access_token;
+    } catch (err) {}
+  }
+  return null;
+}
+"""
 
 
 def _extract_access_token(page) -> str | None:
-    script = """
-    () => {
-      const keys = Object.keys(localStorage).concat(Object.keys(sessionStorage));
-      for (const key of keys) {
-        if (!key.includes("auth-token")) continue;
-        const raw = localStorage.getItem(key) || sessionStorage.getItem(key);
-        if (!raw) continue;
-        try {
-          const parsed = JSON.parse(raw);
-          if (parsed && parsed.access_token) return parsed.access_token;
-        } catch (err) {}
-      }
-      return null;
-    }
-    """
-    return page.evaluate(script)
+    return page.evaluate(ACCESS_TOKEN_SCRIPT)
 
 
 def _extract_token_from_requests(page) -> str | None:
@@ -70,18 +101,77 @@ def _extract_token_from_storage_dump(page) -> str | None:
     is_flag=True,
     help="Persist tokens into .env as PASTPUZZLE_AUTHORIZATION (and API key if found).",
 )
-def main(write_env: bool = False) -> None:
+@click.option(
+    "--browser",
+    "force_browser",
+    is_flag=True,
+    help="Skip the direct Supabase grants and log in through a headless browser.",
+)
+def main(write_env: bool = False, force_browser: bool = False) -> None:
     load_dotenv()
-    username = os.environ["PASTPUZZLE_USER"]
-    password = os.environ["PASTPUZZLE_PASS"]
+    tokens = None if force_browser else _login_via_http()
+    if tokens is None:
+        tokens = _login_via_browser(os.environ["PASTPUZZLE_USER"], os.environ["PASTPUZZLE_PASS"])
+    access_token, api_key = tokens
+    if write_env:
+        _persist_tokens_to_env(access_token, api_key)
+    print(f"PASTPUZZLE_AUTHORIZATION={access_token}")
+    if api_key:
+        print(f"PASTPUZZLE_API_KEY={api_key}")
+
+
+def _login_via_http() -> tuple[str, str | None] | None:
+    """Refresh-token grant, then password grant, straight against Supabase auth.
+
+    Uses PASTPUZZLE_API_KEY, or the anon key discovered from the app's bundles.
+    Returns None when neither grant works, so the caller can fall back to the browser.
+    """
+    grants = []
+    session = load_session(storage_state_path())
+    if session and session.get("refresh_token"):
+        grants.append(("refresh_token", {"refresh_token": session["refresh_token"]}))
+    username = os.getenv("PASTPUZZLE_USER")
+    password = os.getenv("PASTPUZZLE_PASS")
+    if username and password:
+        grants.append(("password", {"email": username, "password": password}))
+    if not grants:
+        # Nothing to exchange, so skip the bundle scan for the anon key.
+        return None
+    api_key = os.getenv("PASTPUZZLE_API_KEY") or _anon_key_from_site()
+    if not api_key:
+        return None
+    base_url = auth_base_url(os.getenv("PASTPUZZLE_AUTHORIZATION"))
+    for grant_type, body in grants:
+        try:
+            session = token_grant(grant_type, body, api_key, base_url)
+        except (httpx.HTTPError, ValueError) as exc:
+            print(f"Supabase {grant_type} grant failed: {exc}", file=sys.stderr)
+            continue
+        save_session(session, base_url, storage_state_path())
+        return session["access_token"], api_key
+    return None
+
+
+def _anon_key_from_site() -> str | None:
+    try:
+        response = http_client().get(URL.split("#", 1)[0], timeout=BUNDLE_TIMEOUT)
+        response.raise_for_status()
+        return discover_anon_key(_extract_script_urls(response.text))
+    except httpx.HTTPError as exc:
+        print(f"Anon key discovery failed: {exc}", file=sys.stderr)
+        return None
+
+
+def _login_via_browser(username: str, password: str) -> tuple[str, str | None]:
+    from playwright.sync_api import sync_playwright
 
     deadline = time.time() + 150
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=True)
         context = browser.new_context()
+        context.route("**/*", _route_request)
         page = context.new_page()
         page.goto(URL, wait_until="domcontentloaded")
-        _dismiss_cookie_banner(page, deadline)
 
         username_selectors = [
             'input[name="username"]',
@@ -108,6 +198,7 @@ def main(write_env: bool = False) -> None:
             _dump_login_debug(page)
             _dump_selector_debug(page, username_selectors + password_selectors)
             raise
+        _dismiss_cookie_banner(page)
 
         _ensure_deadline(deadline)
         username_locator = _find_locator(page, username_selectors, deadline)
@@ -125,16 +216,17 @@ def main(write_env: bool = False) -> None:
         username_locator.fill(username)
         password_locator.fill(password)
         _ensure_deadline(deadline)
-        page.click('button[type="submit"]')
-
-        # Wait for post-login navigation/app state
-        _ensure_deadline(deadline)
-        page.wait_for_load_state("networkidle", timeout=_remaining_timeout_ms(deadline))
-        _ensure_deadline(deadline)
-        page.wait_for_timeout(3000)
-
-        _ensure_deadline(deadline)
-        access_token = _extract_access_token(page)
+        session, api_key = _submit_and_read_token(page, deadline)
+        access_token = session["access_token"] if session else None
+        if not access_token:
+            # No token response seen; wait for the app to store the session instead.
+            try:
+                page.wait_for_function(
+                    ACCESS_TOKEN_SCRIPT, timeout=_remaining_timeout_ms(deadline)
+                )
+            except Exception:
+                pass
+            access_token = _extract_access_token(page)
         if not access_token:
             access_token = _extract_token_from_requests(page)
         if not access_token:
@@ -143,39 +235,91 @@ def main(write_env: bool = False) -> None:
             _dump_login_debug(page)
             print("Unable to locate access_token in storage.", file=sys.stderr)
             sys.exit(1)
-        api_key = _extract_api_key_from_requests(page)
+        if not api_key:
+            api_key = _extract_api_key_from_requests(page)
         if not api_key:
             api_key = _extract_api_key_from_storage_dump(page)
         if not api_key:
             api_key = _extract_anon_key_from_app(page)
-        if write_env:
-            _persist_tokens_to_env(access_token, api_key)
-        print(f"PASTPUZZLE_AUTHORIZATION={access_token}")
-        if api_key:
-            print(f"PASTPUZZLE_API_KEY={api_key}")
-
         # Persist session for later tests
-        os.makedirs("data", exist_ok=True)
-        context.storage_state(path="data/pastpuzzle.storage_state.json")
+        state_path = storage_state_path()
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        context.storage_state(path=str(state_path))
+        if session:
+            # The app may not have stored the session yet; keep its refresh token.
+            save_session(session, auth_base_url(access_token), state_path)
 
         browser.close()
+    return access_token, api_key
 
 
-def _find_locator(page, selectors: list[str], deadline: float):
-    for selector in selectors:
-        for frame in _iter_frames(page):
+def _find_locator(page, selectors: list[str], deadline: float, timeout_ms: int = 10000):
+    """Race one combined selector across all frames; the first visible match wins.
+
+    Each frame gets a short event-driven ``wait_for(state="visible")`` in turn, all
+    within one deadline, and the individual selector that matched is returned. A page
+    without child frames simply waits once for the whole timeout.
+    """
+    combined = ", ".join(selectors)
+    give_up = min(deadline, time.time() + timeout_ms / 1000)
+    while True:
+        frames = _iter_frames(page)[1:] or [page]
+        for frame in frames:
+            remaining_ms = int((give_up - time.time()) * 1000)
+            if remaining_ms <= 0:
+                return None
+            wait_ms = remaining_ms if len(frames) == 1 else min(FRAME_WAIT_MS, remaining_ms)
+            locator = frame.locator(combined).first
             try:
-                _ensure_deadline(deadline)
-                locator = frame.locator(selector).first
-                locator.wait_for(
-                    state="attached", timeout=min(5000, _remaining_timeout_ms(deadline))
-                )
-                return locator
+                locator.wait_for(state="visible", timeout=wait_ms)
             except Exception:
                 continue
+            return _matched_locator(frame, selectors) or locator
+
+
+def _matched_locator(frame, selectors: list[str]):
+    for selector in selectors:
+        locator = frame.locator(selector).first
+        try:
+            if locator.is_visible():
+                return locator
+        except Exception:
+            continue
     return None
 
 
+def _route_request(route) -> None:
+    request = route.request
+    host = urlparse(request.url).hostname or ""
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or host.endswith(BLOCKED_HOSTS):
+        route.abort()
+    else:
+        route.continue_()
+
+
+def _submit_and_read_token(
+    page, deadline: float
+) -> tuple[dict[str, object] | None, str | None]:
+    """Submit the login form and take the session (and anon key) from the auth response."""
+    try:
+        with page.expect_response(
+            _is_token_response,
+            timeout=min(TOKEN_RESPONSE_TIMEOUT_MS, _remaining_timeout_ms(deadline)),
+        ) as response_info:
+            page.click('button[type="submit"]')
+        response = response_info.value
+        body = response.json()
+    except Exception:
+        return None, None
+    if not isinstance(body, dict) or not body.get("access_token"):
+        return None, None
+    return body, response.request.headers.get("apikey")
+
+
+def _is_token_response(response) -> bool:
+    return "/auth/v1/token" in response.url and response.request.method == "POST"
+
+
 def _persist_tokens_to_env(token: str, api_key: str | None) -> None:
     env_path = Path(".env")
     lines = []
@@ -235,25 +379,79 @@ def _first_jwt(text: str) -> str | None:
 
 
 def _extract_anon_key_from_app(page) -> str | None:
-    script_urls = _extract_script_urls(page)
-    if not script_urls:
-        return None
-    for script_url in script_urls:
-        try:
-            response = page.request.get(script_url, timeout=15000)
-            if not response.ok:
-                continue
-            text = response.text()
-        except Exception:
-            continue
-        anon_key = _find_anon_key_in_text(text)
-        if anon_key:
-            return anon_key
-    return None
+    return discover_anon_key(_extract_script_urls(page.content()))
+
 
+def discover_anon_key(
+    script_urls: list[str], cache_path: Path = ANON_KEY_CACHE_PATH
+) -> str | None:
+    """Find the Supabase anon key in the app's script bundles.
 
-def _extract_script_urls(page) -> list[str]:
-    html = page.content()
+    Bundle file names carry a content hash, so the result of scanning each bundle URL
+    is cached; until the app is redeployed nothing is downloaded. Uncached bundles are
+    streamed concurrently and every scan stops once any of them finds a valid key.
+    """
+    cache = _load_anon_key_cache(cache_path)
+    for url in script_urls:
+        cached = cache.get(url)
+        if cached and _looks_like_anon_key(cached):
+            return cached
+    pending = [url for url in script_urls if url not in cache]
+    anon_key = None
+    if pending:
+        found = threading.Event()
+        with ThreadPoolExecutor(max_workers=min(BUNDLE_WORKERS, len(pending))) as pool:
+            futures = {pool.submit(_scan_bundle, url, found): url for url in pending}
+            for future in as_completed(futures):
+                try:
+                    key, complete = future.result()
+                except httpx.HTTPError:
+                    continue
+                if key or complete:
+                    cache[futures[future]] = key
+                if key and anon_key is None:
+                    anon_key = key
+    # Only the current bundles matter; entries for older deployments are dropped.
+    _save_anon_key_cache(
+        {url: cache[url] for url in script_urls if url in cache}, cache_path
+    )
+    return anon_key
+
+
+def _scan_bundle(url: str, stop: threading.Event) -> tuple[str | None, bool]:
+    """Stream one bundle and scan it chunk by chunk; returns (key, scanned to the end)."""
+    tail = ""
+    with http_client().stream("GET", url, timeout=BUNDLE_TIMEOUT) as response:
+        response.raise_for_status()
+        for chunk in response.iter_text():
+            if stop.is_set():
+                return None, False
+            window = tail + chunk
+            anon_key = _find_anon_key_in_text(window)
+            if anon_key:
+                stop.set()
+                return anon_key, True
+            # Keep enough of the previous chunk to catch a key split across chunks.
+            tail = window[-SCAN_OVERLAP:]
+    return None, True
+
+
+def _load_anon_key_cache(path: Path) -> dict[str, str | None]:
+    if not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _save_anon_key_cache(cache: dict[str, str | None], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(cache, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def _extract_script_urls(html: str) -> list[str]:
     srcs = re.findall(r'<script[^>]+src="([^"]+)"', html)
     urls = []
     for src in srcs:
@@ -279,25 +477,12 @@ def _find_anon_key_in_text(text: str) -> str | None:
 
 
 def _looks_like_anon_key(token: str) -> bool:
-    payload = _decode_jwt_payload(token)
+    payload = decode_jwt_payload(token)
     if not payload:
         return False
     return payload.get("role") == "anon" or payload.get("anon") is True
 
 
-def _decode_jwt_payload(token: str) -> dict[str, object] | None:
-    try:
-        parts = token.split(".")
-        if len(parts) != 3:
-            return None
-        payload = parts[1]
-        padded = payload + "=" * (-len(payload) % 4)
-        decoded = base64.urlsafe_b64decode(padded.encode("utf-8")).decode("utf-8")
-        return json.loads(decoded)
-    except Exception:
-        return None
-
-
 def _iter_frames(page) -> list[object]:
     frames = [page]
     try:
@@ -377,21 +562,13 @@ def _wait_for_login_form(page, deadline: float) -> None:
         'input[aria-label="E-Mail"]',
         'input[aria-label="Password"]',
     ]
-    for selector in selectors:
-        try:
-            _ensure_deadline(deadline)
-            page.wait_for_selector(
-                selector,
-                timeout=min(10000, _remaining_timeout_ms(deadline)),
-                state="attached",
-            )
-            return
-        except Exception:
-            continue
-    raise TimeoutError("Login form did not appear before timeout.")
+    _ensure_deadline(deadline)
+    if _find_locator(page, selectors, deadline, timeout_ms=30000) is None:
+        raise TimeoutError("Login form did not appear before timeout.")
 
 
-def _dismiss_cookie_banner(page, deadline: float) -> None:
+def _dismiss_cookie_banner(page) -> None:
+    """Click a cookie banner button if one is showing; never waits for one to appear."""
     buttons = [
         'button:has-text("Accept all")',
         'button:has-text("Decline optional cookies")',
@@ -399,13 +576,12 @@ def _dismiss_cookie_banner(page, deadline: float) -> None:
         'button:has-text("Nur essenzielle Cookies")',
         'button:has-text("Ablehnen")',
     ]
-    for selector in buttons:
-        try:
-            _ensure_deadline(deadline)
-            page.click(selector, timeout=min(3000, _remaining_timeout_ms(deadline)))
-            return
-        except Exception:
-            continue
+    try:
+        button = page.locator(", ".join(buttons)).first
+        if button.count():
+            button.click(timeout=3000)
+    except Exception:
+        pass
 
 
 def _ensure_deadline(deadline: float) -> None:
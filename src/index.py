@@ -0,0 +1,195 @@
+import json
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+from .archive import ARCHIVE_PATH, load_archive, source_stamp
+
+
+INDEX_VERSION = 2
+
+
+class ArchiveIndex:
+    """Secondary indexes over archive records, keyed by date."""
+
+    def __init__(self) -> None:
+        self.entries: dict[str, dict[str, Any]] = {}
+        self.by_answer_year: dict[str, set[str]] = {}
+        self.by_host: dict[str, set[str]] = {}
+        self.by_quiz_id: dict[str, set[str]] = {}
+        self.missing_audio: set[str] = set()
+
+    @classmethod
+    def build(cls, records: list[dict[str, Any]]) -> "ArchiveIndex":
+        index = cls()
+        for record in records:
+            index.update(record)
+        return index
+
+    def update(self, record: dict[str, Any]) -> None:
+        date_value = record.get("date")
+        if not date_value:
+            return
+        self.remove(date_value)
+        entry = _index_entry(record)
+        self.entries[date_value] = entry
+        if entry["answer_year"] is not None:
+            self.by_answer_year.setdefault(str(entry["answer_year"]), set()).add(date_value)
+        for host in entry["hosts"]:
+            self.by_host.setdefault(host, set()).add(date_value)
+        if entry["quiz_id"] is not None:
+            self.by_quiz_id.setdefault(str(entry["quiz_id"]), set()).add(date_value)
+        if entry["missing_audio"]:
+            self.missing_audio.add(date_value)
+
+    def update_affected(
+        self, records: list[dict[str, Any]], dates: set[str], page_urls: set[str]
+    ) -> None:
+        """Re-index records in ``dates`` and every record sharing a changed podcast page.
+
+        ``page_urls`` comes from :func:`archive.save_archive`: metadata stored once per
+        page changes the entries of all days that reference it, not only the saved ones.
+        """
+        for record in records:
+            if record.get("date") in dates or _page_urls(record) & page_urls:
+                self.update(record)
+
+    def remove(self, date_value: str) -> None:
+        entry = self.entries.pop(date_value, None)
+        if not entry:
+            return
+        if entry["answer_year"] is not None:
+            _discard(self.by_answer_year, str(entry["answer_year"]), date_value)
+        for host in entry["hosts"]:
+            _discard(self.by_host, host, date_value)
+        if entry["quiz_id"] is not None:
+            _discard(self.by_quiz_id, str(entry["quiz_id"]), date_value)
+        self.missing_audio.discard(date_value)
+
+    def query(
+        self,
+        answer_year: Optional[int] = None,
+        host: Optional[str] = None,
+        quiz_id: Optional[str] = None,
+        missing_audio: bool = False,
+    ) -> list[str]:
+        """Return sorted dates matching every given filter."""
+        candidates: list[set[str]] = []
+        if answer_year is not None:
+            candidates.append(self.by_answer_year.get(str(answer_year), set()))
+        if host:
+            candidates.append(self.by_host.get(_normalize_host(host), set()))
+        if quiz_id is not None:
+            candidates.append(self.by_quiz_id.get(str(quiz_id), set()))
+        if missing_audio:
+            candidates.append(self.missing_audio)
+        if not candidates:
+            return sorted(self.entries)
+        candidates.sort(key=len)
+        matches = set(candidates[0])
+        for other in candidates[1:]:
+            matches &= other
+        return sorted(matches)
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "version": INDEX_VERSION,
+            "entries": self.entries,
+            "by_answer_year": {key: sorted(value) for key, value in self.by_answer_year.items()},
+            "by_host": {key: sorted(value) for key, value in self.by_host.items()},
+            "by_quiz_id": {key: sorted(value) for key, value in self.by_quiz_id.items()},
+            "missing_audio": sorted(self.missing_audio),
+        }
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> "ArchiveIndex":
+        index = cls()
+        index.entries = data.get("entries", {})
+        index.by_answer_year = {key: set(value) for key, value in data.get("by_answer_year", {}).items()}
+        index.by_host = {key: set(value) for key, value in data.get("by_host", {}).items()}
+        index.by_quiz_id = {key: set(value) for key, value in data.get("by_quiz_id", {}).items()}
+        index.missing_audio = set(data.get("missing_audio", []))
+        return index
+
+
+def index_path_for(path: Path) -> Path:
+    return path.with_name("archive.index.json")
+
+
+def load_index(archive_path: Path = ARCHIVE_PATH) -> ArchiveIndex:
+    """Load the persisted index, rebuilding it when the archive changed on disk."""
+    index_path = index_path_for(archive_path)
+    if index_path.exists():
+        with index_path.open("r", encoding="utf-8") as handle:
+            data = json.load(handle)
+        if (
+            isinstance(data, dict)
+            and data.get("version") == INDEX_VERSION
+            and data.get("source") == source_stamp(archive_path)
+        ):
+            return ArchiveIndex.from_json(data)
+    index = ArchiveIndex.build(load_archive(archive_path))
+    save_index(index, archive_path)
+    return index
+
+
+def save_index(index: ArchiveIndex, archive_path: Path = ARCHIVE_PATH) -> None:
+    index_path = index_path_for(archive_path)
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    data = index.to_json()
+    data["source"] = source_stamp(archive_path)
+    with index_path.open("w", encoding="utf-8") as handle:
+        json.dump(data, handle, sort_keys=False)
+        handle.write("\n")
+
+
+def _index_entry(record: dict[str, Any]) -> dict[str, Any]:
+    hosts: list[str] = []
+    podcasts = record.get("podcasts")
+    # A record without any usable podcast is as much in the audio backlog as one
+    # whose podcast page has not been resolved yet.
+    missing_audio = not isinstance(podcasts, list) or not podcasts
+    if isinstance(podcasts, list):
+        for podcast in podcasts:
+            if not isinstance(podcast, dict):
+                missing_audio = True
+                continue
+            if not podcast.get("audio_url"):
+                missing_audio = True
+            if not podcast.get("page_url"):
+                continue
+            host = _normalize_host(urlparse(podcast["page_url"]).hostname or "")
+            if host and host not in hosts:
+                hosts.append(host)
+    answer_year = record.get("answer_year")
+    quiz_id = record.get("quiz_id")
+    return {
+        "answer_year": answer_year if isinstance(answer_year, int) else None,
+        "hosts": hosts,
+        "quiz_id": str(quiz_id) if quiz_id is not None else None,
+        "missing_audio": missing_audio,
+    }
+
+
+def _page_urls(record: dict[str, Any]) -> set[str]:
+    podcasts = record.get("podcasts")
+    if not isinstance(podcasts, list):
+        return set()
+    return {
+        podcast["page_url"]
+        for podcast in podcasts
+        if isinstance(podcast, dict) and podcast.get("page_url")
+    }
+
+
+def _normalize_host(host: str) -> str:
+    return host.strip().lower()
+
+
+def _discard(mapping: dict[str, set[str]], key: str, date_value: str) -> None:
+    values = mapping.get(key)
+    if values is None:
+        return
+    values.discard(date_value)
+    if not values:
+        del mapping[key]
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from .generate_feed import FEED_PATH, FeedConfig
+from .index import load_index
+from .no_audio_cache import NoAudioCache
+from .pipeline import refresh_feed, store_records
+from .retry_queue import RetryQueue, drain_retry_queue
+from .scrape import fetch_puzzle, fetch_quiz, resolve_podcasts
+
+
+DEFAULT_FLUSH_EVERY = 10
+
+
+class JobJournal:
+    """Append-only record of finished units for one job, used to resume after a crash.
+
+    Each line is a fetched unit with its record (``resolved`` once its podcasts are),
+    a unit that failed with its error, or a marker listing units whose records have
+    reached the archive.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.completed: dict[str, dict[str, Any]] = {}
+        self.failed: dict[str, str] = {}
+        self.flushed: set[str] = set()
+        if path.exists():
+            self._load()
+
+    @classmethod
+    def for_units(cls, archive_path: Path, units: list[str]) -> "JobJournal":
+        digest = hashlib.sha256(json.dumps(units).encode("utf-8")).hexdigest()[:16]
+        return cls(jobs_dir_for(archive_path) / f"{digest}.jsonl")
+
+    def record(
+        self, unit: str, record: dict[str, Any], merge: bool, resolved: bool = True
+    ) -> None:
+        entry = {"unit": unit, "record": record, "merge": merge, "resolved": resolved}
+        self._append(entry)
+        self.completed[unit] = entry
+        self.failed.pop(unit, None)
+
+    def fail(self, unit: str, error: str) -> None:
+        self._append({"unit": unit, "error": error})
+        self.failed[unit] = error
+
+    def mark_flushed(self, units: list[str]) -> None:
+        self._append({"flushed": units})
+        self.flushed.update(units)
+
+    def unflushed(self) -> list[dict[str, Any]]:
+        return [entry for unit, entry in self.completed.items() if unit not in self.flushed]
+
+    def finish(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+    def _append(self, entry: dict[str, Any]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps(entry, ensure_ascii=True, sort_keys=True) + "\n")
+            handle.flush()
+            os.fsync(handle.fileno())
+
+    def _load(self) -> None:
+        valid_bytes = 0
+        with self.path.open("rb") as handle:
+            for line in handle:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                valid_bytes += len(line)
+                if "flushed" in entry:
+                    self.flushed.update(entry["flushed"])
+                elif "error" in entry:
+                    self.failed[entry["unit"]] = entry["error"]
+                else:
+                    self.completed[entry["unit"]] = entry
+                    self.failed.pop(entry["unit"], None)
+        if valid_bytes != self.path.stat().st_size:
+            # Drop a torn final line from an interrupted write before appending again.
+            with self.path.open("r+b") as handle:
+                handle.truncate(valid_bytes)
+
+
+def jobs_dir_for(archive_path: Path) -> Path:
+    return archive_path.with_name("jobs")
+
+
+def backfill_units(dates: list[str], quiz_ids: list[str]) -> list[str]:
+    """Unit names: ``date:YYYY-MM-DD`` and ``quiz:ID`` or ``quiz:ID:YYYY-MM-DD``."""
+    return [f"date:{value}" for value in dates] + [f"quiz:{value}" for value in quiz_ids]
+
+
+def fetch_unit(unit: str) -> tuple[dict[str, Any], bool]:
+    """Fetch one unit without resolving podcasts; returns the record and its merge flag."""
+    kind, _, value = unit.partition(":")
+    if kind == "date":
+        return fetch_puzzle(value, resolve=False), False
+    if kind == "quiz":
+        quiz_id, _, quiz_date = value.partition(":")
+        return fetch_quiz(quiz_id, date_override=quiz_date or None, resolve=False), True
+    raise ValueError(f"Unknown job unit {unit!r}.")
+
+
+def run_backfill(
+    units: list[str],
+    archive_path: Path,
+    workers: Optional[int] = None,
+    flush_every: int = DEFAULT_FLUSH_EVERY,
+    feed_path: Path = FEED_PATH,
+    echo: Callable[[str], None] = print,
+) -> dict[str, str]:
+    """Fetch, resolve and store ``units`` in batches, resuming from the job journal.
+
+    Every unit is journaled as soon as it is fetched, and again once the podcasts of
+    its batch are resolved; each batch of ``flush_every`` units is written to the
+    archive together. A unit that fails is journaled with its error and the job
+    continues. Returns ``{unit: error}`` for failed units; the journal is removed only
+    when none failed, so rerunning the same units retries just those.
+    """
+    journal = JobJournal.for_units(archive_path, units)
+    if journal.completed or journal.failed:
+        done = len(journal.completed)
+        echo(f"Resuming job {journal.path.stem}: {done} of {len(units)} units done.")
+    index = load_index(archive_path)
+    no_audio = NoAudioCache.for_archive(archive_path)
+
+    def resolve(entries: list[dict[str, Any]]) -> None:
+        staged = [entry for entry in entries if not entry.get("resolved", True)]
+        if not staged:
+            return
+        records = [entry["record"] for entry in staged]
+        failures = resolve_podcasts(records, workers, no_audio)
+        no_audio.save()
+        if failures:
+            # Queue before journaling so a resumed job never loses a failed page.
+            queue = RetryQueue.for_archive(archive_path)
+            queue.add(records, failures, datetime.now(timezone.utc))
+            queue.save()
+            echo(f"Queued {len(failures)} podcast page(s) for retry.")
+        for entry in staged:
+            journal.record(entry["unit"], entry["record"], entry["merge"])
+
+    def flush(entries: list[dict[str, Any]]) -> None:
+        if not entries:
+            return
+        batch = [(entry["record"], entry["merge"]) for entry in entries]
+        for (record, _), updated in zip(batch, store_records(batch, archive_path, index)):
+            if updated:
+                echo(f"Updated archive for {record['date']}.")
+            else:
+                echo(f"Archive already contains {record['date']}.")
+        journal.mark_flushed([entry["unit"] for entry in entries])
+
+    resolve(journal.unflushed())
+    flush(journal.unflushed())
+    remaining = [unit for unit in units if unit not in journal.completed]
+    size = max(flush_every, 1)
+    for start in range(0, len(remaining), size):
+        for unit in remaining[start : start + size]:
+            try:
+                record, merge = fetch_unit(unit)
+            except Exception as exc:  # one broken unit must not stop the others
+                journal.fail(unit, str(exc) or type(exc).__name__)
+                echo(f"Failed {unit}: {journal.failed[unit]}")
+                continue
+            journal.record(unit, record, merge, resolved=False)
+        resolve(journal.unflushed())
+        flush(journal.unflushed())
+
+    for retried in drain_retry_queue(archive_path):
+        echo(f"Resolved queued podcast audio for {retried}.")
+    if not refresh_feed(archive_path, feed_path, FeedConfig.from_env()):
+        echo("Feed inputs unchanged; skipping feed generation.")
+    failed = dict(journal.failed)
+    if not failed:
+        journal.finish()
+    return failed
@@ -1,17 +1,18 @@
 import json
 import os
 from datetime import date as Date
+from pathlib import Path
 from zoneinfo import ZoneInfo
 
 import click
-from dotenv import load_dotenv
 
-from .archive import save_archive, upsert_record
-from .generate_feed import write_feed
-from .scrape import fetch_puzzle, fetch_quiz
+from .archive import ARCHIVE_PATH
 
+# Heavy modules (httpx, bs4/lxml, ElementTree, dotenv) are imported inside the
+# commands that use them so `src.main feed` and `query` start without the scraper.
 
-@click.command()
+
+@click.group(invoke_without_command=True)
 @click.option("--date", "date_value", required=False, help="Fetch a specific date (YYYY-MM-DD)")
 @click.option(
     "--check",
@@ -38,19 +39,56 @@ from .scrape import fetch_puzzle, fetch_quiz
     is_flag=True,
     help="Pretty-print JSON output (implies --print-json).",
 )
+@click.option(
+    "--profile",
+    "profile",
+    is_flag=True,
+    help="Run under cProfile; write reports to data/profiles/ and print the top functions.",
+)
+@click.option(
+    "--trace-malloc",
+    "trace_malloc",
+    is_flag=True,
+    help="Trace allocations; write reports to data/profiles/ and print the top sites.",
+)
+@click.option(
+    "--refresh-enclosures",
+    "refresh_enclosures",
+    is_flag=True,
+    help="Revalidate stored enclosures, update changed lengths/types and report dead links.",
+)
+@click.pass_context
 def main(
+    ctx: click.Context,
     date_value: str | None = None,
     check_only: bool = False,
     quiz_id: str | None = None,
     quiz_date: str | None = None,
     print_json: bool = False,
     pretty_json: bool = False,
+    profile: bool = False,
+    trace_malloc: bool = False,
+    refresh_enclosures: bool = False,
 ) -> None:
-    load_dotenv()
+    if ctx.invoked_subcommand is not None:
+        if profile or trace_malloc:
+            from .profiling import profiled
+
+            # Closed with the context, after the subcommand returns or raises.
+            ctx.with_resource(profiled(ctx.invoked_subcommand, profile, trace_malloc))
+        return
+    _load_env()
     os.environ.setdefault("TIMEZONE", "UTC")
     timezone = ZoneInfo(os.getenv("TIMEZONE", "UTC"))
     if timezone.key != "UTC":
         raise ValueError("Only UTC timezone is supported for feed generation.")
+    from .metrics import record_run
+    from .profiling import profiled
+
+    if refresh_enclosures:
+        with profiled("refresh", profile, trace_malloc), record_run("refresh_enclosures"):
+            _run_enclosure_refresh()
+        return
     if date_value:
         _validate_date(date_value, "--date")
     if quiz_date:
@@ -59,12 +97,191 @@ def main(
     if quiz_id and date_value:
         raise ValueError("Use --quiz-date instead of --date when fetching a quiz.")
 
-    if quiz_id:
-        record = fetch_quiz(quiz_id, date_override=quiz_date)
-        merge = True
-    else:
-        record = fetch_puzzle(date_value)
-        merge = False
+    command = "check" if check_only else "scrape"
+    with profiled(command, profile, trace_malloc), record_run(command):
+        _run_pipeline(date_value, check_only, quiz_id, quiz_date, print_json, pretty_json)
+
+
+@main.command("feed")
+@click.option("--force", "force", is_flag=True, help="Rebuild even when inputs are unchanged.")
+def feed(force: bool = False) -> None:
+    """Regenerate the feed from the archive without scraping."""
+    from .generate_feed import FEED_PATH, FeedConfig, write_feed
+    from .metrics import record_run, span
+    from .pipeline import refresh_feed
+
+    _load_env()
+    archive_path = _archive_path()
+    config = FeedConfig.from_env()
+    with record_run("feed"):
+        if force:
+            with span("feed_write"):
+                write_feed(FEED_PATH, archive_path, config)
+        elif not refresh_feed(archive_path, FEED_PATH, config):
+            click.echo("Feed inputs unchanged; skipping feed generation.")
+
+
+@main.command("backfill")
+@click.option("--date", "dates", multiple=True, help="Puzzle date to fetch (YYYY-MM-DD); repeatable.")
+@click.option(
+    "--quiz-id",
+    "quiz_ids",
+    multiple=True,
+    help="Quiz to fetch as ID or ID:YYYY-MM-DD; repeatable.",
+)
+@click.option(
+    "--workers",
+    "workers",
+    type=int,
+    default=None,
+    help="Podcast page parser processes (default: PASTPUZZLE_PARSE_WORKERS or CPU count).",
+)
+@click.option(
+    "--flush-every",
+    "flush_every",
+    type=int,
+    default=10,
+    show_default=True,
+    help="Units to fetch and resolve before each archive write.",
+)
+def backfill(
+    dates: tuple[str, ...], quiz_ids: tuple[str, ...], workers: int | None, flush_every: int
+) -> None:
+    """Fetch many days, resolve their podcast pages in parallel, then update archive and feed.
+
+    Progress is journaled under data/jobs/; rerunning the same command resumes it.
+    """
+    from .jobs import backfill_units, run_backfill
+    from .metrics import record_run
+
+    _load_env()
+    if not dates and not quiz_ids:
+        raise click.UsageError("Pass at least one --date or --quiz-id.")
+    for date_value in dates:
+        _validate_date(date_value, "--date")
+    for value in quiz_ids:
+        quiz_date = value.partition(":")[2]
+        if quiz_date:
+            _validate_date(quiz_date, "--quiz-id")
+    with record_run("backfill"):
+        failed = run_backfill(
+            backfill_units(list(dates), list(quiz_ids)),
+            _archive_path(),
+            workers=workers,
+            flush_every=flush_every,
+            echo=click.echo,
+        )
+    if failed:
+        raise click.ClickException(
+            f"{len(failed)} unit(s) failed: {', '.join(failed)}. Rerun to retry them."
+        )
+
+
+@main.command("query")
+@click.option("--answer-year", "answer_year", type=int, help="Days whose answer is this year.")
+@click.option("--host", "host", help="Days with a podcast hosted on this host.")
+@click.option("--quiz-id", "quiz_id", help="Days enriched from this quiz ID.")
+@click.option(
+    "--missing-audio",
+    "missing_audio",
+    is_flag=True,
+    help="Days with at least one podcast lacking an audio_url.",
+)
+def query(
+    answer_year: int | None = None,
+    host: str | None = None,
+    quiz_id: str | None = None,
+    missing_audio: bool = False,
+) -> None:
+    """List archive dates matching all given filters."""
+    from .index import load_index
+
+    _load_env()
+    index = load_index(_archive_path())
+    for date_value in index.query(
+        answer_year=answer_year,
+        host=host,
+        quiz_id=quiz_id,
+        missing_audio=missing_audio,
+    ):
+        click.echo(date_value)
+
+
+@main.command("serve")
+@click.option("--host", "host", default="127.0.0.1", show_default=True, help="Address to bind.")
+@click.option("--port", "port", type=int, default=8080, show_default=True, help="Port to bind.")
+@click.option(
+    "--reload-interval",
+    "reload_interval",
+    type=float,
+    default=5.0,
+    show_default=True,
+    help="Seconds between archive change checks.",
+)
+def serve(host: str, port: int, reload_interval: float) -> None:
+    """Serve the feed from memory with conditional GET support."""
+    from .generate_feed import FEED_PATH, FeedConfig
+    from .serve import run as run_server
+
+    _load_env()
+    click.echo(f"Serving feeds on http://{host}:{port}/")
+    run_server(FEED_PATH, _archive_path(), FeedConfig.from_env(), host, port, reload_interval)
+
+
+@main.command("daemon")
+def daemon() -> None:
+    """Stay resident: poll around the puzzle rollover and update archive and feed."""
+    from .daemon import DaemonConfig, run_daemon
+    from .generate_feed import FEED_PATH, FeedConfig
+
+    _load_env()
+    config = DaemonConfig.from_env()
+    click.echo(f"Polling for new puzzles around {config.rollover.strftime('%H:%M')} UTC.")
+    run_daemon(_archive_path(), FEED_PATH, config, FeedConfig.from_env(), click.echo)
+
+
+@main.command("sources")
+@click.option(
+    "--config",
+    "config_path",
+    type=click.Path(path_type=Path, dir_okay=False),
+    default="pastpuzzle.toml",
+    show_default=True,
+    help="TOML file declaring the sources.",
+)
+@click.option("--only", "only", multiple=True, help="Only run this source; repeatable.")
+@click.option("--check", "check_only", is_flag=True, help="Scrape without writing outputs.")
+def sources(config_path: Path, only: tuple[str, ...], check_only: bool) -> None:
+    """Scrape every configured source concurrently, each into its own archive and feed."""
+    from .metrics import record_run
+    from .sources import load_sources, run_sources
+
+    _load_env()
+    config = load_sources(config_path)
+    with record_run("sources"):
+        results = run_sources(config, list(only), check_only, click.echo)
+    failed = sorted(name for name, error in results.items() if error)
+    if failed:
+        raise click.ClickException(f"Sources failed: {', '.join(failed)}.")
+
+
+def _run_pipeline(
+    date_value: str | None,
+    check_only: bool,
+    quiz_id: str | None,
+    quiz_date: str | None,
+    print_json: bool,
+    pretty_json: bool,
+) -> None:
+    from .pipeline import scrape_record
+
+    archive_path = _archive_path()
+    # --check parses every page, so it ignores pages cached as having no audio.
+    record, merge, failures = scrape_record(
+        archive_path, date_value, quiz_id, quiz_date, use_no_audio_cache=not check_only
+    )
+    for page_url, error in failures.items():
+        click.echo(f"Podcast page failed ({error}): {page_url}")
     if pretty_json:
         print_json = True
     if print_json:
@@ -75,14 +292,37 @@ def main(
     if check_only:
         click.echo(f"Scrape OK for {record['date']}.")
         return
-    records, updated = upsert_record(record, merge=merge)
-    save_archive(records)
-    write_feed()
-
-    if updated:
-        click.echo(f"Updated archive for {record['date']}.")
-    else:
-        click.echo(f"Archive already contains {record['date']}.")
+    from .generate_feed import FEED_PATH, FeedConfig
+    from .pipeline import publish_record
+
+    publish_record(
+        record, archive_path, merge, failures, FEED_PATH, FeedConfig.from_env(), click.echo
+    )
+
+
+def _run_enclosure_refresh() -> None:
+    from .generate_feed import FEED_PATH, FeedConfig
+    from .pipeline import refresh_feed
+    from .refresh import refresh_enclosures
+
+    archive_path = _archive_path()
+    report = refresh_enclosures(archive_path)
+    for line in report.lines():
+        click.echo(line)
+    if report.updated:
+        refresh_feed(archive_path, FEED_PATH, FeedConfig.from_env())
+
+
+def _load_env() -> None:
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+
+def _archive_path() -> Path:
+    from .environment import getenv
+
+    return Path(getenv("ARCHIVE_PATH", str(ARCHIVE_PATH)))
 
 
 def _validate_date(value: str, label: str) -> None:
@@ -0,0 +1,144 @@
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Optional
+from urllib.parse import urlparse
+
+
+DEFAULT_TEXTFILE = Path("data/pastpuzzle.prom")
+TRUE_VALUES = {"1", "true", "yes"}
+
+_spans: list[dict[str, Any]] = []
+
+
+def log_enabled() -> bool:
+    return os.getenv("METRICS_LOG", "").strip().lower() in TRUE_VALUES
+
+
+def textfile_path() -> Optional[Path]:
+    value = os.getenv("METRICS_TEXTFILE", "").strip()
+    if not value or value.lower() in {"0", "false", "no"}:
+        return None
+    return DEFAULT_TEXTFILE if value.lower() in TRUE_VALUES else Path(value)
+
+
+def enabled() -> bool:
+    return log_enabled() or textfile_path() is not None
+
+
+@contextmanager
+def span(name: str, **fields: Any) -> Iterator[dict[str, Any]]:
+    """Time a stage. Callers may add fields to the yielded dict before it closes."""
+    if not enabled():
+        yield fields
+        return
+    start = time.perf_counter()
+    status = "ok"
+    try:
+        yield fields
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        emit(name, time.perf_counter() - start, status=status, **fields)
+
+
+def observe_request(
+    method: str,
+    url: str,
+    status: Optional[int],
+    size: int,
+    seconds: float,
+    retries: int,
+) -> None:
+    """Record one logical request; ``status`` None (no response at all) is labelled "error"."""
+    if not enabled():
+        return
+    emit(
+        "http",
+        seconds,
+        method=method,
+        host=urlparse(url).hostname or "",
+        status=status if status is not None else "error",
+        bytes=size,
+        retries=retries,
+    )
+
+
+def emit(name: str, seconds: float, **fields: Any) -> None:
+    event = {"span": name, "seconds": round(seconds, 6), "ts": round(time.time(), 3), **fields}
+    _spans.append(event)
+    if log_enabled():
+        print(json.dumps(event, sort_keys=True, default=str), file=sys.stderr)
+
+
+@contextmanager
+def record_run(command: str) -> Iterator[None]:
+    """Collect spans for one run and write the Prometheus textfile when configured."""
+    _spans.clear()
+    success = False
+    try:
+        with span("run", command=command):
+            yield
+        success = True
+    finally:
+        path = textfile_path()
+        if path is not None:
+            write_textfile(path, render_textfile(_spans, success, time.time()))
+
+
+def render_textfile(spans: list[dict[str, Any]], success: bool, timestamp: float) -> str:
+    stage_seconds: dict[str, float] = {}
+    http: dict[tuple[str, str, str], list[float]] = {}
+    for event in spans:
+        if event["span"] == "http":
+            key = (event["host"], event["method"], str(event["status"]))
+            totals = http.setdefault(key, [0, 0.0, 0, 0])
+            totals[0] += 1
+            totals[1] += event["seconds"]
+            totals[2] += event["bytes"]
+            totals[3] += event["retries"]
+        else:
+            stage_seconds[event["span"]] = stage_seconds.get(event["span"], 0.0) + event["seconds"]
+
+    lines = [
+        "# HELP pastpuzzle_stage_seconds Wall time spent per stage in the last run.",
+        "# TYPE pastpuzzle_stage_seconds gauge",
+    ]
+    for stage, seconds in sorted(stage_seconds.items()):
+        lines.append(f'pastpuzzle_stage_seconds{{stage="{stage}"}} {seconds:.6f}')
+    for metric, position, help_text in [
+        ("http_requests", 0, "HTTP requests in the last run."),
+        ("http_seconds", 1, "HTTP latency, including retries, in the last run."),
+        ("http_bytes", 2, "HTTP response bytes in the last run."),
+        ("http_retries", 3, "HTTP retries in the last run."),
+    ]:
+        lines.append(f"# HELP pastpuzzle_{metric} {help_text}")
+        lines.append(f"# TYPE pastpuzzle_{metric} gauge")
+        for (host, method, status), totals in sorted(http.items()):
+            labels = f'host="{host}",method="{method}",status="{status}"'
+            value = totals[position]
+            formatted = f"{value:.6f}" if isinstance(value, float) else str(value)
+            lines.append(f"pastpuzzle_{metric}{{{labels}}} {formatted}")
+    lines.extend(
+        [
+            "# HELP pastpuzzle_last_run_success Whether the last run finished without error.",
+            "# TYPE pastpuzzle_last_run_success gauge",
+            f"pastpuzzle_last_run_success {int(success)}",
+            "# HELP pastpuzzle_last_run_timestamp_seconds When the last run finished.",
+            "# TYPE pastpuzzle_last_run_timestamp_seconds gauge",
+            f"pastpuzzle_last_run_timestamp_seconds {timestamp:.3f}",
+        ]
+    )
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(path: Path, content: str) -> None:
+    # node_exporter may read at any time, so never expose a partial file.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.tmp")
+    temp_path.write_text(content, encoding="utf-8")
+    os.replace(temp_path, path)
@@ -0,0 +1,140 @@
+import hashlib
+import inspect
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import cache
+from pathlib import Path
+from types import CodeType
+from typing import Any, Optional
+
+from .environment import getenv
+
+
+# Entry point of podcast page parsing in src/scrape.py; see parser_version().
+PARSER_ENTRY_POINT = "_parse_podcast_bytes"
+
+
+@dataclass(frozen=True)
+class NoAudioConfig:
+    base_ttl: timedelta = timedelta(days=1)
+    max_ttl: timedelta = timedelta(days=30)
+
+    @classmethod
+    def from_env(cls) -> "NoAudioConfig":
+        return cls(
+            base_ttl=timedelta(days=float(getenv("NO_AUDIO_TTL_DAYS", "1"))),
+            max_ttl=timedelta(days=float(getenv("NO_AUDIO_MAX_TTL_DAYS", "30"))),
+        )
+
+
+class NoAudioCache:
+    """Podcast pages where no audio URL could be extracted, keyed by page_url.
+
+    A cached page is not fetched again until its entry expires. Each further miss
+    doubles the TTL up to ``max_ttl``. Entries written by another parser version are
+    ignored and dropped on save.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        config: Optional[NoAudioConfig] = None,
+        parser_version: Optional[str] = None,
+    ) -> None:
+        self.path = path
+        self.config = config or NoAudioConfig.from_env()
+        self.parser_version = parser_version or current_parser_version()
+        stored = _load_entries(path)
+        self.entries = {
+            page_url: entry
+            for page_url, entry in stored.items()
+            if entry.get("parser_version") == self.parser_version
+        }
+        self.dirty = len(self.entries) != len(stored)
+
+    @classmethod
+    def for_archive(
+        cls, archive_path: Path, config: Optional[NoAudioConfig] = None
+    ) -> "NoAudioCache":
+        return cls(no_audio_cache_path_for(archive_path), config)
+
+    def fresh(self, page_url: str, now: datetime) -> bool:
+        """True while ``page_url`` is known to have no audio and should not be fetched."""
+        entry = self.entries.get(page_url)
+        return entry is not None and datetime.fromisoformat(entry["expires"]) > now
+
+    def miss(self, page_url: str, now: datetime) -> None:
+        misses = self.entries.get(page_url, {}).get("misses", 0) + 1
+        ttl = min(self.config.base_ttl * 2 ** min(misses - 1, 16), self.config.max_ttl)
+        self.entries[page_url] = {
+            "parser_version": self.parser_version,
+            "misses": misses,
+            "expires": (now + ttl).isoformat(),
+        }
+        self.dirty = True
+
+    def hit(self, page_url: str) -> None:
+        if self.entries.pop(page_url, None) is not None:
+            self.dirty = True
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("w", encoding="utf-8") as handle:
+            json.dump(dict(sorted(self.entries.items())), handle, indent=2, sort_keys=True)
+            handle.write("\n")
+        self.dirty = False
+
+
+@cache
+def current_parser_version() -> str:
+    """Parser version of the running code; see :func:`parser_version`."""
+    from . import scrape
+
+    return parser_version(getattr(scrape, PARSER_ENTRY_POINT))
+
+
+def parser_version(entry_point: Any) -> str:
+    """Digest of the source of ``entry_point`` and every module function it calls.
+
+    Changing any extractor reachable from the entry point changes the version, so
+    pages cached as having no audio are parsed again by the new code.
+    """
+    module = inspect.getmodule(entry_point)
+    seen: dict[str, Any] = {}
+    pending = [entry_point]
+    while pending:
+        function = pending.pop()
+        if function.__name__ in seen:
+            continue
+        seen[function.__name__] = function
+        for name in _global_names(function.__code__):
+            value = getattr(module, name, None)
+            if inspect.isfunction(value) and value.__module__ == function.__module__:
+                pending.append(value)
+    digest = hashlib.sha256()
+    for name in sorted(seen):
+        digest.update(inspect.getsource(seen[name]).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _global_names(code: CodeType) -> set[str]:
+    names = set(code.co_names)
+    for constant in code.co_consts:
+        if isinstance(constant, CodeType):
+            names |= _global_names(constant)
+    return names
+
+
+def no_audio_cache_path_for(archive_path: Path) -> Path:
+    return archive_path.with_name("no_audio_pages.json")
+
+
+def _load_entries(path: Path) -> dict[str, dict[str, Any]]:
+    if not path.exists():
+        return {}
+    with path.open("r", encoding="utf-8") as handle:
+        data = json.load(handle)
+    return data if isinstance(data, dict) else {}
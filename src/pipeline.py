@@ -0,0 +1,129 @@
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from . import metrics
+from .archive import load_archive, save_archive, upsert_in_memory
+
+if TYPE_CHECKING:
+    from .generate_feed import FeedConfig
+    from .index import ArchiveIndex
+
+
+def store_record(
+    record: dict[str, Any],
+    archive_path: Path,
+    merge: bool = False,
+    index: Optional["ArchiveIndex"] = None,
+) -> bool:
+    """Upsert one scraped record and keep the index in step; True when the archive changed."""
+    return store_records([(record, merge)], archive_path, index)[0]
+
+
+def store_records(
+    batch: list[tuple[dict[str, Any], bool]],
+    archive_path: Path,
+    index: Optional["ArchiveIndex"] = None,
+) -> list[bool]:
+    """Apply ``(record, merge)`` pairs with one archive load and save.
+
+    Returns, per pair, whether it changed the archive.
+    """
+    from .index import load_index, save_index
+
+    with metrics.span("index_load"):
+        index = index or load_index(archive_path)
+    with metrics.span("archive_upsert", records=len(batch)):
+        records = load_archive(archive_path)
+        changed = []
+        for record, merge in batch:
+            records, updated = upsert_in_memory(records, record, merge)
+            changed.append(updated)
+    with metrics.span("archive_save", records=len(records)):
+        changed_pages = save_archive(records, archive_path)
+    index.update_affected(records, {record["date"] for record, _ in batch}, changed_pages)
+    with metrics.span("index_save"):
+        save_index(index, archive_path)
+    return changed
+
+
+def refresh_feed(
+    archive_path: Path,
+    feed_path: Optional[Path] = None,
+    config: Optional["FeedConfig"] = None,
+) -> bool:
+    """Rebuild the feed unless the manifest shows it is current; True when rebuilt."""
+    # The feed writer (and ElementTree) is only loaded once a feed is actually checked.
+    from .generate_feed import FEED_PATH, FeedConfig, feed_is_current, write_feed
+
+    feed_path = feed_path or FEED_PATH
+    config = config or FeedConfig.from_env()
+    with metrics.span("feed_check"):
+        current = feed_is_current(feed_path, archive_path, config)
+    if current:
+        return False
+    with metrics.span("feed_write"):
+        write_feed(feed_path, archive_path, config)
+    return True
+
+
+def scrape_record(
+    archive_path: Path,
+    date_value: Optional[str] = None,
+    quiz_id: Optional[str] = None,
+    quiz_date: Optional[str] = None,
+    use_no_audio_cache: bool = True,
+) -> tuple[dict[str, Any], bool, dict[str, str]]:
+    """Fetch the puzzle (or a quiz) and resolve its podcasts.
+
+    Returns the record, whether it should be merged into an existing day, and
+    ``{page_url: error}`` for podcast pages that failed to load.
+    """
+    from .no_audio_cache import NoAudioCache
+    from .scrape import fetch_puzzle, fetch_quiz, resolve_podcast_audio
+
+    if quiz_id:
+        record = fetch_quiz(quiz_id, date_override=quiz_date, resolve=False)
+        merge = True
+    else:
+        record = fetch_puzzle(date_value, resolve=False)
+        merge = False
+    no_audio = NoAudioCache.for_archive(archive_path) if use_no_audio_cache else None
+    failures = resolve_podcast_audio(record, no_audio)
+    if no_audio is not None:
+        no_audio.save()
+    return record, merge, failures
+
+
+def publish_record(
+    record: dict[str, Any],
+    archive_path: Path,
+    merge: bool = False,
+    failures: Optional[dict[str, str]] = None,
+    feed_path: Optional[Path] = None,
+    config: Optional["FeedConfig"] = None,
+    echo: Callable[[str], None] = print,
+) -> bool:
+    """Store a scraped record, queue its failed pages, drain due retries and refresh the feed.
+
+    Returns whether the archive changed for the record's date.
+    """
+    from .retry_queue import RetryQueue, drain_retry_queue
+
+    now = datetime.now(timezone.utc)
+    updated = store_record(record, archive_path, merge=merge)
+    if failures:
+        queue = RetryQueue.for_archive(archive_path)
+        queue.add([record], failures, now)
+        queue.save()
+        echo(f"Queued {len(failures)} podcast page(s) for retry.")
+    for retried in drain_retry_queue(archive_path, now):
+        echo(f"Resolved queued podcast audio for {retried}.")
+    if not refresh_feed(archive_path, feed_path, config):
+        echo("Feed inputs unchanged; skipping feed generation.")
+
+    if updated:
+        echo(f"Updated archive for {record['date']}.")
+    else:
+        echo(f"Archive already contains {record['date']}.")
+    return updated
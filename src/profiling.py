@@ -0,0 +1,92 @@
+import cProfile
+import io
+import pstats
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator
+
+
+PROFILE_DIR = Path("data/profiles")
+TOP_N = 20
+TRACEMALLOC_FRAMES = 25
+
+
+@contextmanager
+def profiled(
+    command: str,
+    profile: bool = False,
+    trace_malloc: bool = False,
+    directory: Path = PROFILE_DIR,
+    top: int = TOP_N,
+) -> Iterator[None]:
+    """Run the body under cProfile and/or tracemalloc and write reports to ``directory``.
+
+    Reports are written even when the body raises, so a failing slow run can still be
+    inspected. A top-N summary is printed once the body finishes.
+    """
+    if not profile and not trace_malloc:
+        yield
+        return
+    stem = f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}-{command}"
+    profiler = cProfile.Profile() if profile else None
+    if trace_malloc:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        directory.mkdir(parents=True, exist_ok=True)
+        if profiler is not None:
+            print(_write_profile(profiler, directory / stem, top))
+        if trace_malloc:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(_write_malloc_report(snapshot, peak, directory / stem, top))
+
+
+def _write_profile(profiler: cProfile.Profile, stem: Path, top: int) -> str:
+    profile_path = stem.with_name(f"{stem.name}.prof")
+    profiler.dump_stats(str(profile_path))
+    buffer = io.StringIO()
+    stats = pstats.Stats(profiler, stream=buffer)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+    stem.with_name(f"{stem.name}.pstats.txt").write_text(buffer.getvalue(), encoding="utf-8")
+
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:top]
+    lines = [
+        f"Top {top} functions by cumulative time (full profile: {profile_path})",
+        f"{'cumul s':>9} {'own s':>9} {'calls':>8}  function",
+    ]
+    for (filename, line, name), (_, calls, own, cumulative, _) in rows:
+        lines.append(f"{cumulative:>9.3f} {own:>9.3f} {calls:>8}  {name} ({Path(filename).name}:{line})")
+    return "\n".join(lines)
+
+
+def _write_malloc_report(snapshot: tracemalloc.Snapshot, peak: int, stem: Path, top: int) -> str:
+    snapshot = snapshot.filter_traces(
+        [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ]
+    )
+    statistics = snapshot.statistics("lineno")[:top]
+    report_path = stem.with_name(f"{stem.name}.malloc.txt")
+    lines = [
+        f"Top {top} allocation sites (peak traced {peak / 1024 / 1024:.1f} MiB; report: {report_path})",
+        f"{'KiB':>10} {'blocks':>8}  site",
+    ]
+    for stat in statistics:
+        frame = stat.traceback[0]
+        lines.append(f"{stat.size / 1024:>10.1f} {stat.count:>8}  {frame.filename}:{frame.lineno}")
+    detail = ["\n".join(lines), ""]
+    for stat in statistics:
+        detail.append(f"{stat.size / 1024:.1f} KiB in {stat.count} blocks")
+        detail.extend(f"    {line}" for line in stat.traceback.format())
+    report_path.write_text("\n".join(detail) + "\n", encoding="utf-8")
+    return "\n".join(lines)
@@ -0,0 +1,236 @@
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+import httpx
+
+from . import metrics
+from .archive import load_podcasts, podcasts_path_for, save_podcasts
+from .environment import getenv
+from .scrape import HostRateLimiter, _request_with_backoff, http_client
+
+
+RANGE_FALLBACK_STATUS_CODES = {403, 405, 501}
+CONTENT_RANGE_TOTAL = re.compile(r"/(\d+)\s*$")
+
+
+@dataclass(frozen=True)
+class RefreshConfig:
+    max_age: timedelta = timedelta(days=7)
+    host_rate: float = 2.0
+    workers: int = 8
+
+    @classmethod
+    def from_env(cls) -> "RefreshConfig":
+        return cls(
+            max_age=timedelta(days=float(getenv("ENCLOSURE_MAX_AGE_DAYS", "7"))),
+            host_rate=float(getenv("ENCLOSURE_HOST_RATE", "2")),
+            workers=int(getenv("ENCLOSURE_WORKERS", "8")),
+        )
+
+
+@dataclass
+class EnclosureCheck:
+    page_url: str
+    audio_url: str
+    status: Optional[int] = None
+    error: Optional[str] = None
+    changes: dict[str, Any] = field(default_factory=dict)
+    validators: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def dead(self) -> bool:
+        return self.error is not None
+
+
+@dataclass
+class RefreshReport:
+    checked: int = 0
+    skipped: int = 0
+    unchanged: int = 0
+    updated: list[EnclosureCheck] = field(default_factory=list)
+    dead: list[EnclosureCheck] = field(default_factory=list)
+
+    def lines(self) -> list[str]:
+        lines = [
+            f"Checked {self.checked} enclosures ({self.skipped} fresh, skipped): "
+            f"{self.unchanged} unchanged, {len(self.updated)} updated, {len(self.dead)} dead."
+        ]
+        for check in self.updated:
+            changes = ", ".join(f"{key}={value}" for key, value in sorted(check.changes.items()))
+            lines.append(f"UPDATED {check.audio_url} ({changes})")
+        for check in self.dead:
+            lines.append(f"DEAD {check.audio_url} [{check.error}] from {check.page_url}")
+        return lines
+
+
+def enclosure_state_path_for(archive_path: Path) -> Path:
+    return archive_path.with_name("enclosures.json")
+
+
+def refresh_enclosures(
+    archive_path: Path,
+    config: Optional[RefreshConfig] = None,
+    now: Optional[datetime] = None,
+) -> RefreshReport:
+    """Revalidate stored enclosures and write changed fields back in one batch.
+
+    Validators (ETag, Last-Modified) and the last check time live in a sidecar next
+    to the archive, so the podcast store, and with it the feed, only change when an
+    enclosure really did.
+    """
+    config = config or RefreshConfig.from_env()
+    now = now or datetime.now(timezone.utc)
+    podcasts_path = podcasts_path_for(archive_path)
+    podcasts = load_podcasts(podcasts_path)
+    state_path = enclosure_state_path_for(archive_path)
+    state = _load_state(state_path)
+
+    report = RefreshReport()
+    due = []
+    for page_url, entry in podcasts.items():
+        audio_url = entry.get("audio_url")
+        if not audio_url:
+            continue
+        previous = state.get(audio_url, {})
+        if previous.get("ok") and _checked_within(previous, now, config.max_age):
+            report.skipped += 1
+            continue
+        due.append((page_url, entry, previous))
+
+    limiter = HostRateLimiter(config.host_rate)
+    with metrics.span("refresh_enclosures", enclosures=len(due)):
+        with ThreadPoolExecutor(max_workers=max(config.workers, 1)) as pool:
+            checks = list(
+                pool.map(lambda item: check_enclosure(item[0], item[1], item[2], limiter), due)
+            )
+
+    checked_at = now.isoformat()
+    store_changed = False
+    for check in checks:
+        report.checked += 1
+        if check.dead:
+            report.dead.append(check)
+            state[check.audio_url] = {
+                **state.get(check.audio_url, {}),
+                "ok": False,
+                "status": check.status,
+                "checked_at": checked_at,
+            }
+            continue
+        state[check.audio_url] = {
+            **check.validators,
+            "ok": True,
+            "status": check.status,
+            "checked_at": checked_at,
+        }
+        if check.changes:
+            podcasts[check.page_url].update(check.changes)
+            report.updated.append(check)
+            store_changed = True
+        else:
+            report.unchanged += 1
+
+    if store_changed:
+        save_podcasts(podcasts, podcasts_path)
+    if checks:
+        _save_state(state, state_path)
+    return report
+
+
+def check_enclosure(
+    page_url: str,
+    entry: dict[str, Any],
+    previous: dict[str, Any],
+    limiter: HostRateLimiter,
+) -> EnclosureCheck:
+    """Conditional HEAD (falling back to a one-byte Range GET) for one enclosure."""
+    audio_url = entry["audio_url"]
+    check = EnclosureCheck(page_url=page_url, audio_url=audio_url)
+    headers = {}
+    if previous.get("etag"):
+        headers["if-none-match"] = previous["etag"]
+    if previous.get("last_modified"):
+        headers["if-modified-since"] = previous["last_modified"]
+    try:
+        limiter.wait(audio_url)
+        response = _request_with_backoff("HEAD", audio_url, headers=headers, follow_redirects=True)
+        # Some CDNs reject HEAD or omit the length; a one-byte range reveals the size.
+        if response.status_code in RANGE_FALLBACK_STATUS_CODES or (
+            response.status_code == 200 and not response.headers.get("content-length")
+        ):
+            limiter.wait(audio_url)
+            response = _range_probe(audio_url, headers)
+    except httpx.HTTPError as exc:
+        check.error = str(exc) or type(exc).__name__
+        if isinstance(exc, httpx.HTTPStatusError):
+            check.status = exc.response.status_code
+        return check
+
+    check.status = response.status_code
+    if response.status_code == 304:
+        check.validators = {
+            key: value for key, value in previous.items() if key in {"etag", "last_modified"}
+        }
+        return check
+    if response.status_code >= 400:
+        check.error = f"HTTP {response.status_code}"
+        return check
+
+    for header, key in (("etag", "etag"), ("last-modified", "last_modified")):
+        if response.headers.get(header):
+            check.validators[key] = response.headers[header]
+    length = _response_length(response)
+    if length and length != entry.get("length"):
+        check.changes["length"] = length
+    content_type = response.headers.get("content-type", "").split(";", 1)[0].strip().lower()
+    if content_type.startswith("audio/") and content_type != entry.get("content_type"):
+        check.changes["content_type"] = content_type
+    return check
+
+
+def _range_probe(url: str, headers: dict[str, str]) -> httpx.Response:
+    # Streamed so a server that ignores Range does not send the whole file.
+    start = time.perf_counter()
+    with http_client().stream(
+        "GET", url, headers={**headers, "range": "bytes=0-0"}, follow_redirects=True
+    ) as response:
+        pass
+    metrics.observe_request("GET", url, response.status_code, 0, time.perf_counter() - start, 0)
+    return response
+
+
+def _response_length(response: httpx.Response) -> int:
+    if response.status_code == 206:
+        match = CONTENT_RANGE_TOTAL.search(response.headers.get("content-range", ""))
+        return int(match.group(1)) if match else 0
+    length = response.headers.get("content-length", "")
+    return int(length) if length.isdigit() else 0
+
+
+def _checked_within(previous: dict[str, Any], now: datetime, max_age: timedelta) -> bool:
+    try:
+        checked_at = datetime.fromisoformat(previous["checked_at"])
+    except (KeyError, TypeError, ValueError):
+        return False
+    return now - checked_at < max_age
+
+
+def _load_state(path: Path) -> dict[str, dict[str, Any]]:
+    if not path.exists():
+        return {}
+    with path.open("r", encoding="utf-8") as handle:
+        data = json.load(handle)
+    return data if isinstance(data, dict) else {}
+
+
+def _save_state(state: dict[str, dict[str, Any]], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as handle:
+        json.dump(dict(sorted(state.items())), handle, indent=2, sort_keys=True)
+        handle.write("\n")
@@ -0,0 +1,158 @@
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+from .archive import load_archive, save_archive
+from .environment import getenv
+from .index import load_index, save_index
+from .no_audio_cache import NoAudioCache
+from .scrape import resolve_podcasts
+
+
+@dataclass(frozen=True)
+class RetryConfig:
+    base_delay: timedelta = timedelta(minutes=15)
+    max_delay: timedelta = timedelta(days=2)
+
+    @classmethod
+    def from_env(cls) -> "RetryConfig":
+        return cls(
+            base_delay=timedelta(seconds=float(getenv("RETRY_BASE_SECONDS", "900"))),
+            max_delay=timedelta(seconds=float(getenv("RETRY_MAX_SECONDS", "172800"))),
+        )
+
+
+class RetryQueue:
+    """Podcast pages that failed to resolve, keyed by page_url, with their next attempt.
+
+    Each entry lists the archive dates referencing the page, the number of failed
+    attempts and the last error. The delay doubles per attempt up to ``max_delay``.
+    """
+
+    def __init__(self, path: Path, config: Optional[RetryConfig] = None) -> None:
+        self.path = path
+        self.config = config or RetryConfig.from_env()
+        self.entries: dict[str, dict[str, Any]] = _load_entries(path)
+
+    @classmethod
+    def for_archive(cls, archive_path: Path, config: Optional[RetryConfig] = None) -> "RetryQueue":
+        return cls(retry_queue_path_for(archive_path), config)
+
+    def add(
+        self, records: list[dict[str, Any]], failures: dict[str, str], now: datetime
+    ) -> None:
+        """Queue ``failures`` ({page_url: error}) for the records that reference them."""
+        for page_url, error in failures.items():
+            dates = [
+                record["date"]
+                for record in records
+                if page_url in _page_urls(record) and record.get("date")
+            ]
+            entry = self.entries.setdefault(page_url, {"dates": [], "attempts": 0})
+            entry["dates"] = sorted(set(entry["dates"]) | set(dates))
+            self.fail(page_url, error, now)
+
+    def fail(self, page_url: str, error: str, now: datetime) -> None:
+        """Count another failed attempt and push the next one back."""
+        entry = self.entries[page_url]
+        entry["attempts"] += 1
+        delay = min(
+            self.config.base_delay * 2 ** min(entry["attempts"] - 1, 16), self.config.max_delay
+        )
+        entry["error"] = error
+        entry["next_attempt"] = (now + delay).isoformat()
+
+    def due(self, now: datetime) -> list[str]:
+        return [
+            page_url
+            for page_url, entry in self.entries.items()
+            if datetime.fromisoformat(entry["next_attempt"]) <= now
+        ]
+
+    def save(self) -> None:
+        if not self.entries:
+            self.path.unlink(missing_ok=True)
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("w", encoding="utf-8") as handle:
+            json.dump(dict(sorted(self.entries.items())), handle, indent=2, sort_keys=True)
+            handle.write("\n")
+
+
+def retry_queue_path_for(archive_path: Path) -> Path:
+    return archive_path.with_name("retry_queue.json")
+
+
+def drain_retry_queue(
+    archive_path: Path,
+    now: Optional[datetime] = None,
+    config: Optional[RetryConfig] = None,
+) -> list[str]:
+    """Re-resolve queued podcast pages that are due, without scraping the puzzle again.
+
+    Resolved pages leave the queue and their records are saved in one write; pages
+    that fail again are rescheduled. Returns the archive dates that gained audio.
+    """
+    now = now or datetime.now(timezone.utc)
+    queue = RetryQueue.for_archive(archive_path, config)
+    due = set(queue.due(now))
+    if not due:
+        return []
+    records = load_archive(archive_path)
+    targets = []
+    for record in records:
+        podcasts = record.get("podcasts")
+        if not isinstance(podcasts, list):
+            continue
+        for podcast in podcasts:
+            if (
+                isinstance(podcast, dict)
+                and podcast.get("page_url") in due
+                and not podcast.get("audio_url")
+            ):
+                targets.append((record, podcast))
+
+    no_audio = NoAudioCache.for_archive(archive_path)
+    failures = resolve_podcasts(
+        [{"podcasts": [podcast for _, podcast in targets]}], no_audio=no_audio
+    )
+    no_audio.save()
+    for page_url in due:
+        if page_url in failures:
+            queue.fail(page_url, failures[page_url], now)
+        else:
+            # Resolved, no longer referenced, or a page without audio: nothing to retry.
+            del queue.entries[page_url]
+    queue.save()
+
+    updated = {id(record): record for record, podcast in targets if podcast.get("audio_url")}
+    if not updated:
+        return []
+    index = load_index(archive_path)
+    changed_pages = save_archive(records, archive_path)
+    index.update_affected(
+        records, {record["date"] for record in updated.values()}, changed_pages
+    )
+    save_index(index, archive_path)
+    return sorted(record["date"] for record in updated.values())
+
+
+def _page_urls(record: dict[str, Any]) -> set[str]:
+    podcasts = record.get("podcasts")
+    if not isinstance(podcasts, list):
+        return set()
+    return {
+        podcast["page_url"]
+        for podcast in podcasts
+        if isinstance(podcast, dict) and podcast.get("page_url")
+    }
+
+
+def _load_entries(path: Path) -> dict[str, dict[str, Any]]:
+    if not path.exists():
+        return {}
+    with path.open("r", encoding="utf-8") as handle:
+        data = json.load(handle)
+    return data if isinstance(data, dict) else {}
@@ -1,20 +1,52 @@
 import json
 import os
 import re
+import threading
 import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Callable, Optional
 from urllib.parse import urljoin, urlparse
 
 import httpx
-from bs4 import BeautifulSoup
+
+from . import metrics
+from .environment import getenv
+from .no_audio_cache import NoAudioCache
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
 
 
 DEFAULT_BASE_URL = "https://www.pastpuzzle.de/"
 DEFAULT_QUIZ_URL = "https://shktoswxcezxdkncmskf.supabase.co/rest/v1/rpc/get_quiz"
 RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
 RETRY_DELAYS = (0, 1, 2)
+REQUEST_TIMEOUT = 30
+PARSE_POOL_MIN_PAGES = 8
+
+_client: Optional[httpx.Client] = None
+_host_limiter: Optional["HostRateLimiter"] = None
+
+
+class HostRateLimiter:
+    """Spaces requests to the same host at least ``1 / rate`` seconds apart."""
+
+    def __init__(self, rate: float) -> None:
+        self.interval = 1 / rate if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot: dict[str, float] = {}
+
+    def wait(self, url: str) -> None:
+        if not self.interval:
+            return
+        host = urlparse(url).hostname or ""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
 
 
 @dataclass
@@ -26,43 +58,49 @@ class SourceInfo:
 
 def discover_source(base_url: str) -> SourceInfo:
     """Discover whether the page embeds data or loads JSON from an endpoint."""
-    explicit_json_url = os.getenv("PASTPUZZLE_JSON_URL")
+    explicit_json_url = getenv("PASTPUZZLE_JSON_URL")
     if explicit_json_url:
         return SourceInfo(kind="json", url=explicit_json_url)
 
-    response = _request_with_backoff("GET", base_url)
-    response.raise_for_status()
-    html = response.text
+    with metrics.span("discover_source") as fields:
+        response = _request_with_backoff("GET", base_url)
+        response.raise_for_status()
+        html = response.text
 
-    json_url = _discover_json_url(html, base_url)
-    if json_url:
-        return SourceInfo(kind="json", url=json_url, html=html)
+        json_url = _discover_json_url(html, base_url)
+        if json_url:
+            fields["kind"] = "json"
+            return SourceInfo(kind="json", url=json_url, html=html)
 
-    try:
-        _extract_puzzle_from_html(html, base_url)
-        return SourceInfo(kind="html", url=base_url, html=html)
-    except ValueError:
-        pass
+        try:
+            _extract_puzzle_from_html(html, base_url)
+            fields["kind"] = "html"
+            return SourceInfo(kind="html", url=base_url, html=html)
+        except ValueError:
+            pass
 
     raise ValueError(
         "Unable to discover puzzle source: no JSON endpoint and no parseable embedded data found."
     )
 
 
-def fetch_puzzle(date: Optional[str] = None) -> dict:
-    base_url = os.getenv("PASTPUZZLE_URL", DEFAULT_BASE_URL)
+def fetch_puzzle(date: Optional[str] = None, resolve: bool = True) -> dict:
+    base_url = getenv("PASTPUZZLE_URL", DEFAULT_BASE_URL)
     source = discover_source(base_url)
 
     if source.kind == "json":
         request_url = _apply_date_to_url(source.url, date)
-        payload = _fetch_json_payload(request_url, date)
-        record = _parse_json_payload(payload, source_url=request_url)
+        with metrics.span("fetch_puzzle_json"):
+            payload = _fetch_json_payload(request_url, date)
+            record = _parse_json_payload(payload, source_url=request_url)
     else:
         if source.html is None:
             raise ValueError("HTML source was not available after discovery.")
-        record = _extract_puzzle_from_html(source.html, source_url=source.url)
+        with metrics.span("parse_puzzle_html"):
+            record = _extract_puzzle_from_html(source.html, source_url=source.url)
 
-    _resolve_podcast_audio(record)
+    if resolve:
+        resolve_podcast_audio(record)
 
     if date and record["date"] != date:
         raise ValueError(
@@ -72,11 +110,14 @@ def fetch_puzzle(date: Optional[str] = None) -> dict:
     return record
 
 
-def fetch_quiz(quiz_id: str, date_override: Optional[str] = None) -> dict:
-    quiz_url = os.getenv("PASTPUZZLE_QUIZ_URL", DEFAULT_QUIZ_URL)
+def fetch_quiz(
+    quiz_id: str, date_override: Optional[str] = None, resolve: bool = True
+) -> dict:
+    quiz_url = getenv("PASTPUZZLE_QUIZ_URL", DEFAULT_QUIZ_URL)
     if not quiz_url:
         raise ValueError("PASTPUZZLE_QUIZ_URL must be set to fetch quiz data.")
-    payload = _fetch_quiz_payload(quiz_url, quiz_id)
+    with metrics.span("fetch_quiz_json"):
+        payload = _fetch_quiz_payload(quiz_url, quiz_id)
     record = _parse_json_payload(
         payload,
         source_url=quiz_url,
@@ -84,7 +125,8 @@ def fetch_quiz(quiz_id: str, date_override: Optional[str] = None) -> dict:
         quiz_id=quiz_id,
         require_date=date_override is None,
     )
-    _resolve_podcast_audio(record)
+    if resolve:
+        resolve_podcast_audio(record)
     return record
 
 
@@ -98,20 +140,20 @@ def _apply_date_to_url(url: str, date: Optional[str]) -> str:
 
 def _fetch_json_payload(url: str, date: Optional[str]) -> Any:
     headers = _build_headers()
-    method = os.getenv("PASTPUZZLE_JSON_METHOD", "GET").upper()
+    method = getenv("PASTPUZZLE_JSON_METHOD", "GET").upper()
     body = _build_body(date)
     return _fetch_payload(url, method, headers, body)
 
 
 def _fetch_quiz_payload(url: str, quiz_id: str) -> Any:
     headers = _build_headers()
-    method = os.getenv("PASTPUZZLE_QUIZ_METHOD", "POST").upper()
+    method = getenv("PASTPUZZLE_QUIZ_METHOD", "POST").upper()
     body = _build_quiz_body(quiz_id)
     return _fetch_payload(url, method, headers, body)
 
 
 def _fetch_payload(url: str, method: str, headers: dict[str, str], body: dict[str, Any]) -> Any:
-    if os.getenv("PASTPUZZLE_DEBUG", "").lower() in {"1", "true", "yes"}:
+    if getenv("PASTPUZZLE_DEBUG", "").lower() in {"1", "true", "yes"}:
         print(
             f"DEBUG request method={method} url={url}"
         )
@@ -122,6 +164,8 @@ def _fetch_payload(url: str, method: str, headers: dict[str, str], body: dict[st
     if method not in {"GET", "POST"}:
         raise ValueError("Request method must be GET or POST.")
     response = _send_request(method, url, headers, body)
+    if response.status_code == 401:
+        response = _retry_with_refreshed_token(method, url, headers, body) or response
     if response.status_code == 401:
         api_key = headers.get("apikey")
         auth_header = headers.get("authorization", "")
@@ -133,6 +177,18 @@ def _fetch_payload(url: str, method: str, headers: dict[str, str], body: dict[st
     return response.json()
 
 
+def _retry_with_refreshed_token(
+    method: str, url: str, headers: dict[str, str], body: dict[str, Any]
+) -> Optional[httpx.Response]:
+    from .auth import token_manager
+
+    token = headers.get("authorization", "").removeprefix("Bearer ")
+    manager = token_manager(token, headers.get("apikey")) if token else None
+    if manager is None or not manager.refresh():
+        return None
+    return _send_request(method, url, {**headers, "authorization": f"Bearer {manager.token()}"}, body)
+
+
 def _send_request(
     method: str, url: str, headers: dict[str, str], body: dict[str, Any]
 ) -> httpx.Response:
@@ -141,18 +197,47 @@ def _send_request(
     return _request_with_backoff("GET", url, headers=headers)
 
 
+def http_client() -> httpx.Client:
+    """Return the process-wide client so long-running callers reuse connections."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.Client(timeout=REQUEST_TIMEOUT)
+    return _client
+
+
+def set_host_rate_limiter(limiter: Optional[HostRateLimiter]) -> None:
+    """Space every request made through _request_with_backoff per host (None: off)."""
+    global _host_limiter
+    _host_limiter = limiter
+
+
+def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+
 def _request_with_backoff(
     method: str,
     url: str,
     headers: Optional[dict[str, str]] = None,
     json: Optional[dict[str, Any]] = None,
+    follow_redirects: bool = False,
 ) -> httpx.Response:
     last_exc: Optional[Exception] = None
-    for delay in RETRY_DELAYS:
+    start = time.perf_counter()
+    attempts = 0
+    for attempt, delay in enumerate(RETRY_DELAYS):
         if delay:
             time.sleep(delay)
+        attempts = attempt + 1
+        if _host_limiter is not None:
+            _host_limiter.wait(url)
         try:
-            response = httpx.request(method, url, headers=headers, json=json, timeout=30)
+            response = http_client().request(
+                method, url, headers=headers, json=json, follow_redirects=follow_redirects
+            )
         except httpx.HTTPError as exc:
             last_exc = exc
             continue
@@ -163,7 +248,14 @@ def _request_with_backoff(
                 response=response,
             )
             continue
+        metrics.observe_request(
+            method, url, response.status_code, len(response.content), time.perf_counter() - start, attempt
+        )
         return response
+    status = last_exc.response.status_code if isinstance(last_exc, httpx.HTTPStatusError) else None
+    metrics.observe_request(
+        method, url, status, 0, time.perf_counter() - start, max(attempts - 1, 0)
+    )
     if last_exc:
         raise last_exc
     raise httpx.HTTPError(f"Request failed for {url}")
@@ -171,18 +263,18 @@ def _request_with_backoff(
 
 def _build_headers() -> dict[str, str]:
     headers: dict[str, str] = {"accept": "application/json"}
-    raw_headers = os.getenv("PASTPUZZLE_HEADERS")
+    raw_headers = getenv("PASTPUZZLE_HEADERS")
+    api_key = getenv("PASTPUZZLE_API_KEY")
+    authorization = getenv("PASTPUZZLE_AUTHORIZATION")
     if raw_headers:
         extra_headers = _parse_header_env(raw_headers)
         had_raw_auth = "authorization" in extra_headers
         had_raw_apikey = "apikey" in extra_headers
-        api_key = os.getenv("PASTPUZZLE_API_KEY")
-        authorization = os.getenv("PASTPUZZLE_AUTHORIZATION")
         if api_key or authorization:
             extra_headers.pop("authorization", None)
             extra_headers.pop("apikey", None)
         headers.update(extra_headers)
-        if os.getenv("PASTPUZZLE_DEBUG", "").lower() in {"1", "true", "yes"}:
+        if getenv("PASTPUZZLE_DEBUG", "").lower() in {"1", "true", "yes"}:
             print(
                 "DEBUG header overrides: "
                 f"raw_auth={had_raw_auth} "
@@ -197,14 +289,18 @@ def _build_headers() -> dict[str, str]:
             headers["authorization"] = f"Bearer {api_key}"
     if authorization:
         if authorization.lower().startswith("bearer "):
-            headers["authorization"] = authorization
-        else:
-            headers["authorization"] = f"Bearer {authorization}"
+            authorization = authorization.split(" ", 1)[1].strip()
+        from .auth import token_manager
+
+        manager = token_manager(authorization, api_key)
+        if manager is not None:
+            authorization = manager.token()
+        headers["authorization"] = f"Bearer {authorization}"
     return headers
 
 
 def _build_body(date: Optional[str]) -> dict[str, Any]:
-    raw_body = os.getenv("PASTPUZZLE_JSON_BODY")
+    raw_body = getenv("PASTPUZZLE_JSON_BODY")
     if raw_body:
         try:
             body = json.loads(raw_body)
@@ -217,7 +313,7 @@ def _build_body(date: Optional[str]) -> dict[str, Any]:
 
 
 def _build_quiz_body(quiz_id: str) -> dict[str, Any]:
-    raw_body = os.getenv("PASTPUZZLE_QUIZ_BODY")
+    raw_body = getenv("PASTPUZZLE_QUIZ_BODY")
     if raw_body:
         try:
             body = json.loads(raw_body)
@@ -274,6 +370,13 @@ def _normalize_header_name(name: str) -> str:
     return name.strip().strip("\"'").lower()
 
 
+def _parse_html(html: str) -> "BeautifulSoup":
+    # bs4/lxml are only needed for HTML sources and podcast pages.
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(html, "lxml")
+
+
 def _discover_json_url(html: str, base_url: str) -> Optional[str]:
     patterns = [
         r"fetch\(\s*[\"']([^\"']+)[\"']",
@@ -287,7 +390,7 @@ def _discover_json_url(html: str, base_url: str) -> Optional[str]:
 
 
 def _extract_puzzle_from_html(html: str, source_url: str) -> dict:
-    soup = BeautifulSoup(html, "lxml")
+    soup = _parse_html(html)
 
     for script in soup.find_all("script"):
         if script.get("type") == "application/json" or "puzzle" in (script.get("id") or ""):
@@ -318,7 +421,7 @@ def _extract_puzzle_from_html(html: str, source_url: str) -> dict:
     raise ValueError("HTML parsing failed: unable to locate events/date in DOM.")
 
 
-def _extract_events_from_dom(soup: BeautifulSoup) -> Optional[list[str]]:
+def _extract_events_from_dom(soup: "BeautifulSoup") -> Optional[list[str]]:
     containers = [
         soup.select_one("#events"),
         soup.select_one(".events"),
@@ -333,7 +436,7 @@ def _extract_events_from_dom(soup: BeautifulSoup) -> Optional[list[str]]:
     return None
 
 
-def _extract_date_from_dom(soup: BeautifulSoup) -> Optional[str]:
+def _extract_date_from_dom(soup: "BeautifulSoup") -> Optional[str]:
     time_tag = soup.find("time", attrs={"datetime": True})
     if time_tag:
         return time_tag["datetime"][:10]
@@ -473,44 +576,175 @@ def _parse_supabase_payload(
     return record
 
 
-def _resolve_podcast_audio(record: dict[str, Any]) -> None:
-    if not os.getenv("PASTPUZZLE_RESOLVE_AUDIO", "1").strip() in {"1", "true", "yes"}:
-        return
-    podcasts = record.get("podcasts")
-    if not isinstance(podcasts, list):
-        return
-    require_audio = os.getenv("PASTPUZZLE_AUDIO_REQUIRED", "0").strip().lower() in {
-        "1",
-        "true",
-        "yes",
-    }
-    for podcast in podcasts:
-        if not isinstance(podcast, dict):
-            continue
-        page_url = podcast.get("page_url")
-        if not page_url or podcast.get("audio_url"):
-            continue
+def resolve_podcast_audio(
+    record: dict[str, Any], no_audio: Optional[NoAudioCache] = None
+) -> dict[str, str]:
+    """Fill audio_url, content_type, length, title and pub_date for unresolved podcasts.
+
+    A page that cannot be fetched is left unresolved instead of failing the record;
+    returns ``{page_url: error}`` for those pages so callers can queue a retry.
+    """
+    return resolve_podcasts([record], workers=1, no_audio=no_audio)
+
+
+def resolve_podcasts(
+    records: list[dict[str, Any]],
+    workers: Optional[int] = None,
+    no_audio: Optional[NoAudioCache] = None,
+) -> dict[str, str]:
+    """Resolve podcasts across many records, parsing pages in worker processes.
+
+    Pages are fetched in this process while up to ``2 * workers`` raw bodies wait in the
+    pool, so fetching stalls instead of buffering when parsers fall behind. Jobs with
+    fewer than PARSE_POOL_MIN_PAGES pages, or ``workers`` <= 1, parse in-process. Each
+    page_url is fetched once even when several records share it. Returns
+    ``{page_url: error}`` for pages that could not be fetched.
+
+    With a ``no_audio`` cache, pages recently found to have no audio are skipped, and
+    every parsed page updates the cache; the caller saves it.
+    """
+    if not _resolve_enabled():
+        return {}
+    require_audio = _audio_required()
+    now = datetime.now(timezone.utc)
+    by_url: dict[str, list[dict[str, Any]]] = {}
+    skipped = 0
+    for record in records:
+        for podcast in _unresolved_podcasts(record):
+            page_url = podcast["page_url"]
+            if no_audio is not None and not require_audio and no_audio.fresh(page_url, now):
+                skipped += 1
+                continue
+            by_url.setdefault(page_url, []).append(podcast)
+    failures: dict[str, str] = {}
+
+    def apply(parsed: dict[str, Any]) -> None:
+        if no_audio is not None:
+            if parsed.get("audio_url"):
+                no_audio.hit(parsed["page_url"])
+            else:
+                no_audio.miss(parsed["page_url"], now)
+        for podcast in by_url[parsed["page_url"]]:
+            _apply_parsed_podcast(podcast, parsed, require_audio)
+
+    workers = workers if workers is not None else _parse_workers()
+    with metrics.span("resolve_podcasts", pages=len(by_url), skipped=skipped) as fields:
+        if len(by_url) < PARSE_POOL_MIN_PAGES or workers <= 1:
+            for page_url in by_url:
+                response = _fetch_podcast_page(page_url, failures)
+                if response is None:
+                    continue
+                with metrics.span("parse_podcast_page"):
+                    apply(_parse_podcast_page(response.text, page_url))
+        else:
+            _resolve_in_pool(list(by_url), workers, apply, failures)
+        fields["failed"] = len(failures)
+    if failures and require_audio:
+        raise ValueError(
+            f"Unable to fetch podcast pages: {', '.join(sorted(failures))}."
+        )
+    return failures
+
+
+def _resolve_in_pool(
+    page_urls: list[str],
+    workers: int,
+    apply: Callable[[dict[str, Any]], None],
+    failures: dict[str, str],
+) -> None:
+    import multiprocessing
+    from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+
+    def apply_done(done: set[Future]) -> None:
+        for future in done:
+            apply(future.result())
+
+    # Callers such as `sources` resolve from several threads; forking a threaded
+    # process can deadlock a child, so start workers from a clean forkserver instead.
+    context = (
+        multiprocessing.get_context("forkserver")
+        if "forkserver" in multiprocessing.get_all_start_methods()
+        else None
+    )
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        pending: set[Future] = set()
+        for page_url in page_urls:
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                apply_done(done)
+            response = _fetch_podcast_page(page_url, failures)
+            if response is None:
+                continue
+            pending.add(
+                pool.submit(_parse_podcast_bytes, response.content, response.encoding, page_url)
+            )
+        apply_done(wait(pending).done)
+
+
+def _fetch_podcast_page(page_url: str, failures: dict[str, str]) -> Optional[httpx.Response]:
+    try:
         response = _request_with_backoff("GET", page_url)
         response.raise_for_status()
-        parsed = _parse_podcast_page(response.text, page_url)
-        audio_url = parsed.get("audio_url")
-        if not audio_url:
-            if require_audio:
-                raise ValueError(
-                    f"Unable to locate audio URL for podcast page {page_url}."
-                )
-            continue
-        podcast["audio_url"] = audio_url
-        podcast["content_type"] = _infer_mime_type(audio_url)
+    except httpx.HTTPError as exc:
+        failures[page_url] = str(exc) or type(exc).__name__
+        return None
+    return response
+
+
+def _parse_podcast_bytes(content: bytes, encoding: Optional[str], page_url: str) -> dict[str, Any]:
+    """Process-pool entry point: decode and parse one raw podcast page."""
+    html = content.decode(encoding or "utf-8", errors="replace")
+    return _parse_podcast_page(html, page_url)
+
+
+def _apply_parsed_podcast(
+    podcast: dict[str, Any], parsed: dict[str, Any], require_audio: bool
+) -> None:
+    audio_url = parsed.get("audio_url")
+    if not audio_url:
+        if require_audio:
+            raise ValueError(
+                f"Unable to locate audio URL for podcast page {podcast['page_url']}."
+            )
+        return
+    podcast["audio_url"] = audio_url
+    podcast["content_type"] = _infer_mime_type(audio_url)
+    with metrics.span("probe_enclosure"):
         podcast["length"] = _fetch_content_length(audio_url)
-        if parsed.get("title"):
-            podcast["title"] = parsed["title"]
-        if parsed.get("pub_date"):
-            podcast["pub_date"] = parsed["pub_date"]
+    if parsed.get("title"):
+        podcast["title"] = parsed["title"]
+    if parsed.get("pub_date"):
+        podcast["pub_date"] = parsed["pub_date"]
+
+
+def _unresolved_podcasts(record: dict[str, Any]) -> list[dict[str, Any]]:
+    podcasts = record.get("podcasts")
+    if not isinstance(podcasts, list):
+        return []
+    return [
+        podcast
+        for podcast in podcasts
+        if isinstance(podcast, dict) and podcast.get("page_url") and not podcast.get("audio_url")
+    ]
+
+
+def _resolve_enabled() -> bool:
+    return getenv("PASTPUZZLE_RESOLVE_AUDIO", "1").strip() in {"1", "true", "yes"}
+
+
+def _audio_required() -> bool:
+    return getenv("PASTPUZZLE_AUDIO_REQUIRED", "0").strip().lower() in {"1", "true", "yes"}
+
+
+def _parse_workers() -> int:
+    value = getenv("PASTPUZZLE_PARSE_WORKERS")
+    if value:
+        return int(value)
+    return os.cpu_count() or 1
 
 
 def _extract_audio_url(html: str) -> Optional[str]:
-    soup = BeautifulSoup(html, "lxml")
+    soup = _parse_html(html)
     for selector in ["audio source", "audio"]:
         for element in soup.select(selector):
             src = element.get("src")
@@ -565,7 +799,7 @@ def _parse_podcast_page(html: str, page_url: str) -> dict[str, Any]:
 
 
 def _extract_wdr_audio_url(html: str) -> Optional[str]:
-    soup = BeautifulSoup(html, "lxml")
+    soup = _parse_html(html)
     for link in soup.find_all("a"):
         href = link.get("href", "")
         text = link.get_text(" ", strip=True).lower()
@@ -577,7 +811,7 @@ def _extract_wdr_audio_url(html: str) -> Optional[str]:
     return match.group(0) if match else None
 
 
-def _extract_audio_url_from_links(soup: BeautifulSoup) -> Optional[str]:
+def _extract_audio_url_from_links(soup: "BeautifulSoup") -> Optional[str]:
     keywords = ("audio", "download", "herunterladen", "podcast")
     for link in soup.find_all("a"):
         href = link.get("href", "")
@@ -600,7 +834,7 @@ def _normalize_audio_url(url: str, page_url: str) -> str:
 
 
 def _extract_title(html: str) -> Optional[str]:
-    soup = BeautifulSoup(html, "lxml")
+    soup = _parse_html(html)
     headline = soup.find("h1")
     if headline:
         text = headline.get_text(" ", strip=True)
@@ -609,7 +843,7 @@ def _extract_title(html: str) -> Optional[str]:
 
 
 def _extract_pub_date(html: str) -> Optional[str]:
-    soup = BeautifulSoup(html, "lxml")
+    soup = _parse_html(html)
     meta = soup.find("meta", attrs={"property": "article:published_time"})
     if meta and meta.get("content"):
         match = re.search(r"(\d{4}-\d{2}-\d{2})", meta["content"])
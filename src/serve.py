@@ -0,0 +1,272 @@
+import asyncio
+import json
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from pathlib import Path
+from typing import Optional
+
+from .archive import source_stamp
+from .artifacts import artifact_path_for, read_etag
+from .generate_feed import FeedConfig, feed_is_current, manifest_path_for, write_feed
+
+
+CONTENT_TYPES = {
+    ".xml": "application/rss+xml; charset=utf-8",
+    ".atom": "application/atom+xml; charset=utf-8",
+    ".json": "application/feed+json; charset=utf-8",
+}
+ENCODINGS = ("br", "gzip")
+CACHE_CONTROL = "public, max-age=300"
+READ_TIMEOUT = 15.0
+MAX_HEADER_LINES = 100
+
+
+@dataclass
+class Document:
+    """A rendered feed file and its precompressed variants, held in memory."""
+
+    body: bytes
+    content_type: str
+    etag: str
+    last_modified: datetime
+    encoded: dict[str, bytes]
+
+
+@dataclass
+class Response:
+    status: int
+    reason: str
+    headers: dict[str, str]
+    body: bytes = b""
+
+
+class FeedStore:
+    """Keeps every feed document in memory and rebuilds it when the archive changes."""
+
+    def __init__(self, feed_path: Path, archive_path: Path, config: FeedConfig) -> None:
+        self.feed_path = feed_path
+        self.archive_path = archive_path
+        self.config = config
+        self.documents: dict[str, Document] = {}
+        self.default_name = config.outputs_for(feed_path)[0].name
+        self._stamp: Optional[list[Optional[list[int]]]] = None
+
+    def refresh(self) -> bool:
+        """Rebuild and reload documents if the archive changed; True when reloaded."""
+        stamp = source_stamp(self.archive_path)
+        if stamp == self._stamp and self.documents:
+            return False
+        if not feed_is_current(self.feed_path, self.archive_path, self.config):
+            write_feed(self.feed_path, self.archive_path, self.config)
+        self.documents = _load_documents(self.feed_path)
+        self._stamp = stamp
+        return True
+
+    def respond(self, method: str, target: str, headers: dict[str, str]) -> Response:
+        if method not in {"GET", "HEAD"}:
+            return _plain_response(405, "Method Not Allowed", {"Allow": "GET, HEAD"})
+        name = target.split("?", 1)[0].lstrip("/") or self.default_name
+        document = self.documents.get(name)
+        if document is None:
+            return _plain_response(404, "Not Found")
+
+        encoding = _negotiate_encoding(headers.get("accept-encoding", ""), document)
+        etag = _encoded_etag(document.etag, encoding)
+        response_headers = {
+            "Content-Type": document.content_type,
+            "ETag": etag,
+            "Last-Modified": format_datetime(document.last_modified, usegmt=True),
+            "Cache-Control": CACHE_CONTROL,
+            "Vary": "Accept-Encoding",
+        }
+        if _not_modified(headers, document, etag):
+            return Response(304, "Not Modified", response_headers)
+        body = document.encoded[encoding] if encoding else document.body
+        if encoding:
+            response_headers["Content-Encoding"] = encoding
+        response_headers["Content-Length"] = str(len(body))
+        return Response(200, "OK", response_headers, b"" if method == "HEAD" else body)
+
+
+async def serve(
+    store: FeedStore,
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    reload_interval: float = 5.0,
+    ready: Optional["asyncio.Future[int]"] = None,
+) -> None:
+    """Serve feed documents until cancelled, polling the archive for changes.
+
+    ``ready`` receives the bound port once the listener is up.
+    """
+    await asyncio.to_thread(store.refresh)
+    server = await asyncio.start_server(
+        lambda reader, writer: _handle_connection(store, reader, writer), host, port
+    )
+    if ready is not None:
+        ready.set_result(server.sockets[0].getsockname()[1])
+    async with server:
+        watcher = asyncio.create_task(_watch_archive(store, reload_interval))
+        try:
+            await server.serve_forever()
+        finally:
+            watcher.cancel()
+
+
+def run(
+    feed_path: Path,
+    archive_path: Path,
+    config: FeedConfig,
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    reload_interval: float = 5.0,
+) -> None:
+    store = FeedStore(feed_path, archive_path, config)
+    try:
+        asyncio.run(serve(store, host, port, reload_interval))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _watch_archive(store: FeedStore, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(store.refresh)
+        except Exception as exc:  # keep serving the last good documents
+            print(f"Feed reload failed: {exc}", file=sys.stderr)
+
+
+async def _handle_connection(
+    store: FeedStore, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    try:
+        while True:
+            request = await _read_request(reader)
+            if request is None:
+                break
+            method, target, version, headers = request
+            response = store.respond(method, target, headers)
+            keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+            response.headers["Connection"] = "keep-alive" if keep_alive else "close"
+            writer.write(_encode_response(response))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.TimeoutError, ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def _read_request(
+    reader: asyncio.StreamReader,
+) -> Optional[tuple[str, str, str, dict[str, str]]]:
+    line = await asyncio.wait_for(reader.readline(), READ_TIMEOUT)
+    if not line:
+        return None
+    parts = line.decode("latin-1").split()
+    if len(parts) != 3:
+        raise ValueError("Malformed request line.")
+    method, target, version = parts
+    headers: dict[str, str] = {}
+    for _ in range(MAX_HEADER_LINES):
+        header_line = await asyncio.wait_for(reader.readline(), READ_TIMEOUT)
+        if header_line in {b"\r\n", b"\n", b""}:
+            return method.upper(), target, version, headers
+        name, _, value = header_line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    raise ValueError("Too many request headers.")
+
+
+def _encode_response(response: Response) -> bytes:
+    lines = [f"HTTP/1.1 {response.status} {response.reason}"]
+    lines.extend(f"{name}: {value}" for name, value in response.headers.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + response.body
+
+
+def _plain_response(status: int, reason: str, headers: Optional[dict[str, str]] = None) -> Response:
+    body = f"{reason}\n".encode("utf-8")
+    return Response(
+        status,
+        reason,
+        {
+            **(headers or {}),
+            "Content-Type": "text/plain; charset=utf-8",
+            "Content-Length": str(len(body)),
+        },
+        body,
+    )
+
+
+def _load_documents(feed_path: Path) -> dict[str, Document]:
+    with manifest_path_for(feed_path).open("r", encoding="utf-8") as handle:
+        outputs = json.load(handle)["outputs"]
+    documents = {}
+    for name in outputs:
+        if f"{name}.etag" not in outputs:
+            continue
+        path = feed_path.with_name(name)
+        encoded = {}
+        for encoding in ENCODINGS:
+            artifact = artifact_path_for(path, encoding)
+            if artifact.exists():
+                encoded[encoding] = artifact.read_bytes()
+        modified = datetime.fromtimestamp(int(path.stat().st_mtime), tz=timezone.utc)
+        documents[name] = Document(
+            body=path.read_bytes(),
+            content_type=CONTENT_TYPES.get(path.suffix, "application/octet-stream"),
+            etag=read_etag(path) or "",
+            last_modified=modified,
+            encoded=encoded,
+        )
+    return documents
+
+
+def _negotiate_encoding(accept_encoding: str, document: Document) -> Optional[str]:
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in ENCODINGS:
+        if encoding in document.encoded and accepted.get(encoding, 0.0) > 0:
+            return encoding
+    return None
+
+
+def _encoded_etag(etag: str, encoding: Optional[str]) -> str:
+    """Each representation needs its own strong validator."""
+    if not encoding or not etag:
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def _not_modified(headers: dict[str, str], document: Document, etag: str) -> bool:
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag in candidates or document.etag in candidates
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return document.last_modified <= since
+    return False
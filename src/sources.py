@@ -0,0 +1,154 @@
+import contextvars
+import tomllib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from .environment import overridden
+from .pipeline import publish_record, scrape_record
+
+
+SOURCES_PATH = Path("pastpuzzle.toml")
+
+
+@dataclass(frozen=True)
+class Source:
+    name: str
+    archive_path: Path
+    feed_path: Path
+    env: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class SourcesConfig:
+    sources: list[Source]
+    host_rate: float = 0.0
+    workers: int = 0
+
+
+def load_sources(path: Path = SOURCES_PATH) -> SourcesConfig:
+    """Parse a TOML file with one ``[sources.<name>]`` table per feed.
+
+    Each source needs ``archive`` and ``feed`` paths and may set environment
+    overrides in ``[sources.<name>.env]``. Top-level ``host_rate`` (requests per
+    second per host, shared by all sources) and ``workers`` are optional.
+    """
+    with path.open("rb") as handle:
+        data = tomllib.load(handle)
+    tables = data.get("sources")
+    if not isinstance(tables, dict) or not tables:
+        raise ValueError(f"{path} must define at least one [sources.<name>] table.")
+    sources = []
+    # Podcast store, index, retry queue, no-audio cache, enclosure state and job
+    # journals live next to the archive, and the fragment cache next to the feed, so
+    # concurrent sources need directories of their own.
+    directories: dict[tuple[str, Path], str] = {}
+    for name, table in tables.items():
+        source = _parse_source(name, table)
+        for kind, target in (("archive", source.archive_path), ("feed", source.feed_path)):
+            directory = target.parent.resolve()
+            other = directories.setdefault((kind, directory), name)
+            if other != name:
+                raise ValueError(
+                    f"Sources {other!r} and {name!r} keep their {kind} in the same "
+                    f"directory ({target.parent}); give each source its own."
+                )
+        sources.append(source)
+    return SourcesConfig(
+        sources=sources,
+        host_rate=float(data.get("host_rate", 0)),
+        workers=int(data.get("workers", 0)),
+    )
+
+
+def run_sources(
+    config: SourcesConfig,
+    only: Optional[list[str]] = None,
+    check_only: bool = False,
+    echo: Callable[[str], None] = print,
+) -> dict[str, Optional[str]]:
+    """Scrape and publish every source concurrently; returns ``{name: error or None}``.
+
+    Sources run in threads that share the process-wide HTTP client, token managers and
+    anon-key cache, plus one per-host rate limiter when ``host_rate`` is set. Each
+    thread sees its source's settings through :func:`environment.overridden`.
+    """
+    from .scrape import HostRateLimiter, set_host_rate_limiter
+
+    unknown = set(only or ()) - {source.name for source in config.sources}
+    if unknown:
+        raise ValueError(f"Unknown source(s): {', '.join(sorted(unknown))}.")
+    selected = [source for source in config.sources if not only or source.name in only]
+    set_host_rate_limiter(HostRateLimiter(config.host_rate) if config.host_rate > 0 else None)
+    results: dict[str, Optional[str]] = {}
+    try:
+        with ThreadPoolExecutor(max_workers=config.workers or len(selected) or 1) as pool:
+            futures = {
+                source.name: pool.submit(
+                    contextvars.copy_context().run, run_source, source, check_only, echo
+                )
+                for source in selected
+            }
+            for name, future in futures.items():
+                try:
+                    future.result()
+                    results[name] = None
+                except Exception as exc:  # one broken source must not stop the others
+                    results[name] = str(exc) or type(exc).__name__
+                    echo(f"[{name}] failed: {results[name]}")
+    finally:
+        set_host_rate_limiter(None)
+    return results
+
+
+def run_source(
+    source: Source, check_only: bool = False, echo: Callable[[str], None] = print
+) -> None:
+    """Scrape one source and update its archive and feed, with its settings applied."""
+    from .generate_feed import FeedConfig
+
+    def say(message: str) -> None:
+        echo(f"[{source.name}] {message}")
+
+    with overridden({**source.env, "ARCHIVE_PATH": str(source.archive_path)}):
+        record, merge, failures = scrape_record(
+            source.archive_path, use_no_audio_cache=not check_only
+        )
+        for page_url, error in failures.items():
+            say(f"Podcast page failed ({error}): {page_url}")
+        if check_only:
+            say(f"Scrape OK for {record['date']}.")
+            return
+        publish_record(
+            record,
+            source.archive_path,
+            merge,
+            failures,
+            source.feed_path,
+            FeedConfig.from_env(),
+            say,
+        )
+
+
+def _parse_source(name: str, table: Any) -> Source:
+    if not isinstance(table, dict):
+        raise ValueError(f"[sources.{name}] must be a table.")
+    for key in ("archive", "feed"):
+        if not isinstance(table.get(key), str) or not table[key]:
+            raise ValueError(f"[sources.{name}] needs a {key!r} path.")
+    env = table.get("env", {})
+    if not isinstance(env, dict):
+        raise ValueError(f"[sources.{name}.env] must be a table.")
+    return Source(
+        name=name,
+        archive_path=Path(table["archive"]),
+        feed_path=Path(table["feed"]),
+        env={str(key): _env_value(value) for key, value in env.items()},
+    )
+
+
+def _env_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    return str(value)
@@ -1,4 +1,15 @@
-from src.archive import _merge_records
+import json
+
+import pytest
+
+from src.archive import (
+    _merge_records,
+    load_archive,
+    load_podcasts,
+    podcasts_path_for,
+    save_archive,
+    update_podcast,
+)
 
 
 def test_merge_records_prefers_existing_values():
@@ -26,3 +37,93 @@ def test_merge_records_prefers_existing_values():
     assert {"page_url": "https://example.com/extra"} in merged["extras"]
     assert {"page_url": "https://example.com/extra2"} in merged["extras"]
     assert {"page_url": "https://example.com/podcast2"} in merged["podcasts"]
+
+
+def test_save_archive_stores_shared_podcasts_once(tmp_path):
+    archive_path = tmp_path / "archive.json"
+    podcast = {
+        "page_url": "https://example.com/podcast",
+        "audio_url": "https://cdn.example.com/episode.mp3",
+        "content_type": "audio/mpeg",
+        "length": 1234,
+        "title": "Episode",
+    }
+    records = [
+        {"date": "2025-01-01", "podcasts": [dict(podcast)]},
+        {"date": "2025-01-02", "podcasts": [dict(podcast)]},
+    ]
+    save_archive(records, archive_path)
+
+    raw = json.loads(archive_path.read_text(encoding="utf-8"))
+    assert raw[0]["podcasts"] == [{"page_url": "https://example.com/podcast"}]
+    store = load_podcasts(podcasts_path_for(archive_path))
+    assert store["https://example.com/podcast"]["length"] == 1234
+    assert load_archive(archive_path) == records
+
+    update_podcast("https://example.com/podcast", {"length": 4321}, archive_path)
+    loaded = load_archive(archive_path)
+    assert [record["podcasts"][0]["length"] for record in loaded] == [4321, 4321]
+
+
+@pytest.mark.parametrize("suffix", [".gz", ".zst"])
+def test_compressed_archive_round_trip(tmp_path, suffix):
+    if suffix == ".zst":
+        pytest.importorskip("zstandard")
+    archive_path = tmp_path / f"archive.json{suffix}"
+    records = [
+        {
+            "date": "2025-01-01",
+            "podcasts": [
+                {"page_url": "https://example.com/p", "audio_url": "https://cdn.example.com/p.mp3"}
+            ],
+        }
+    ]
+    save_archive(records, archive_path)
+    assert not archive_path.read_bytes().startswith(b"[")
+    assert podcasts_path_for(archive_path).name == f"podcasts.json{suffix}"
+    assert load_archive(archive_path) == records
+
+    renamed = tmp_path / "archive.json"
+    archive_path.rename(renamed)
+    assert load_archive(renamed)[0]["date"] == "2025-01-01"
+
+
+def test_merge_records_dedupes_podcasts_by_page_url():
+    existing = {
+        "date": "2025-01-01",
+        "podcasts": [{"page_url": "https://example.com/p", "title": "Old"}],
+    }
+    incoming = {
+        "date": "2025-01-01",
+        "podcasts": [
+            {"page_url": "https://example.com/p", "audio_url": "https://cdn.example.com/p.mp3"},
+            {"page_url": "https://example.com/q"},
+        ],
+    }
+    merged = _merge_records(existing, incoming)
+    assert merged["podcasts"] == [
+        {
+            "page_url": "https://example.com/p",
+            "title": "Old",
+            "audio_url": "https://cdn.example.com/p.mp3",
+        },
+        {"page_url": "https://example.com/q"},
+    ]
+
+
+def test_save_archive_clears_explicitly_emptied_podcast_fields(tmp_path):
+    archive_path = tmp_path / "archive.json"
+    podcast = {
+        "page_url": "https://example.com/p",
+        "audio_url": "https://cdn.example.com/p.mp3",
+        "title": "Episode",
+    }
+    save_archive([{"date": "2025-01-01", "podcasts": [podcast]}], archive_path)
+
+    records = load_archive(archive_path)
+    records[0]["podcasts"][0]["title"] = ""
+    del records[0]["podcasts"][0]["audio_url"]
+    save_archive(records, archive_path)
+
+    store = load_podcasts(podcasts_path_for(archive_path))
+    assert store["https://example.com/p"] == {"audio_url": "https://cdn.example.com/p.mp3"}
@@ -0,0 +1,43 @@
+import gzip
+
+import pytest
+
+from src.artifacts import (
+    artifact_path_for,
+    content_etag,
+    parse_codecs,
+    read_etag,
+    write_artifacts,
+)
+
+
+def test_write_artifacts_only_when_content_changes(tmp_path):
+    feed_path = tmp_path / "feed.xml"
+    feed_path.write_text("<rss>first</rss>\n", encoding="utf-8")
+    assert write_artifacts(feed_path, ["gzip"])
+    gz_path = artifact_path_for(feed_path, "gzip")
+    assert gzip.decompress(gz_path.read_bytes()) == feed_path.read_bytes()
+    assert read_etag(feed_path) == content_etag(feed_path)
+
+    first_bytes = gz_path.read_bytes()
+    assert not write_artifacts(feed_path, ["gzip"])
+
+    feed_path.write_text("<rss>second</rss>\n", encoding="utf-8")
+    assert write_artifacts(feed_path, ["gzip"])
+    assert gz_path.read_bytes() != first_bytes
+
+
+def test_write_brotli_artifact(tmp_path):
+    brotli = pytest.importorskip("brotli")
+    feed_path = tmp_path / "feed.xml"
+    feed_path.write_text("<rss>" + "item " * 1000 + "</rss>\n", encoding="utf-8")
+    write_artifacts(feed_path, ["br"])
+    br_path = artifact_path_for(feed_path, "br")
+    assert brotli.decompress(br_path.read_bytes()) == feed_path.read_bytes()
+
+
+def test_parse_codecs():
+    assert parse_codecs("none") == []
+    assert parse_codecs("gzip, br") == ["gzip", "br"]
+    with pytest.raises(ValueError):
+        parse_codecs("lzma")
@@ -0,0 +1,102 @@
+import base64
+import json
+
+import httpx
+
+from src import auth, scrape
+from src.auth import TokenManager, load_session, save_session
+from src.environment import overridden
+
+
+BASE_URL = "https://project.supabase.co"
+
+
+def _jwt(exp, role="authenticated", sub="user-1"):
+    def encode(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+    payload = {"exp": exp, "role": role, "iss": f"{BASE_URL}/auth/v1", "sub": sub}
+    return f"{encode({'alg': 'HS256'})}.{encode(payload)}.signature"
+
+
+def test_token_is_refreshed_before_expiry_and_persisted(tmp_path, monkeypatch):
+    state_path = tmp_path / "storage_state.json"
+    expiring = _jwt(1_000)
+    save_session({"access_token": expiring, "refresh_token": "r1"}, BASE_URL, state_path)
+    rotated = _jwt(5_000)
+    calls = []
+
+    def fake_request(method, url, headers=None, json=None):
+        calls.append((url, json))
+        body = {"access_token": rotated, "refresh_token": "r2", "expires_in": 3600}
+        return httpx.Response(200, json=body, request=httpx.Request(method, url))
+
+    monkeypatch.setattr(auth, "_request_with_backoff", fake_request)
+    manager = TokenManager(expiring, "anon-key", state_path, leeway=120)
+
+    assert manager.token(now=500) == expiring
+    assert manager.token(now=900) == rotated
+    assert calls == [
+        (f"{BASE_URL}/auth/v1/token?grant_type=refresh_token", {"refresh_token": "r1"})
+    ]
+    assert load_session(state_path)["refresh_token"] == "r2"
+
+    # A new process seeded with the stale .env token starts from the rotated one.
+    assert TokenManager(expiring, "anon-key", state_path).token(now=900) == rotated
+
+
+def test_stored_session_of_another_account_is_left_alone(tmp_path, monkeypatch):
+    state_path = tmp_path / "storage_state.json"
+    other = _jwt(9_000, sub="user-2")
+    save_session({"access_token": other, "refresh_token": "r-other"}, BASE_URL, state_path)
+    monkeypatch.setattr(auth, "_request_with_backoff", None)  # any grant would fail loudly
+
+    seed = _jwt(1_000)
+    manager = TokenManager(seed, "anon-key", state_path)
+
+    assert manager.token(now=950) == seed
+    assert not manager.refresh()
+    assert load_session(state_path)["refresh_token"] == "r-other"
+
+
+def test_sources_with_their_own_storage_state_get_their_own_manager(tmp_path, monkeypatch):
+    monkeypatch.setattr(auth, "_managers", {})
+    token = _jwt(10**10)
+    with overridden({"PASTPUZZLE_STORAGE_STATE": str(tmp_path / "a.json")}):
+        first = auth.token_manager(token, "anon-key")
+    with overridden({"PASTPUZZLE_STORAGE_STATE": str(tmp_path / "b.json")}):
+        second = auth.token_manager(token, "anon-key")
+    assert first is not second
+    assert second.storage_state_path == tmp_path / "b.json"
+
+
+def test_anon_keys_are_not_managed():
+    assert auth.token_manager(_jwt(10**10, role="anon"), "anon-key") is None
+    assert auth.token_manager("not-a-jwt", "anon-key") is None
+
+
+def test_failed_refresh_after_401_falls_back_to_anon_key(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(auth, "_managers", {})
+    state_path = tmp_path / "storage_state.json"
+    monkeypatch.setenv("PASTPUZZLE_STORAGE_STATE", str(state_path))
+    token = _jwt(10**10)
+    save_session({"access_token": token, "refresh_token": "r1"}, BASE_URL, state_path)
+
+    def failing_grant(method, url, headers=None, json=None):
+        request = httpx.Request(method, url)
+        return httpx.Response(400, json={"error": "invalid_grant"}, request=request)
+
+    sent = []
+
+    def fake_send(method, url, headers, body):
+        sent.append(headers["authorization"])
+        status = 200 if headers["authorization"] == "Bearer anon-key" else 401
+        return httpx.Response(status, json={"ok": True}, request=httpx.Request(method, url))
+
+    monkeypatch.setattr(auth, "_request_with_backoff", failing_grant)
+    monkeypatch.setattr(scrape, "_send_request", fake_send)
+    headers = {"apikey": "anon-key", "authorization": f"Bearer {token}"}
+
+    assert scrape._fetch_payload("https://example.com/rpc", "GET", headers, {}) == {"ok": True}
+    assert sent == [f"Bearer {token}", "Bearer anon-key"]
+    assert "Token refresh failed" in capsys.readouterr().err
@@ -0,0 +1,63 @@
+from datetime import datetime, time, timezone
+
+from src import daemon as daemon_module
+from src.archive import load_archive, save_archive
+from src.daemon import Daemon, DaemonConfig, expected_date, next_poll_delay
+from src.generate_feed import FeedConfig
+
+
+CONFIG = DaemonConfig(rollover=time(4, 0), lead=60, poll_interval=30, max_interval=600)
+
+
+def _record(date_value, audio_url=None):
+    podcast = {"page_url": f"https://example.com/{date_value}"}
+    if audio_url:
+        podcast["audio_url"] = audio_url
+    return {"date": date_value, "answer_year": 1969, "podcasts": [podcast]}
+
+
+def test_poll_delay_adapts_to_rollover():
+    before = datetime(2025, 1, 2, 3, 0, tzinfo=timezone.utc)
+    assert expected_date(before, CONFIG) == "2025-01-01"
+    assert next_poll_delay(before, CONFIG, have_current=True, misses=0) == 3600 - 60
+    assert next_poll_delay(before.replace(hour=3, minute=59), CONFIG, True, 0) == 30
+
+    after = datetime(2025, 1, 2, 4, 1, tzinfo=timezone.utc)
+    assert expected_date(after, CONFIG) == "2025-01-02"
+    assert [next_poll_delay(after, CONFIG, False, misses) for misses in (1, 2, 3, 10)] == [
+        30,
+        60,
+        120,
+        600,
+    ]
+
+
+def test_step_stores_new_day_and_retries_missing_audio(tmp_path, monkeypatch):
+    archive_path = tmp_path / "archive.json"
+    feed_path = tmp_path / "feed.xml"
+    save_archive([_record("2025-01-01")], archive_path)
+
+    def fake_resolve(record, no_audio=None):
+        for podcast in record["podcasts"]:
+            podcast.setdefault("audio_url", "https://cdn.example.com/late.mp3")
+        return {}
+
+    new_day = _record("2025-01-02", "https://cdn.example.com/b.mp3")
+    monkeypatch.setattr(daemon_module, "fetch_puzzle", lambda resolve=True: new_day)
+    monkeypatch.setattr(daemon_module, "resolve_podcast_audio", fake_resolve)
+    messages: list[str] = []
+    daemon = Daemon(
+        archive_path, feed_path, CONFIG, FeedConfig(feed_days=0, precompress=()), messages.append
+    )
+
+    delay = daemon.step(datetime(2025, 1, 2, 4, 1, tzinfo=timezone.utc))
+
+    assert delay == 24 * 3600 - 60 - 60
+    records = {record["date"]: record for record in load_archive(archive_path)}
+    assert records["2025-01-01"]["podcasts"][0]["audio_url"] == "https://cdn.example.com/late.mp3"
+    assert "2025-01-02" in feed_path.read_text(encoding="utf-8")
+    assert messages == [
+        "Updated archive for 2025-01-02.",
+        "Resolved podcast audio for 2025-01-01.",
+    ]
+    assert not daemon.poll()
@@ -0,0 +1,199 @@
+import json
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from src.archive import save_archive
+from src.generate_feed import (
+    FeedConfig,
+    FeedOutput,
+    feed_is_current,
+    generate_feed,
+    iter_feed,
+    write_feed,
+    write_if_changed,
+)
+
+
+RECORDS = [
+    {
+        "date": "2025-01-01",
+        "answer_year": 1969,
+        "podcasts": [
+            {
+                "page_url": "https://example.com/a?x=1&y=2",
+                "audio_url": "https://cdn.example.com/a.mp3",
+                "content_type": "audio/mpeg",
+                "length": 123,
+                "title": "Tom & Jerry",
+            }
+        ],
+    },
+    {
+        "date": "2025-01-02",
+        "answer_year": 1848,
+        "podcasts": [
+            {"page_url": "https://example.com/b", "audio_url": "https://cdn.example.com/b.mp3"}
+        ],
+    },
+]
+
+
+def test_generate_feed_escapes_item_content(tmp_path):
+    archive_path = tmp_path / "archive.json"
+    save_archive(RECORDS, archive_path)
+    feed = generate_feed(archive_path)
+    assert "<title>Tom &amp; Jerry</title>" in feed
+    assert '<enclosure url="https://cdn.example.com/a.mp3" length="123" type="audio/mpeg" />' in feed
+    assert feed.endswith("</channel></rss>\n")
+
+
+def test_generate_feed_reuses_cached_fragments(tmp_path):
+    archive_path = tmp_path / "archive.json"
+    cache_path = tmp_path / "feed_fragments.json"
+    save_archive(RECORDS, archive_path)
+    uncached = generate_feed(archive_path)
+    assert generate_feed(archive_path, cache_path=cache_path) == uncached
+
+    cache = json.loads(cache_path.read_text(encoding="utf-8"))
+    assert len(cache) == 2
+    cache = {key: "<item>cached</item>" for key in cache}
+    cache_path.write_text(json.dumps(cache), encoding="utf-8")
+    assert generate_feed(archive_path, cache_path=cache_path).count("<item>cached</item>") == 2
+
+    save_archive([RECORDS[0], {**RECORDS[1], "answer_year": 1849}], archive_path)
+    feed = generate_feed(archive_path, cache_path=cache_path)
+    assert feed.count("<item>cached</item>") == 1
+    assert "Answer year: 1849" in feed
+
+
+def test_write_if_changed_compares_streamed_chunks(tmp_path):
+    path = tmp_path / "feed.xml"
+    assert write_if_changed(path, iter(["<rss>", "</rss>\n"]))
+    mtime = path.stat().st_mtime_ns
+    assert not write_if_changed(path, iter(["<rss></rss>", "\n"]))
+    assert path.stat().st_mtime_ns == mtime
+    assert write_if_changed(path, iter(["<rss>"]))
+    assert path.read_text(encoding="utf-8") == "<rss>"
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_iter_feed_yields_header_items_and_footer(tmp_path):
+    archive_path = tmp_path / "archive.json"
+    save_archive(RECORDS, archive_path)
+    chunks = list(iter_feed(archive_path))
+    assert len(chunks) == len(RECORDS) + 2
+    assert chunks[0].startswith("<?xml version='1.0' encoding='utf-8'?>\n<rss ")
+    assert all(chunk.startswith("<item>") for chunk in chunks[1:-1])
+    assert chunks[-1] == "</channel></rss>\n"
+
+
+def test_feed_is_current_tracks_manifest_inputs(tmp_path, monkeypatch):
+    archive_path = tmp_path / "archive.json"
+    feed_path = tmp_path / "feed.xml"
+    save_archive(RECORDS, archive_path)
+    assert not feed_is_current(feed_path, archive_path)
+
+    assert write_feed(feed_path, archive_path)
+    assert "<lastBuildDate>Thu, 02 Jan 2025 00:00:00 GMT</lastBuildDate>" in feed_path.read_text(
+        encoding="utf-8"
+    )
+    assert feed_is_current(feed_path, archive_path)
+    assert not write_feed(feed_path, archive_path)
+
+    monkeypatch.setenv("PODCAST_AUTHOR", "Someone else")
+    assert not feed_is_current(feed_path, archive_path)
+    monkeypatch.delenv("PODCAST_AUTHOR")
+
+    save_archive(RECORDS[:1], archive_path)
+    assert not feed_is_current(feed_path, archive_path)
+
+
+def test_write_feed_emits_linked_yearly_archive_pages(tmp_path, monkeypatch):
+    monkeypatch.setenv("FEED_ARCHIVE_PAGES", "year")
+    monkeypatch.setenv("FEED_URL", "https://feeds.example.com/feed.xml")
+    monkeypatch.setenv("FEED_DAYS", "1")
+    archive_path = tmp_path / "archive.json"
+    feed_path = tmp_path / "feed.xml"
+    older = {**RECORDS[0], "date": "2024-12-31"}
+    save_archive([older, *RECORDS], archive_path)
+
+    assert write_feed(feed_path, archive_path)
+    current = feed_path.read_text(encoding="utf-8")
+    page_2024 = (tmp_path / "feed-2024.xml").read_text(encoding="utf-8")
+
+    assert current.count("<item>") == 1
+    assert 'href="https://feeds.example.com/feed-2024.xml" rel="prev-archive"' in current
+    assert "<fh:archive />" in page_2024
+    assert page_2024.count("<item>") == 1
+    assert "next-archive" not in page_2024
+    # 2025 is still the window's year, so its page is not published yet.
+    assert not (tmp_path / "feed-2025.xml").exists()
+
+    mtime = (tmp_path / "feed-2024.xml").stat().st_mtime_ns
+    save_archive([older, *RECORDS, {**RECORDS[1], "date": "2025-01-03"}], archive_path)
+    assert write_feed(feed_path, archive_path)
+    assert (tmp_path / "feed-2024.xml").stat().st_mtime_ns == mtime
+    assert feed_is_current(feed_path, archive_path)
+
+
+def test_write_feed_publishes_only_full_archive_pages(tmp_path, monkeypatch):
+    monkeypatch.setenv("FEED_ARCHIVE_PAGES", "2")
+    monkeypatch.setenv("FEED_DAYS", "1")
+    archive_path = tmp_path / "archive.json"
+    feed_path = tmp_path / "feed.xml"
+    records = [{**RECORDS[0], "date": f"2024-12-{day:02d}"} for day in range(27, 32)]
+    save_archive(records, archive_path)
+
+    assert write_feed(feed_path, archive_path)
+    assert (tmp_path / "feed-page-1.xml").read_text(encoding="utf-8").count("<item>") == 2
+    assert (tmp_path / "feed-page-2.xml").read_text(encoding="utf-8").count("<item>") == 2
+    assert not (tmp_path / "feed-page-3.xml").exists()
+
+    monkeypatch.setenv("FEED_ARCHIVE_PAGES", "3")
+    assert write_feed(feed_path, archive_path)
+    assert (tmp_path / "feed-page-1.xml").read_text(encoding="utf-8").count("<item>") == 3
+    assert not (tmp_path / "feed-page-2.xml").exists()
+    assert not (tmp_path / "feed-page-2.xml.etag").exists()
+    assert feed_is_current(feed_path, archive_path)
+
+
+def test_write_feed_emits_all_configured_outputs(tmp_path):
+    archive_path = tmp_path / "archive.json"
+    feed_path = tmp_path / "feed.xml"
+    extra = {"page_url": "https://example.com/wiki", "title": "Wiki", "tip_type": "wiki"}
+    save_archive([RECORDS[0], {**RECORDS[1], "extras": [extra]}], archive_path)
+    config = FeedConfig(
+        feed_days=0,
+        outputs=(
+            FeedOutput("rss", "feed.xml", False),
+            FeedOutput("rss", "feed-all.xml", True),
+            FeedOutput("json", "feed.json", False),
+            FeedOutput("atom", "feed.atom", True),
+        ),
+    )
+    assert write_feed(feed_path, archive_path, config)
+
+    assert feed_path.read_text(encoding="utf-8").count("<item>") == 2
+    assert (tmp_path / "feed-all.xml").read_text(encoding="utf-8").count("<item>") == 3
+    json_feed = json.loads((tmp_path / "feed.json").read_text(encoding="utf-8"))
+    assert json_feed["version"] == "https://jsonfeed.org/version/1.1"
+    assert [item["id"] for item in json_feed["items"]] == ["pastpuzzle:2025-01-01", "pastpuzzle:2025-01-02"]
+    assert json_feed["items"][0]["attachments"][0]["size_in_bytes"] == 123
+    atom = ET.parse(tmp_path / "feed.atom").getroot()
+    assert len(atom.findall("{http://www.w3.org/2005/Atom}entry")) == 3
+    assert feed_is_current(feed_path, archive_path, config)
+
+
+def test_feed_config_parses_outputs(monkeypatch):
+    monkeypatch.setenv("INCLUDE_NON_AUDIO", "1")
+    monkeypatch.setenv("FEED_OUTPUTS", "rss:feed.xml, rss+audio:audio.xml, json:feed.json")
+    config = FeedConfig.from_env()
+    assert config.outputs == (
+        FeedOutput("rss", "feed.xml", True),
+        FeedOutput("rss", "audio.xml", False),
+        FeedOutput("json", "feed.json", True),
+    )
+    monkeypatch.setenv("FEED_OUTPUTS", "csv:feed.csv")
+    with pytest.raises(ValueError):
+        FeedConfig.from_env()
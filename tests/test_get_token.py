@@ -0,0 +1,138 @@
+import base64
+import json
+import sys
+import time
+
+import httpx
+from click.testing import CliRunner
+
+from src import auth, get_token, scrape
+from src.auth import load_session, save_session
+
+
+def test_token_comes_from_refresh_grant_without_a_browser(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("PASTPUZZLE_API_KEY", "anon-key")
+    monkeypatch.setenv("PASTPUZZLE_SUPABASE_URL", "https://project.supabase.co")
+    monkeypatch.delenv("PASTPUZZLE_USER", raising=False)
+    monkeypatch.delenv("PASTPUZZLE_PASS", raising=False)
+    save_session({"access_token": "old", "refresh_token": "r1"}, "https://project.supabase.co")
+    grants = []
+
+    def fake_request(method, url, headers=None, json=None):
+        grants.append(url.rsplit("=", 1)[1])
+        body = {"access_token": "fresh", "refresh_token": "r2"}
+        return httpx.Response(200, json=body, request=httpx.Request(method, url))
+
+    monkeypatch.setattr(auth, "_request_with_backoff", fake_request)
+    monkeypatch.setitem(sys.modules, "playwright.sync_api", None)
+
+    result = CliRunner().invoke(get_token.main, ["--write-env"])
+
+    assert result.exit_code == 0, result.output
+    assert grants == ["refresh_token"]
+    assert "PASTPUZZLE_AUTHORIZATION=fresh" in (tmp_path / ".env").read_text(encoding="utf-8")
+    assert load_session()["refresh_token"] == "r2"
+
+
+def test_http_login_skips_anon_key_scan_without_a_grant(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("PASTPUZZLE_API_KEY", raising=False)
+    monkeypatch.delenv("PASTPUZZLE_USER", raising=False)
+    monkeypatch.delenv("PASTPUZZLE_PASS", raising=False)
+    scans = []
+    monkeypatch.setattr(get_token, "_anon_key_from_site", lambda: scans.append(1))
+
+    assert get_token._login_via_http() is None
+    assert scans == []
+
+
+def test_browser_login_blocks_nonessential_requests():
+    class FakeRoute:
+        def __init__(self, url, resource_type):
+            self.request = type("Request", (), {"url": url, "resource_type": resource_type})()
+            self.outcome = None
+
+        def abort(self):
+            self.outcome = "abort"
+
+        def continue_(self):
+            self.outcome = "continue"
+
+    cases = {
+        ("https://www.pastpuzzle.de/assets/logo.png", "image"): "abort",
+        ("https://www.pastpuzzle.de/assets/app.woff2", "font"): "abort",
+        ("https://www.googletagmanager.com/gtag/js", "script"): "abort",
+        ("https://www.pastpuzzle.de/assets/index.js", "script"): "continue",
+        ("https://project.supabase.co/auth/v1/token", "fetch"): "continue",
+    }
+    for (url, resource_type), expected in cases.items():
+        route = FakeRoute(url, resource_type)
+        get_token._route_request(route)
+        assert route.outcome == expected, url
+
+
+def test_find_locator_races_frames_and_returns_the_visible_match():
+    waits = []
+
+    class FakeLocator:
+        def __init__(self, frame, selector):
+            self.frame, self.selector = frame, selector
+
+        @property
+        def first(self):
+            return self
+
+        def wait_for(self, state, timeout):
+            waits.append((self.frame.name, state))
+            if not any(part in self.frame.visible for part in self.selector.split(", ")):
+                raise TimeoutError(self.selector)
+
+        def is_visible(self):
+            return self.selector in self.frame.visible
+
+    class FakeFrame:
+        def __init__(self, name, visible):
+            self.name, self.visible = name, visible
+
+        def locator(self, selector):
+            return FakeLocator(self, selector)
+
+    class FakePage(FakeFrame):
+        def __init__(self, frames):
+            super().__init__("page", set())
+            self.frames = frames
+
+    selectors = ['input[name="email"]', 'input[type="email"]']
+    login = FakeFrame("login", {'input[type="email"]'})
+    page = FakePage([FakeFrame("main", set()), login])
+
+    locator = get_token._find_locator(page, selectors, deadline=time.time() + 60)
+
+    assert (locator.frame, locator.selector) == (login, 'input[type="email"]')
+    assert waits == [("main", "visible"), ("login", "visible")]
+
+
+def test_anon_key_discovery_streams_bundles_and_caches_the_result(tmp_path, monkeypatch):
+    def encode(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+    anon_key = f"{encode({'alg': 'HS256'})}.{encode({'role': 'anon'})}.signature"
+    bundles = {
+        "https://www.pastpuzzle.de/assets/vendor-1a2b.js": "var x=1;" * 20000,
+        "https://www.pastpuzzle.de/assets/index-3c4d.js": "a" * 70000 + f'supabaseKey:"{anon_key}"',
+    }
+    requested = []
+
+    def handler(request):
+        requested.append(str(request.url))
+        return httpx.Response(200, text=bundles[str(request.url)])
+
+    monkeypatch.setattr(scrape, "_client", httpx.Client(transport=httpx.MockTransport(handler)))
+    cache_path = tmp_path / "anon_key_cache.json"
+
+    assert get_token.discover_anon_key(list(bundles), cache_path) == anon_key
+    assert sorted(requested) == sorted(bundles)
+    requested.clear()
+    assert get_token.discover_anon_key(list(bundles), cache_path) == anon_key
+    assert requested == []
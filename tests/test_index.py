@@ -0,0 +1,77 @@
+from src.archive import save_archive
+from src.index import ArchiveIndex, index_path_for, load_index
+from src.pipeline import store_record
+
+
+RECORDS = [
+    {
+        "date": "2025-01-01",
+        "answer_year": 1969,
+        "quiz_id": "229",
+        "podcasts": [
+            {
+                "page_url": "https://www1.wdr.de/zeitzeichen/a.html",
+                "audio_url": "https://cdn.example.com/a.mp3",
+            }
+        ],
+    },
+    {
+        "date": "2025-01-02",
+        "answer_year": 1969,
+        "podcasts": [{"page_url": "https://example.com/b.html"}],
+    },
+    {"date": "2025-01-03", "answer_year": 1848, "podcasts": []},
+]
+
+
+def test_query_intersects_filters():
+    index = ArchiveIndex.build(RECORDS)
+    assert index.query(answer_year=1969) == ["2025-01-01", "2025-01-02"]
+    assert index.query(host="WWW1.wdr.de") == ["2025-01-01"]
+    assert index.query(quiz_id="229") == ["2025-01-01"]
+    assert index.query(missing_audio=True) == ["2025-01-02", "2025-01-03"]
+    assert index.query(answer_year=1969, missing_audio=True) == ["2025-01-02"]
+
+
+def test_update_replaces_previous_entry():
+    index = ArchiveIndex.build(RECORDS)
+    index.update({"date": "2025-01-02", "answer_year": 1848, "podcasts": []})
+    assert index.query(answer_year=1969) == ["2025-01-01"]
+    assert index.query(answer_year=1848) == ["2025-01-02", "2025-01-03"]
+    assert index.query(missing_audio=True) == ["2025-01-02", "2025-01-03"]
+    index.update(RECORDS[0] | {"date": "2025-01-02"})
+    assert index.query(missing_audio=True) == ["2025-01-03"]
+
+
+def test_records_without_usable_podcasts_are_missing_audio():
+    index = ArchiveIndex.build(
+        [
+            {"date": "2025-02-01"},
+            {"date": "2025-02-02", "podcasts": None},
+            {"date": "2025-02-03", "podcasts": ["https://example.com/c.html"]},
+            RECORDS[0] | {"date": "2025-02-04"},
+        ]
+    )
+    assert index.query(missing_audio=True) == ["2025-02-01", "2025-02-02", "2025-02-03"]
+
+
+def test_load_index_rebuilds_when_archive_changes(tmp_path):
+    archive_path = tmp_path / "archive.json"
+    save_archive(RECORDS[:1], archive_path)
+    assert load_index(archive_path).query(answer_year=1969) == ["2025-01-01"]
+    assert index_path_for(archive_path).exists()
+
+    save_archive(RECORDS[1:], archive_path)
+    assert load_index(archive_path).query(answer_year=1969) == ["2025-01-02"]
+
+
+def test_resolving_a_shared_episode_updates_every_day_using_it(tmp_path):
+    archive_path = tmp_path / "archive.json"
+    page_url = "https://example.com/shared.html"
+    save_archive([{"date": "2025-01-01", "podcasts": [{"page_url": page_url}]}], archive_path)
+    assert load_index(archive_path).query(missing_audio=True) == ["2025-01-01"]
+
+    resolved = {"page_url": page_url, "audio_url": "https://cdn.example.com/shared.mp3"}
+    store_record({"date": "2025-01-02", "podcasts": [resolved]}, archive_path)
+
+    assert load_index(archive_path).query(missing_audio=True) == []
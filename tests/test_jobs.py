@@ -0,0 +1,87 @@
+import pytest
+
+from src import jobs
+from src.archive import load_archive
+from src.generate_feed import FEED_PATH
+from src.jobs import JobJournal, backfill_units, run_backfill
+
+
+def test_backfill_records_failed_units_and_retries_only_them(tmp_path, monkeypatch):
+    monkeypatch.setenv("FEED_PRECOMPRESS", "none")
+    archive_path = tmp_path / "archive.json"
+    feed_path = tmp_path / FEED_PATH.name
+    dates = ["2025-01-01", "2025-01-02", "2025-01-03", "2025-01-04"]
+    units = backfill_units(dates, [])
+    fetched = []
+    failing = {"2025-01-03"}
+
+    def fake_fetch_puzzle(date_value, resolve=True):
+        fetched.append(date_value)
+        if date_value in failing:
+            raise RuntimeError("token expired")
+        return {"date": date_value, "answer_year": 1969, "podcasts": []}
+
+    monkeypatch.setattr(jobs, "fetch_puzzle", fake_fetch_puzzle)
+    monkeypatch.setattr(jobs, "resolve_podcasts", lambda records, workers=None, no_audio=None: {})
+
+    failed = run_backfill(
+        units, archive_path, flush_every=2, feed_path=feed_path, echo=lambda _: None
+    )
+    assert failed == {"date:2025-01-03": "token expired"}
+    stored = [record["date"] for record in load_archive(archive_path)]
+    assert stored == ["2025-01-01", "2025-01-02", "2025-01-04"]
+    journal = JobJournal.for_units(archive_path, units)
+    assert journal.failed == failed
+
+    failing.clear()
+    fetched.clear()
+    messages = []
+    assert run_backfill(
+        units, archive_path, flush_every=2, feed_path=feed_path, echo=messages.append
+    ) == {}
+
+    assert fetched == ["2025-01-03"]
+    assert messages[0].startswith("Resuming job")
+    assert [record["date"] for record in load_archive(archive_path)] == dates
+    assert not journal.path.exists()
+    assert feed_path.exists()
+
+
+def test_backfill_resumes_fetched_units_without_fetching_again(tmp_path, monkeypatch):
+    monkeypatch.setenv("FEED_PRECOMPRESS", "none")
+    archive_path = tmp_path / "archive.json"
+    feed_path = tmp_path / FEED_PATH.name
+    units = backfill_units(["2025-01-01", "2025-01-02"], [])
+    fetched = []
+
+    def fake_fetch_puzzle(date_value, resolve=True):
+        fetched.append(date_value)
+        return {"date": date_value, "answer_year": 1969, "podcasts": []}
+
+    def crashing_resolve(records, workers=None, no_audio=None):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(jobs, "fetch_puzzle", fake_fetch_puzzle)
+    monkeypatch.setattr(jobs, "resolve_podcasts", crashing_resolve)
+    with pytest.raises(KeyboardInterrupt):
+        run_backfill(units, archive_path, feed_path=feed_path, echo=lambda _: None)
+
+    monkeypatch.setattr(jobs, "resolve_podcasts", lambda records, workers=None, no_audio=None: {})
+    assert run_backfill(units, archive_path, feed_path=feed_path, echo=lambda _: None) == {}
+    assert fetched == ["2025-01-01", "2025-01-02"]
+    assert len(load_archive(archive_path)) == 2
+
+
+def test_journal_keeps_unflushed_units_and_ignores_torn_lines(tmp_path):
+    path = tmp_path / "jobs" / "job.jsonl"
+    journal = JobJournal(path)
+    journal.record("date:2025-01-01", {"date": "2025-01-01"}, False)
+    journal.record("date:2025-01-02", {"date": "2025-01-02"}, False)
+    journal.mark_flushed(["date:2025-01-01"])
+    with path.open("a", encoding="utf-8") as handle:
+        handle.write('{"unit": "date:2025-01-0')
+
+    reopened = JobJournal(path)
+    assert [entry["unit"] for entry in reopened.unflushed()] == ["date:2025-01-02"]
+    reopened.mark_flushed(["date:2025-01-02"])
+    assert JobJournal(path).unflushed() == []
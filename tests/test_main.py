@@ -0,0 +1,52 @@
+import subprocess
+import sys
+
+
+def test_importing_cli_skips_scraper_dependencies():
+    code = (
+        "import sys, src.main, src.pipeline, src.sources; "
+        "print(sorted(m for m in ('httpx', 'bs4', 'lxml', 'src.scrape', 'src.generate_feed', "
+        "'src.index', 'xml.etree.ElementTree') if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+
+
+def test_feed_command_regenerates_without_scraping(tmp_path, monkeypatch):
+    from click.testing import CliRunner
+
+    from src.archive import save_archive
+    from src.main import main
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("ARCHIVE_PATH", "data/archive.json")
+    monkeypatch.setenv("FEED_PRECOMPRESS", "none")
+    record = {"date": "2025-01-01", "answer_year": 1969, "podcasts": []}
+    save_archive([record], tmp_path / "data/archive.json")
+
+    runner = CliRunner()
+    assert runner.invoke(main, ["feed"]).exit_code == 0
+    assert (tmp_path / "data/feed.xml").exists()
+    result = runner.invoke(main, ["feed"])
+    assert "skipping feed generation" in result.output
+
+
+def test_trace_malloc_applies_to_subcommands(tmp_path, monkeypatch):
+    from click.testing import CliRunner
+
+    from src import jobs
+    from src.main import main
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("ARCHIVE_PATH", "data/archive.json")
+    monkeypatch.setenv("FEED_PRECOMPRESS", "none")
+    record = {"date": "2025-01-01", "answer_year": 1969, "podcasts": []}
+    monkeypatch.setattr(jobs, "fetch_puzzle", lambda date_value, resolve=True: dict(record))
+    monkeypatch.setattr(jobs, "resolve_podcasts", lambda records, workers=None, no_audio=None: {})
+
+    result = CliRunner().invoke(main, ["--trace-malloc", "backfill", "--date", "2025-01-01"])
+
+    assert result.exit_code == 0, result.output
+    assert "Top 20 allocation sites" in result.output
+    reports = [path.name for path in (tmp_path / "data/profiles").iterdir()]
+    assert len(reports) == 1 and reports[0].endswith("-backfill.malloc.txt")
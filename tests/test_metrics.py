@@ -0,0 +1,60 @@
+import json
+
+import httpx
+import pytest
+
+from src import metrics, scrape
+
+
+def test_spans_log_json_lines_and_write_textfile(tmp_path, monkeypatch, capsys):
+    textfile = tmp_path / "pastpuzzle.prom"
+    monkeypatch.setenv("METRICS_LOG", "1")
+    monkeypatch.setenv("METRICS_TEXTFILE", str(textfile))
+
+    with pytest.raises(RuntimeError):
+        with metrics.record_run("scrape"):
+            with metrics.span("archive_save", records=3):
+                pass
+            metrics.observe_request("GET", "https://www1.wdr.de/a.html", 200, 512, 0.25, 1)
+            raise RuntimeError("boom")
+
+    events = [json.loads(line) for line in capsys.readouterr().err.splitlines()]
+    assert [event["span"] for event in events] == ["archive_save", "http", "run"]
+    assert events[0]["records"] == 3
+    assert events[1]["host"] == "www1.wdr.de"
+    assert events[2]["status"] == "error"
+
+    content = textfile.read_text(encoding="utf-8")
+    assert 'pastpuzzle_stage_seconds{stage="archive_save"}' in content
+    assert 'pastpuzzle_http_bytes{host="www1.wdr.de",method="GET",status="200"} 512' in content
+    assert 'pastpuzzle_http_retries{host="www1.wdr.de",method="GET",status="200"} 1' in content
+    assert "pastpuzzle_last_run_success 0" in content
+
+
+def test_spans_are_free_when_disabled(monkeypatch):
+    monkeypatch.delenv("METRICS_LOG", raising=False)
+    monkeypatch.delenv("METRICS_TEXTFILE", raising=False)
+    recorded = list(metrics._spans)
+    with metrics.span("feed_write") as fields:
+        fields["ignored"] = True
+    metrics.observe_request("GET", "https://example.com/", 200, 1, 0.1, 0)
+    assert metrics._spans == recorded
+
+
+def test_failed_request_is_labelled_error_with_attempted_retries(monkeypatch):
+    monkeypatch.setenv("METRICS_LOG", "1")
+    monkeypatch.setattr(scrape, "RETRY_DELAYS", (0, 0))
+
+    class FailingClient:
+        def request(self, method, url, **kwargs):
+            raise httpx.ConnectError("refused")
+
+    monkeypatch.setattr(scrape, "http_client", lambda: FailingClient())
+    metrics._spans.clear()
+    with pytest.raises(httpx.ConnectError):
+        scrape._request_with_backoff("GET", "https://example.com/feed")
+
+    event = metrics._spans[-1]
+    assert (event["status"], event["retries"]) == ("error", 1)
+    content = metrics.render_textfile(metrics._spans, False, 0)
+    assert 'pastpuzzle_http_requests{host="example.com",method="GET",status="error"} 1' in content
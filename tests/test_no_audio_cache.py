@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from src import scrape
+from src.no_audio_cache import NoAudioCache, NoAudioConfig
+
+
+PAGE = "https://example.com/video-only.html"
+CONFIG = NoAudioConfig(base_ttl=timedelta(days=1), max_ttl=timedelta(days=3))
+
+
+def test_pages_without_audio_are_skipped_until_expiry(tmp_path, monkeypatch):
+    requested = []
+
+    def fake_request(method, url, headers=None, json=None):
+        requested.append(url)
+        request = httpx.Request(method, url)
+        return httpx.Response(200, text="<html><h1>Video</h1></html>", request=request)
+
+    monkeypatch.setattr(scrape, "_request_with_backoff", fake_request)
+    path = tmp_path / "no_audio_pages.json"
+    cache = NoAudioCache(path, CONFIG)
+
+    assert scrape.resolve_podcast_audio({"podcasts": [{"page_url": PAGE}]}, cache) == {}
+    cache.save()
+    reopened = NoAudioCache(path, CONFIG)
+    scrape.resolve_podcast_audio({"podcasts": [{"page_url": PAGE}]}, reopened)
+    assert requested == [PAGE]
+
+    now = datetime.now(timezone.utc)
+    assert reopened.fresh(PAGE, now)
+    reopened.miss(PAGE, now)
+    reopened.miss(PAGE, now)
+    assert reopened.entries[PAGE]["misses"] == 3
+    assert reopened.entries[PAGE]["expires"] == (now + timedelta(days=3)).isoformat()
+    assert not reopened.fresh(PAGE, now + timedelta(days=3))
+    reopened.save()
+
+    assert NoAudioCache(path, CONFIG, parser_version="other").entries == {}
+
+
+def test_parser_version_follows_the_extractor_source(monkeypatch):
+    from src.no_audio_cache import PARSER_ENTRY_POINT, current_parser_version, parser_version
+
+    version = current_parser_version()
+    assert version == parser_version(getattr(scrape, PARSER_ENTRY_POINT))
+
+    def _extract_wdr_audio_url(html):
+        return None
+
+    monkeypatch.setattr(scrape, "_extract_wdr_audio_url", _extract_wdr_audio_url)
+    assert parser_version(getattr(scrape, PARSER_ENTRY_POINT)) != version
@@ -81,3 +81,36 @@ def test_parse_wdr_podcast_page():
     assert parsed["audio_url"] == "https://wdrmedien-a.akamaihd.net/content/audio/test/zeitzeichen.mp3"
     assert parsed["title"] == "Zeitzeichen: Titus Flavius Vespasianus"
     assert parsed["pub_date"] == "2024-06-12"
+
+
+def test_resolve_podcasts_parses_pages_in_worker_processes(monkeypatch):
+    import httpx
+
+    from src import scrape
+
+    html = (FIXTURES / "wdr_zeitzeichen.html").read_bytes()
+    requested = []
+
+    def fake_request(method, url, headers=None, json=None):
+        requested.append((method, url))
+        request = httpx.Request(method, url)
+        if method == "HEAD":
+            return httpx.Response(200, headers={"content-length": "1234"}, request=request)
+        return httpx.Response(200, content=html, request=request)
+
+    monkeypatch.setattr(scrape, "_request_with_backoff", fake_request)
+    monkeypatch.setattr(scrape, "PARSE_POOL_MIN_PAGES", 1)
+    page_urls = [f"https://www1.wdr.de/zeitzeichen/{number}.html" for number in range(3)]
+    records = [
+        {"date": "2024-06-12", "podcasts": [{"page_url": page_urls[0]}, {"page_url": page_urls[1]}]},
+        {"date": "2024-06-13", "podcasts": [{"page_url": page_urls[1]}, {"page_url": page_urls[2]}]},
+    ]
+
+    scrape.resolve_podcasts(records, workers=2)
+
+    assert sorted(url for method, url in requested if method == "GET") == page_urls
+    for record in records:
+        for podcast in record["podcasts"]:
+            assert podcast["audio_url"].endswith("/content/audio/test/zeitzeichen.mp3")
+            assert podcast["length"] == 1234
+            assert podcast["title"] == "Zeitzeichen: Titus Flavius Vespasianus"
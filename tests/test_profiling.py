@@ -0,0 +1,25 @@
+from src.profiling import profiled
+
+
+def _work():
+    return [str(number) * 10 for number in range(20_000)]
+
+
+def test_profiled_writes_reports_and_prints_summary(tmp_path, capsys):
+    with profiled("scrape", profile=True, trace_malloc=True, directory=tmp_path, top=5):
+        kept = _work()
+    assert kept
+
+    names = sorted(path.name.split("-scrape", 1)[1] for path in tmp_path.iterdir())
+    assert names == [".malloc.txt", ".prof", ".pstats.txt"]
+    output = capsys.readouterr().out
+    assert "Top 5 functions by cumulative time" in output
+    assert "_work (test_profiling.py:" in output
+    assert "Top 5 allocation sites" in output
+    assert "test_profiling.py:5" in output
+
+
+def test_profiled_is_a_no_op_without_flags(tmp_path):
+    with profiled("scrape", directory=tmp_path):
+        pass
+    assert not any(tmp_path.iterdir())
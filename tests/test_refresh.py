@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from src import scrape
+from src.archive import load_podcasts, podcasts_path_for, save_archive
+from src.refresh import RefreshConfig, refresh_enclosures
+
+
+def _handler(request):
+    path = request.url.path
+    if path == "/a.mp3":
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, headers={"etag": '"v1"', "content-length": "2000"})
+    if path == "/b.mp3":
+        if request.method == "HEAD":
+            return httpx.Response(405)
+        assert request.headers["range"] == "bytes=0-0"
+        return httpx.Response(206, headers={"content-range": "bytes 0-0/5000"}, content=b"x")
+    return httpx.Response(404)
+
+
+def test_refresh_enclosures_updates_changed_fields_and_reports_dead_links(tmp_path, monkeypatch):
+    monkeypatch.setattr(scrape, "_client", httpx.Client(transport=httpx.MockTransport(_handler)))
+    archive_path = tmp_path / "archive.json"
+    podcasts = [
+        {
+            "page_url": f"https://example.com/{name}",
+            "audio_url": f"https://cdn.example.com/{name}.mp3",
+            "length": 1000,
+        }
+        for name in ("a", "b", "c")
+    ]
+    save_archive([{"date": "2025-01-01", "podcasts": podcasts}], archive_path)
+    config = RefreshConfig(max_age=timedelta(days=7), host_rate=0, workers=4)
+    now = datetime(2025, 1, 10, tzinfo=timezone.utc)
+
+    report = refresh_enclosures(archive_path, config, now)
+
+    assert (report.checked, report.unchanged) == (3, 0)
+    assert [check.audio_url for check in report.dead] == ["https://cdn.example.com/c.mp3"]
+    store = load_podcasts(podcasts_path_for(archive_path))
+    assert store["https://example.com/a"]["length"] == 2000
+    assert store["https://example.com/b"]["length"] == 5000
+    assert store["https://example.com/c"]["length"] == 1000
+
+    mtime = podcasts_path_for(archive_path).stat().st_mtime_ns
+    report = refresh_enclosures(archive_path, config, now + timedelta(days=1))
+    assert (report.skipped, report.checked, len(report.dead)) == (2, 1, 1)
+
+    report = refresh_enclosures(archive_path, config, now + timedelta(days=8))
+    assert report.unchanged == 2
+    assert podcasts_path_for(archive_path).stat().st_mtime_ns == mtime
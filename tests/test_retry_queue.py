@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from src import scrape
+from src.archive import load_archive, save_archive
+from src.retry_queue import RetryConfig, RetryQueue, drain_retry_queue
+
+
+NOW = datetime(2025, 1, 2, 6, 0, tzinfo=timezone.utc)
+CONFIG = RetryConfig(base_delay=timedelta(minutes=10), max_delay=timedelta(minutes=30))
+GOOD_PAGE = "https://www1.wdr.de/zeitzeichen/good.html"
+BAD_PAGE = "https://www1.wdr.de/zeitzeichen/bad.html"
+PAGE_HTML = '<html><body><h1>Episode</h1><audio src="https://cdn.example.com/a.mp3"></audio></body></html>'
+
+
+def _fake_request(broken):
+    def request(method, url, headers=None, json=None):
+        req = httpx.Request(method, url)
+        if url in broken:
+            return httpx.Response(404, request=req)
+        if method == "HEAD":
+            return httpx.Response(200, headers={"content-length": "42"}, request=req)
+        return httpx.Response(200, text=PAGE_HTML, request=req)
+
+    return request
+
+
+def test_failed_page_keeps_partial_record_and_drains_later(tmp_path, monkeypatch):
+    archive_path = tmp_path / "archive.json"
+    broken = {BAD_PAGE}
+    monkeypatch.setattr(scrape, "_request_with_backoff", _fake_request(broken))
+    record = {
+        "date": "2025-01-02",
+        "podcasts": [{"page_url": GOOD_PAGE}, {"page_url": BAD_PAGE}],
+    }
+
+    failures = scrape.resolve_podcast_audio(record)
+
+    assert list(failures) == [BAD_PAGE]
+    assert record["podcasts"][0]["audio_url"] == "https://cdn.example.com/a.mp3"
+    assert "audio_url" not in record["podcasts"][1]
+    save_archive([record], archive_path)
+    queue = RetryQueue.for_archive(archive_path, CONFIG)
+    queue.add([record], failures, NOW)
+    queue.save()
+
+    assert drain_retry_queue(archive_path, NOW, CONFIG) == []
+    assert drain_retry_queue(archive_path, NOW + timedelta(minutes=10), CONFIG) == []
+    entry = RetryQueue.for_archive(archive_path, CONFIG).entries[BAD_PAGE]
+    assert entry["dates"] == ["2025-01-02"]
+    assert entry["attempts"] == 2
+    assert entry["next_attempt"] == (NOW + timedelta(minutes=30)).isoformat()
+
+    broken.clear()
+    assert drain_retry_queue(archive_path, NOW + timedelta(minutes=30), CONFIG) == ["2025-01-02"]
+    podcasts = load_archive(archive_path)[0]["podcasts"]
+    assert [podcast.get("length") for podcast in podcasts] == [42, 42]
+    assert not queue.path.exists()
@@ -0,0 +1,76 @@
+import asyncio
+import gzip
+
+from src.archive import save_archive
+from src.generate_feed import FeedConfig, FeedOutput
+from src.serve import FeedStore, serve
+
+
+RECORDS = [
+    {
+        "date": "2025-01-01",
+        "answer_year": 1969,
+        "podcasts": [
+            {"page_url": "https://example.com/a", "audio_url": "https://cdn.example.com/a.mp3"}
+        ],
+    }
+]
+
+
+async def _request(port, path, headers=""):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: test\r\nConnection: close\r\n{headers}\r\n".encode())
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, body = raw.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    response_headers = dict(line.split(": ", 1) for line in lines[1:])
+    return int(lines[0].split()[1]), response_headers, body
+
+
+def test_serve_answers_conditional_and_compressed_requests(tmp_path):
+    archive_path = tmp_path / "archive.json"
+    feed_path = tmp_path / "feed.xml"
+    save_archive(RECORDS, archive_path)
+    config = FeedConfig(
+        feed_days=0,
+        precompress=("gzip",),
+        outputs=(FeedOutput("rss", "feed.xml", False), FeedOutput("json", "feed.json", False)),
+    )
+    store = FeedStore(feed_path, archive_path, config)
+
+    async def scenario():
+        ready = asyncio.get_running_loop().create_future()
+        task = asyncio.create_task(serve(store, port=0, reload_interval=0.05, ready=ready))
+        port = await ready
+        try:
+            status, headers, body = await _request(port, "/")
+            assert status == 200
+            assert headers["Content-Type"].startswith("application/rss+xml")
+            assert body == feed_path.read_bytes()
+
+            status, _, body = await _request(port, "/", f"If-None-Match: {headers['ETag']}\r\n")
+            assert (status, body) == (304, b"")
+
+            status, gz_headers, body = await _request(port, "/feed.xml", "Accept-Encoding: gzip\r\n")
+            assert gz_headers["Content-Encoding"] == "gzip"
+            assert gz_headers["ETag"] != headers["ETag"]
+            assert gzip.decompress(body) == feed_path.read_bytes()
+
+            status, json_headers, _ = await _request(port, "/feed.json")
+            assert json_headers["Content-Type"].startswith("application/feed+json")
+            assert (await _request(port, "/missing.xml"))[0] == 404
+
+            save_archive([*RECORDS, {**RECORDS[0], "date": "2025-01-02"}], archive_path)
+            for _ in range(100):
+                await asyncio.sleep(0.05)
+                if b"2025-01-02" in (await _request(port, "/"))[2]:
+                    break
+            else:
+                raise AssertionError("server did not reload the archive")
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(scenario())
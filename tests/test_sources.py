@@ -0,0 +1,84 @@
+import threading
+
+import pytest
+
+from src import scrape
+from src.archive import load_archive
+from src.environment import getenv
+from src.sources import load_sources, run_sources
+
+
+CONFIG = """
+host_rate = 5
+
+[sources.production]
+archive = "{tmp}/prod/archive.json"
+feed = "{tmp}/prod/feed.xml"
+
+[sources.production.env]
+PASTPUZZLE_URL = "https://www.pastpuzzle.de/"
+FEED_PRECOMPRESS = "none"
+
+[sources.staging]
+archive = "{tmp}/staging/archive.json"
+feed = "{tmp}/staging/feed.xml"
+
+[sources.staging.env]
+PASTPUZZLE_URL = "https://staging.pastpuzzle.de/"
+FEED_PRECOMPRESS = "none"
+PASTPUZZLE_RESOLVE_AUDIO = false
+"""
+
+
+def test_sources_run_concurrently_with_their_own_settings(tmp_path, monkeypatch):
+    monkeypatch.delenv("PASTPUZZLE_URL", raising=False)
+    config_path = tmp_path / "pastpuzzle.toml"
+    config_path.write_text(CONFIG.format(tmp=tmp_path.as_posix()), encoding="utf-8")
+    config = load_sources(config_path)
+    assert [source.name for source in config.sources] == ["production", "staging"]
+    assert config.sources[1].env["PASTPUZZLE_RESOLVE_AUDIO"] == "0"
+
+    both_running = threading.Barrier(2, timeout=5)
+
+    def fake_fetch_puzzle(date=None, resolve=True):
+        both_running.wait()
+        source_url = getenv("PASTPUZZLE_URL")
+        return {"date": "2025-01-01", "answer_year": 1969, "source_url": source_url}
+
+    monkeypatch.setattr(scrape, "fetch_puzzle", fake_fetch_puzzle)
+    messages = []
+
+    assert run_sources(config, echo=messages.append) == {"production": None, "staging": None}
+
+    expected = {"prod": "https://www.pastpuzzle.de/", "staging": "https://staging.pastpuzzle.de/"}
+    for name, url in expected.items():
+        assert load_archive(tmp_path / name / "archive.json")[0]["source_url"] == url
+        assert (tmp_path / name / "feed.xml").exists()
+    assert "[staging] Updated archive for 2025-01-01." in messages
+    assert getenv("PASTPUZZLE_URL") is None
+    assert scrape._host_limiter is None
+
+
+def test_sources_need_archive_and_feed(tmp_path):
+    config_path = tmp_path / "pastpuzzle.toml"
+    config_path.write_text('[sources.broken]\narchive = "a.json"\n', encoding="utf-8")
+    with pytest.raises(ValueError, match="needs a 'feed' path"):
+        load_sources(config_path)
+
+
+@pytest.mark.parametrize(
+    "paths, kind",
+    [
+        (("data/prod.json", "prod/feed.xml", "data/staging.json", "staging/feed.xml"), "archive"),
+        (("prod/archive.json", "out/prod.xml", "staging/archive.json", "out/staging.xml"), "feed"),
+    ],
+)
+def test_sources_cannot_share_sidecar_directories(tmp_path, paths, kind):
+    config_path = tmp_path / "pastpuzzle.toml"
+    config_path.write_text(
+        '[sources.prod]\narchive = "{}"\nfeed = "{}"\n'
+        '[sources.staging]\narchive = "{}"\nfeed = "{}"\n'.format(*paths),
+        encoding="utf-8",
+    )
+    with pytest.raises(ValueError, match=f"keep their {kind} in the same directory"):
+        load_sources(config_path)